@@ -0,0 +1,49 @@
+""" Angular interval index.
+
+    Holds intervals of headings (degrees) and answers which of them contain
+    a heading with a binary search. Intervals that wrap past 360 are split in two.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Hashable, List, Tuple
+
+
+class AngularIntervalIndex:
+
+    def __init__(self, intervals: List[Tuple[float, float, Hashable]]):
+        """ intervals: (center heading, half width, item_id)
+        """
+        spans: List[Tuple[float, float, Hashable]] = []
+        # Items with an interval that covers every heading.
+        self._full_circle: List[Hashable] = []
+        for center, half_width, item_id in intervals:
+            if half_width >= 180:
+                self._full_circle.append(item_id)
+                continue
+            start = (center - half_width) % 360
+            end = (center + half_width) % 360
+            if start <= end:
+                spans.append((start, end, item_id))
+            else:
+                spans.append((start, 360, item_id))
+                spans.append((0, end, item_id))
+        spans.sort(key=lambda span: span[0])
+        self._spans = spans
+        self._starts = [span[0] for span in spans]
+        # No span that starts further back than this can reach a heading.
+        self._max_width = max((end - start for start, end, _ in spans), default=0)
+
+    def __len__(self) -> int:
+        return len(self._spans) + len(self._full_circle)
+
+    def query(self, heading: float) -> List[Hashable]:
+        """ Get IDs of items with an interval that contains heading.
+        """
+        heading = heading % 360
+        found = list(self._full_circle)
+        first_ix = bisect_left(self._starts, heading - self._max_width)
+        last_ix = bisect_right(self._starts, heading)
+        for start, end, item_id in self._spans[first_ix:last_ix]:
+            if end >= heading:
+                found.append(item_id)
+        return found
@@ -0,0 +1,168 @@
+""" Asyncio game server, hosts many games ("rooms") in one process.
+
+    Speaks the same newline delimited JSON protocol as api.main sessions.
+    Every game command must carry a "room_id" envelope field that routes
+    it to a room. Rooms are managed with the create_room, destroy_room and
+    list_rooms commands.
+
+    Connections are always sessions. A session command with a room_id
+    ({"session": {"delta": true}, "room_id": ...}) turns on delta encoded
+    (or per team, {"per_team": true}) frame states for that room, on that connection.
+
+    usage: python -m api.async_server <port>
+"""
+
+import argparse
+import asyncio
+import traceback
+from typing import Dict, Optional, Tuple
+import json
+
+from api.commands import GameCommandMixin, CommandError, SessionOptions
+from api.models.game import Game
+from api.logger import get_logger
+
+
+class RoomError(CommandError):
+    pass
+
+
+class GameRoomServer(GameCommandMixin):
+
+    # Envelope field used to route a command to a room.
+    ROOM_ID_KEY = 'room_id'
+
+    # Room management
+    CMD_ROOT_CREATE_ROOM = 'create_room'
+    CMD_ROOT_DESTROY_ROOM = 'destroy_room'
+    CMD_ROOT_LIST_ROOMS = 'list_rooms'
+
+    def __init__(self):
+        self.rooms: Dict[str, Game] = {}
+        self.tcplogger = get_logger("async-tcp")
+        # All rooms share one logger, rather than reopening the log files per game.
+        self.game_logger = get_logger("Game-Logger")
+
+
+    def create_room(self, room_id: str) -> Game:
+        if room_id in self.rooms:
+            raise RoomError(f"room {room_id} already exists")
+        game = Game(logger=self.game_logger)
+        self.rooms[room_id] = game
+        self.tcplogger.info(f"created room {room_id}")
+        return game
+
+    def destroy_room(self, room_id: str) -> None:
+        self.get_room(room_id)
+        del self.rooms[room_id]
+        self.tcplogger.info(f"destroyed room {room_id}")
+
+    def get_room(self, room_id: Optional[str]) -> Game:
+        if room_id is None:
+            raise RoomError("room_id is required")
+        try:
+            return self.rooms[room_id]
+        except KeyError:
+            raise RoomError(f"room {room_id} does not exist")
+
+    def parse_envelope(self, payload: bytes) -> Tuple[str, Dict, Optional[object], Optional[str]]:
+        data: Dict = json.loads(payload.decode())
+        request_id = data.pop(self.REQUEST_ID_KEY, None)
+        room_id = data.pop(self.ROOM_ID_KEY, None)
+        command_root: str = next(iter(data.keys()))
+        return command_root, data[command_root], request_id, room_id
+
+    async def run_envelope_command(
+        self,
+        command_root: str,
+        request,
+        room_id: Optional[str],
+        sessions: Optional[Dict[str, SessionOptions]] = None,
+    ) -> bytes:
+        if sessions is None:
+            sessions = {}
+
+        if command_root == self.CMD_ROOT_CREATE_ROOM:
+            game = self.create_room(room_id)
+            return self.build_ping_response(game)
+
+        elif command_root == self.CMD_ROOT_DESTROY_ROOM:
+            self.destroy_room(room_id)
+            return json.dumps({"ok": True}).encode()
+
+        elif command_root == self.CMD_ROOT_LIST_ROOMS:
+            return json.dumps({
+                "rooms": [
+                    {"room_id": rid, "phase": game._phase, "game_frame": game._game_frame}
+                    for rid, game in self.rooms.items()
+                ]
+            }).encode()
+
+        elif command_root == self.CMD_ROOT_SESSION:
+            game = self.get_room(room_id)
+            session = self.build_session_options(request)
+            if session is None:
+                sessions.pop(room_id, None)
+            else:
+                sessions[room_id] = session
+            return self.build_ping_response(game)
+
+        game = self.get_room(room_id)
+        if command_root == self.CMD_ROOT_RUN_FRAME:
+            # Yield to other rooms rather than blocking the loop in time.sleep
+            throttle = game.get_frame_throttle_seconds()
+            if throttle > 0:
+                await asyncio.sleep(throttle)
+        return self.run_game_command(game, command_root, request, sessions.get(room_id))
+
+    async def handle_line(self, payload: bytes, sessions: Optional[Dict[str, SessionOptions]] = None) -> bytes:
+        request_id = None
+        try:
+            command_root, request, request_id, room_id = self.parse_envelope(payload)
+            response = await self.run_envelope_command(command_root, request, room_id, sessions)
+        except Exception as e:
+            # Don't tear down the connection (or other rooms) over one bad command.
+            self.tcplogger.error(str(e))
+            self.tcplogger.error(traceback.format_exc())
+            response = self.build_error_response(e)
+        return self.add_request_id(response, request_id)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """ Serve newline delimited commands until the client hangs up.
+            Responses are written in the order the commands were received. Every
+            command gets one newline terminated JSON response, except run_frame in a
+            per_team session while the game is LIVE. That response is a header line,
+            the JSON response with "team_frames": N (and the request_id), followed by
+            N newline terminated "<team_id> <frame JSON>" lines (see build_team_frames_payload).
+        """
+        # room_id -> session options, for rooms this connection opened a session on.
+        sessions: Dict[str, SessionOptions] = {}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                payload = line.strip()
+                if not payload:
+                    continue
+                writer.write(await self.handle_line(payload, sessions) + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            print("listening...")
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Start Async Socket Server')
+    parser.add_argument(
+        'port',
+        type=int,
+        help='Port for process to run on.'
+    )
+    args = parser.parse_args()
+    asyncio.run(GameRoomServer().serve("localhost", args.port))
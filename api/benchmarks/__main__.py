@@ -0,0 +1,53 @@
+""" Run the benchmark suite.
+
+    python -m api.benchmarks                 compare against the baseline
+    python -m api.benchmarks --save          record a new baseline
+    python -m api.benchmarks --filter run_frame
+
+    Exits with status 1 if any benchmark regressed past the threshold.
+    Baselines are machine specific, record them on the machine that runs the comparison.
+"""
+
+import argparse
+import sys
+
+from api.benchmarks.runner import (
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+parser = argparse.ArgumentParser(description='Run simulation benchmarks')
+parser.add_argument('--filter', help='Only run benchmarks with this substring in their name.')
+parser.add_argument('--repeat', type=int, default=5, help='Samples per benchmark.')
+parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+parser.add_argument('--save', action='store_true', help='Save results as the new baseline.')
+args = parser.parse_args()
+
+baseline = load_baseline(args.baseline)
+results = run_benchmarks(args.filter, args.repeat)
+
+name_width = max((len(name) for name in results), default=0)
+for name, result in results.items():
+    line = f"{name:<{name_width}}  {result['median_us']:>12.2f}us"
+    if name in baseline:
+        line += f"  ({result['median_us'] / baseline[name]['median_us']:.2f}x baseline)"
+    print(line)
+
+if args.save:
+    save_baseline(args.baseline, results)
+    print(f"baseline saved to {args.baseline}")
+    sys.exit(0)
+
+regressions = find_regressions(results, baseline, args.threshold)
+for regression in regressions:
+    print(
+        f"REGRESSION {regression['name']}: {regression['median_us']:.2f}us"
+        f" vs {regression['baseline_us']:.2f}us baseline ({regression['ratio']:.2f}x)"
+    )
+sys.exit(1 if regressions else 0)
@@ -0,0 +1,158 @@
+""" Benchmark cases.
+
+    Each case is a setup function that returns a zero argument callable.
+    Setup runs once per sample and is not timed, so cases that mutate game
+    state (run_frame, advance_magnet_mines) start every sample from the same
+    prepared game.
+"""
+
+from copy import deepcopy
+from functools import lru_cache
+import random
+from typing import Callable, Dict, Tuple
+
+from api import utils2d
+from api.models.game import Game
+from api.simulate import build_game, build_map
+
+
+BenchmarkSetup = Callable[[], Callable[[], None]]
+
+# name -> (setup, calls per sample)
+BENCHMARKS: Dict[str, Tuple[BenchmarkSetup, int]] = {}
+
+RUN_FRAME_SHIP_COUNTS = (2, 8, 32, 128)
+# Projectiles in flight per ship.
+RUN_FRAME_PROJECTILES_PER_SHIP = (0, 2)
+
+SEED = 1
+
+ALL_PROJECTILES = ('magnet_mine_firing', 'emp_firing', 'hunter_drone_firing')
+
+
+def benchmark(name: str, number: int = 1):
+    def decorator(setup: BenchmarkSetup) -> BenchmarkSetup:
+        BENCHMARKS[name] = (setup, number)
+        return setup
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def _get_prepared_game(ships: int, projectiles: int, launch_flags: Tuple[str] = ALL_PROJECTILES) -> Game:
+    """ LIVE game with scanners online, a few frames run and projectiles in flight.
+        launch_flags are the ship *_firing flags cycled through to launch projectiles.
+        Callers must deepcopy the game before mutating it.
+    """
+    random.seed(SEED)
+    rand = random.Random(SEED)
+    game = build_game(build_map(ships, spacing_meters=1000), ships)
+    for ship in game._ships.values():
+        ship.scanner_online = True
+        ship.heading = rand.randint(0, 359)
+        ship.velocity_x_meters_per_second = rand.uniform(-20, 20)
+        ship.velocity_y_meters_per_second = rand.uniform(-20, 20)
+
+    launched = 0
+    while launched < projectiles:
+        # Ships launch at most one projectile per frame.
+        for ship in game._ships.values():
+            if launched == projectiles:
+                break
+            setattr(ship, launch_flags[launched % len(launch_flags)], True)
+            launched += 1
+        game.run_frame({'commands': []})
+
+    for _ in range(3):
+        game.run_frame({'commands': []})
+    return game
+
+
+def _get_game(ships: int, projectiles: int = 0, launch_flags: Tuple[str] = ALL_PROJECTILES) -> Game:
+    return deepcopy(_get_prepared_game(ships, projectiles, launch_flags))
+
+
+# utils2d primitives
+
+@benchmark("utils2d.rotate", number=10_000)
+def setup_rotate():
+    return lambda: utils2d.rotate((1000, 2000), (1500, 2600), 1.2345)
+
+
+@benchmark("utils2d.calculate_heading_to_point", number=10_000)
+def setup_calculate_heading_to_point():
+    return lambda: utils2d.calculate_heading_to_point((1000, 2000), (1500, 2600))
+
+
+@benchmark("utils2d.hitboxes_intercept_ray_factory", number=100)
+def setup_hitboxes_intercept_ray_factory():
+    game = _get_game(32)
+    map_dims = (game._map_x_unit_length, game._map_y_unit_length)
+    hitboxes = [ship.hitbox_lines for ship in game._ships.values()]
+    def run():
+        calculator, _ = utils2d.hitboxes_intercept_ray_factory((0, 0), 37, map_dims)
+        for hitbox_lines in hitboxes:
+            calculator(hitbox_lines)
+    return run
+
+
+# Models
+
+@benchmark("Ship.to_dict", number=100)
+def setup_ship_to_dict():
+    ship = next(iter(_get_game(8)._ships.values()))
+    return ship.to_dict
+
+
+@benchmark("Ship.to_json", number=100)
+def setup_ship_to_json():
+    ship = next(iter(_get_game(8)._ships.values()))
+    return ship.to_json
+
+
+@benchmark("Game.reset_and_update_scanner_states[ships=32]")
+def setup_reset_and_update_scanner_states():
+    game = _get_game(32)
+    def run():
+        for ship_id in game._ships:
+            game.reset_and_update_scanner_states(ship_id)
+    return run
+
+
+@benchmark("Game.update_scanner_states[ships=32]")
+def setup_update_scanner_states():
+    return _get_game(32).update_scanner_states
+
+
+@benchmark("Game.calculate_weapons_and_damage[ships=32]")
+def setup_calculate_weapons_and_damage():
+    game = _get_game(32)
+    for ship in game._ships.values():
+        ship.ebeam_charge = ship.ebeam_charge_capacity
+        ship.ebeam_firing = True
+    def run():
+        for ship_id in game._ships:
+            game.calculate_weapons_and_damage(ship_id)
+    return run
+
+
+@benchmark("Game.advance_magnet_mines[ships=8,magnet_mines=48]", number=10)
+def setup_advance_magnet_mines():
+    game = _get_game(8, 48, ('magnet_mine_firing',))
+    return lambda: game.advance_magnet_mines(game._fps)
+
+
+# Full frames
+
+def _run_frame_setup(ships: int, projectiles: int) -> BenchmarkSetup:
+    def setup():
+        game = _get_game(ships, projectiles)
+        return lambda: game.run_frame({'commands': []})
+    return setup
+
+
+for _ships in RUN_FRAME_SHIP_COUNTS:
+    for _per_ship in RUN_FRAME_PROJECTILES_PER_SHIP:
+        benchmark(
+            f"Game.run_frame[ships={_ships},projectiles={_ships * _per_ship}]",
+            number=30,
+        )(_run_frame_setup(_ships, _ships * _per_ship))
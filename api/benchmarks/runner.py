@@ -0,0 +1,98 @@
+""" Time benchmark cases and compare results against a stored baseline.
+"""
+
+import json
+import os
+from statistics import median
+from time import perf_counter_ns
+from typing import Dict, List, Optional, TypedDict
+
+from api.benchmarks.cases import BENCHMARKS, BenchmarkSetup
+
+
+DEFAULT_BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "baseline.json",
+)
+
+# Fail when a benchmark is this much slower than its baseline (0.25 == 25%)
+DEFAULT_THRESHOLD = 0.25
+
+
+class BenchmarkResult(TypedDict):
+    # Per call timings, in microseconds.
+    median_us: float
+    min_us: float
+    repeat: int
+    number: int
+
+
+class Regression(TypedDict):
+    name: str
+    baseline_us: float
+    median_us: float
+    ratio: float
+
+
+def time_benchmark(setup: BenchmarkSetup, number: int, repeat: int) -> BenchmarkResult:
+    samples: List[float] = []
+    for _ in range(repeat):
+        run = setup()
+        started_at = perf_counter_ns()
+        for _ in range(number):
+            run()
+        samples.append((perf_counter_ns() - started_at) / number / 1000)
+    return {
+        "median_us": median(samples),
+        "min_us": min(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def run_benchmarks(name_filter: Optional[str] = None, repeat: int = 5) -> Dict[str, BenchmarkResult]:
+    results = {}
+    for name, (setup, number) in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = time_benchmark(setup, number, repeat)
+    return results
+
+
+def find_regressions(
+    results: Dict[str, BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Regression]:
+    """ Compare medians, benchmarks missing from the baseline are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['median_us'] / baseline[name]['median_us']
+        if ratio > 1 + threshold:
+            regressions.append({
+                "name": name,
+                "baseline_us": baseline[name]['median_us'],
+                "median_us": result['median_us'],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, BenchmarkResult]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, BenchmarkResult]):
+    """ Merge results into the baseline, keeping benchmarks that weren't run.
+    """
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,200 @@
+""" Command protocol for the game server.
+
+    Commands are single JSON objects, one per line.
+    The first key of the object is the "command root", its value is the request.
+
+    Shared by the synchronous server (api.main, one Game per process)
+    and the asyncio server (api.async_server, many Games per process).
+"""
+
+import json
+from time import perf_counter_ns
+from typing import Dict, Optional, Tuple
+
+from api.delta import DeltaEncoder
+from api.models.game import Game, GamePhase
+
+
+class CommandError(Exception):
+    pass
+
+
+class SessionOptions:
+    """ How frame states are encoded for one session consumer.
+    """
+    def __init__(self, delta_encoder: Optional[DeltaEncoder] = None, per_team: bool = False):
+        self.delta_encoder = delta_encoder
+        self.per_team = per_team
+
+
+class GameCommandMixin:
+
+    # Optional envelope field. When present, it's echoed back on the response
+    # so that callers can pipeline several commands on one session.
+    REQUEST_ID_KEY = 'request_id'
+
+    # Session
+    # Keep the connection open and process newline delimited
+    # commands until the client hangs up.
+    # Pass {"delta": true} to receive delta encoded frame states, consumers
+    # acknowledge frames with an "ack_frame" field on run_frame requests.
+    # Delta sessions are opt-in for clients other than the node game loop.
+    # Pass {"per_team": true} to receive LIVE frame states split per team
+    # (see build_team_frames_payload).
+    CMD_ROOT_SESSION = 'session'
+
+    # Debug
+    CMD_ROOT_PING = 'ping'
+    # Frame phase timings, pass {"reset": true} to clear them after reading.
+    CMD_ROOT_STATS = 'stats'
+
+    # Phase 0
+    CMD_ROOT_ADD_PLAYER = 'add_player'
+    CMD_ROOT_REMOVE_PLAYER = 'remove_player'
+    CMD_ROOT_SET_MAP = "set_map"
+    CMD_ROOT_ADVANCE_TO_PHASE_1_STARTING = 'advance_to_phase_1_starting'
+
+    # Phase 1
+    CMD_ROOT_DECR_PHASE_1_STARTING_COUNTDOWN = 'decr_phase_1_starting_countdown'
+
+    # PHase 2
+    CMD_ROOT_RUN_FRAME = 'run_frame'
+    # Static map data, LIVE frames only carry its "world_version".
+    CMD_ROOT_GET_WORLD = 'get_world'
+
+
+    def parse_command(self, payload: bytes) -> Tuple[str, Dict, Optional[object]]:
+        data: Dict = json.loads(payload.decode())
+        request_id = data.pop(self.REQUEST_ID_KEY, None)
+        command_root: str = next(iter(data.keys()))
+        return command_root, data[command_root], request_id
+
+    def add_request_id(self, payload: bytes, request_id) -> bytes:
+        # Splice the request id into the already encoded JSON object
+        # so the response doesn't have to be re-encoded.
+        if request_id is None:
+            return payload
+        return (
+            b'{"' + self.REQUEST_ID_KEY.encode() + b'": '
+            + json.dumps(request_id).encode()
+            + (b', ' + payload[1:] if payload != b'{}' else b'}')
+        )
+
+    def build_session_options(self, session_request) -> Optional[SessionOptions]:
+        if not session_request:
+            return None
+        delta = bool(session_request.get("delta"))
+        per_team = bool(session_request.get("per_team"))
+        if delta and per_team:
+            raise CommandError("delta and per_team sessions can't be combined")
+        if per_team:
+            return SessionOptions(per_team=True)
+        if not delta:
+            return None
+        if "keyframe_interval" in session_request:
+            return SessionOptions(DeltaEncoder(keyframe_interval=int(session_request["keyframe_interval"])))
+        return SessionOptions(DeltaEncoder())
+
+    def build_write_payload(self, game: Game, session: Optional[SessionOptions] = None) -> bytes:
+        started_at = perf_counter_ns()
+        if session is not None and session.per_team and game._phase == GamePhase.LIVE:
+            payload = self.build_team_frames_payload(game)
+        else:
+            state = game.get_state()
+            if session is not None and session.delta_encoder is not None:
+                state = session.delta_encoder.encode(state)
+            payload = json.dumps(state).encode()
+        game.profiler.record("serialization", perf_counter_ns() - started_at)
+        return payload
+
+    def build_team_frames_payload(self, game: Game) -> bytes:
+        """ A header line followed by one line per team: "<team_id> <frame JSON>"
+            {"ok": true, "phase": "2-live", "game_frame": 42, "world_version": 1, "team_frames": 2}
+            team-a {"ship": {...}, "phase": "2-live", "game_frame": 42, ...}
+            team-b {"ship": {...}, "phase": "2-live", "game_frame": 42, ...}
+
+            Data shared by every team is encoded once and spliced into each frame,
+            so consumers can forward the frames without decoding them.
+        """
+        shared, team_ships = game.get_team_frame_parts()
+        # Encoded object without its braces.
+        shared_body = json.dumps(shared).encode()[1:-1]
+        lines = [json.dumps({
+            "ok": True,
+            "phase": game._phase,
+            "game_frame": game._game_frame,
+            "world_version": game._world_version,
+            "team_frames": len(team_ships),
+        }).encode()]
+        for team_id, ship in team_ships.items():
+            lines.append(
+                team_id.encode() + b' {"ship": '
+                + ship.to_json().encode()
+                + b', ' + shared_body + b'}'
+            )
+        return b"\n".join(lines)
+
+    def build_ping_response(self, game: Game) -> bytes:
+        data = {
+            k: v
+            for k, v in game._get_base_state().items()
+            if k in game.BASE_STATE_KEYS
+        }
+        return json.dumps(data).encode()
+
+    def build_stats_response(self, game: Game, request) -> bytes:
+        data = {
+            "ok": True,
+            "game_frame": game._game_frame,
+            "fps": game._fps,
+            "phases": game.profiler.get_stats(),
+            "counters": game.profiler.get_counters(),
+        }
+        if request and request.get("reset"):
+            game.profiler.reset()
+        return json.dumps(data).encode()
+
+    def build_error_response(self, error: Exception) -> bytes:
+        return json.dumps({"ok": False, "error": str(error)}).encode()
+
+    def run_game_command(
+        self,
+        game: Game,
+        command_root: str,
+        request,
+        session: Optional[SessionOptions] = None,
+    ) -> bytes:
+        if command_root == self.CMD_ROOT_RUN_FRAME:
+            if session is not None and session.delta_encoder is not None and "ack_frame" in request:
+                session.delta_encoder.ack(request["ack_frame"])
+            game.run_frame(request)
+
+        elif command_root == self.CMD_ROOT_ADD_PLAYER:
+            game.register_player(request)
+
+        elif command_root == self.CMD_ROOT_REMOVE_PLAYER:
+            player_id = request
+            game.remove_player(player_id)
+
+        elif command_root == self.CMD_ROOT_SET_MAP:
+            game.set_map(request)
+
+        elif command_root == self.CMD_ROOT_ADVANCE_TO_PHASE_1_STARTING:
+            game.advance_to_phase_1_starting(request)
+
+        elif command_root == self.CMD_ROOT_DECR_PHASE_1_STARTING_COUNTDOWN:
+            game.decr_phase_1_starting_countdown()
+
+        elif command_root == self.CMD_ROOT_PING:
+            return self.build_ping_response(game)
+
+        elif command_root == self.CMD_ROOT_STATS:
+            return self.build_stats_response(game, request)
+
+        elif command_root == self.CMD_ROOT_GET_WORLD:
+            return json.dumps({"ok": True, **game.get_world()}).encode()
+
+        else:
+            raise CommandError("NotImplementedError")
+
+        return self.build_write_payload(game, session)
@@ -6,6 +6,9 @@ MIN_ELAPSED_TIME_PER_FRAME = 1 / MAX_SERVER_FPS
 
 GAME_START_COUNTDOWN_FROM = 6
 
+# Delta encoded sessions send a full state (keyframe) at least this often.
+DELTA_KEYFRAME_INTERVAL_FRAMES = 90
+
 ORGIN_COORD = (0, 0,)
 
 
@@ -122,6 +125,8 @@ HUNTER_DRONE_EXPLODE_DAMAGE_RADIUS_METERS = 35
 HUNTER_DRONE_TRACKING_ACCELERATION_MS = 17
 HUNTER_DRONE_ARMING_TIME_SECONDS = 2
 HUNTER_DRONE_LAUNCH_VELOCITY_MS = 25
+# Longest a projectile's proximity checks can be skipped while no ship can reach it.
+PROXIMITY_CHECK_MAX_DEFER_FRAMES = 30
 
 # SHOCKWAVE FORCE CALCULATION CONSTANTS.
 # DO NOT LET THIS COMMENT GO STALE!
@@ -133,6 +138,18 @@ SHOCKWAVE_MAX_DELTA_V_COEF = -0.000005
 
 GRAVITY_BRAKE_TRAVERSAL_PER_SECOND = 25
 
+# Cell size of the per frame spatial index for ships and projectiles.
+SPATIAL_INDEX_CELL_SIZE_METERS = 500
+
+# Use the batched (numpy) ship physics stage once there are this many ships.
+BATCHED_PHYSICS_MIN_SHIPS = 12
+
+# Killfeed rows are removed after this many seconds.
+KILLFEED_SECONDS = 8
+
+# Entity pairs (IE ship to ship) that per frame distances and headings are cached for.
+ENTITY_PAIR_CACHE_CAPACITY = 4096
+
 ORE_CAPACITY_KG = 80
 MINING_ORE_POWER_USAGE_PER_SECOND = 250
 MINING_ORE_KG_COLLECTED_PER_SECOND = 8
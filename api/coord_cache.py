@@ -1,39 +1,84 @@
+""" Per frame cache of distances and headings between pairs of entities.
 
-from abc import ABC, abstractmethod
-from typing import Optional, Tuple, Union
+    Values are keyed by the ids of the two entities (ships, projectiles)
+    and stored once per pair, the reverse lookup is derived from the stored value.
+    Entries remember the coordinates they were computed from, if either entity
+    moved since (IE projectiles advancing mid frame) the entry is recomputed.
 
-from .utils2d import invert_heading, calculate_point_distance, calculate_heading_to_point
+    The store is preallocated, once capacity pairs are cached further pairs
+    are computed without being stored.
+"""
 
+from typing import Dict, List, Optional, Tuple
 
-class BaseCoordCache(ABC):
-    def __init__(self):
-        self._data = {}
+from api.constants import ENTITY_PAIR_CACHE_CAPACITY
+from .utils2d import invert_heading, calculate_point_distance, calculate_heading_to_point
 
-    def clear(self):
-        self._data.clear()
 
-    def get_val(self, point_a: Tuple, point_b: Tuple) -> Optional[Union[int, float]]:
-        key = (point_a, point_b,)
-        if key in self._data:
-            return self._data[key]
-        return self.set_val(point_a, point_b)
+class EntityPairCache:
 
-    @abstractmethod
-    def set_val(self, point_a: Tuple, point_b: Tuple):
-        ...
+    def __init__(self, capacity: int = ENTITY_PAIR_CACHE_CAPACITY):
+        self.capacity = capacity
+        # (lower id, higher id) -> slot
+        self._slots: Dict[Tuple[str, str], int] = {}
+        # Coords of (lower id, higher id) the slot's values were computed from.
+        self._coords: List[Optional[Tuple[Tuple, Tuple]]] = [None] * capacity
+        self._distances: List[Optional[float]] = [None] * capacity
+        # Heading from the lower id to the higher id.
+        self._headings: List[Optional[float]] = [None] * capacity
+        self.hits = 0
+        self.misses = 0
 
+    def clear(self):
+        """ Forget cached pairs and reset hit/miss counters, the store is reused.
+        """
+        self._slots.clear()
+        self.hits = 0
+        self.misses = 0
 
-class CoordDistanceCache(BaseCoordCache):
-    def set_val(self, point_a: Tuple, point_b: Tuple):
-        val = calculate_point_distance(point_a, point_b)
-        self._data[(point_a, point_b,)] = val
-        self._data[(point_b, point_a,)] = val
-        return val
+    def _get_slot(self, key: Tuple[str, str], pair_coords: Tuple[Tuple, Tuple]) -> Optional[int]:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._slots)
+            if slot >= self.capacity:
+                return None
+            self._slots[key] = slot
+        elif self._coords[slot] == pair_coords:
+            return slot
+        self._coords[slot] = pair_coords
+        self._distances[slot] = None
+        self._headings[slot] = None
+        return slot
 
+    def get_distance(self, id_a: str, coords_a: Tuple, id_b: str, coords_b: Tuple) -> float:
+        if id_a < id_b:
+            slot = self._get_slot((id_a, id_b), (coords_a, coords_b))
+        else:
+            slot = self._get_slot((id_b, id_a), (coords_b, coords_a))
+        if slot is not None:
+            distance = self._distances[slot]
+            if distance is not None:
+                self.hits += 1
+                return distance
+        self.misses += 1
+        distance = calculate_point_distance(coords_a, coords_b)
+        if slot is not None:
+            self._distances[slot] = distance
+        return distance
 
-class CoordHeadingCache(BaseCoordCache):
-    def set_val(self, point_a: Tuple, point_b: Tuple):
-        val = calculate_heading_to_point(point_a, point_b)
-        self._data[(point_a, point_b,)] = val
-        self._data[(point_b, point_a,)] = invert_heading(val)
-        return val
+    def get_heading(self, id_a: str, coords_a: Tuple, id_b: str, coords_b: Tuple) -> float:
+        """ Heading from entity a to entity b.
+        """
+        reverse = id_b < id_a
+        if reverse:
+            id_a, coords_a, id_b, coords_b = id_b, coords_b, id_a, coords_a
+        slot = self._get_slot((id_a, id_b), (coords_a, coords_b))
+        heading = self._headings[slot] if slot is not None else None
+        if heading is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            heading = calculate_heading_to_point(coords_a, coords_b)
+            if slot is not None:
+                self._headings[slot] = heading
+        return invert_heading(heading) if reverse else heading
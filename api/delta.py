@@ -0,0 +1,254 @@
+""" Delta encoded frame state.
+
+    A DeltaEncoder belongs to one consumer (a session connection). It remembers
+    the states it sent, and once the consumer acknowledges a frame, the next
+    state is encoded against that frame. Only changed top level values and,
+    for entity lists, added/removed entities and changed entity fields are sent.
+
+    A full state (keyframe) is sent when there is no acknowledged base frame,
+    outside of the LIVE phase, and at least every keyframe_interval frames.
+
+    Keyframe payloads are the normal state with "keyframe": true.
+    Delta payloads look like:
+    {
+        "ok": true, "phase": "2-live", "game_frame": 42,
+        "keyframe": false,
+        "base_frame": 40,
+        "changed": {"ebeam_rays": [...]},
+        "removed": [],
+        "entities": {
+            "ships": {
+                "added": [{...}],
+                "changed": {ship_id: {"coord_x": 1}},
+                "removed": [ship_id],
+                "nested": {ship_id: {"scanner_ship_data": {"added": ..., "changed": ..., "removed": ...}}},
+                "order": [ship_id, ...], # only when entities were reordered
+            }
+        }
+    }
+    apply_delta() is the reference implementation for consumers.
+"""
+
+from collections import OrderedDict
+import marshal
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+from api.constants import DELTA_KEYFRAME_INTERVAL_FRAMES
+from api.models.game import GamePhase
+
+
+# Entities are matched by this key.
+ENTITY_KEY = 'id'
+
+# Top level lists of dicts that are diffed per entity,
+# and the list fields inside those entities that are diffed per entity too.
+ENTITY_LISTS: Dict[str, Tuple[str]] = {
+    'ships': (
+        'scanner_ship_data',
+        'scanner_magnet_mine_data',
+        'scanner_emp_data',
+        'scanner_hunter_drone_data',
+    ),
+}
+
+# Sent on every payload, keyframe or not.
+ALWAYS_SENT_KEYS = ('ok', 'phase', 'game_frame',)
+
+
+class EntityListDelta(TypedDict):
+    added: List[Dict]
+    changed: Dict[str, Dict]
+    removed: List[str]
+    nested: Dict[str, Dict[str, "EntityListDelta"]]
+    order: Optional[List[str]]
+
+
+def _freeze(value):
+    """ Copy nested dicts and lists, so snapshots aren't changed
+        when the game mutates the objects it put into the state.
+    """
+    try:
+        # Much faster than walking the state in python.
+        return marshal.loads(marshal.dumps(value))
+    except ValueError:
+        # Unmarshallable type (IE OrderedDict)
+        pass
+    if isinstance(value, dict):
+        return {k: _freeze(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_freeze(v) for v in value]
+    return value
+
+
+def _diff_entity_list(base: List[Dict], current: List[Dict], nested_fields: Tuple[str] = ()) -> Optional[EntityListDelta]:
+    base_by_id = {entity[ENTITY_KEY]: entity for entity in base}
+    current_ids = []
+    added = []
+    changed = {}
+    nested = {}
+    for entity in current:
+        entity_id = entity[ENTITY_KEY]
+        current_ids.append(entity_id)
+        base_entity = base_by_id.get(entity_id)
+        if base_entity is None or base_entity.keys() != entity.keys():
+            added.append(entity)
+            continue
+        fields = {}
+        for field, value in entity.items():
+            if base_entity[field] == value:
+                continue
+            if field in nested_fields:
+                nested.setdefault(entity_id, {})[field] = _diff_entity_list(base_entity[field], value)
+            else:
+                fields[field] = value
+        if fields:
+            changed[entity_id] = fields
+
+    current_id_set = set(current_ids)
+    removed = [entity_id for entity_id in base_by_id if entity_id not in current_id_set]
+
+    # Consumers keep existing entities in place and append new ones,
+    # send the order if that isn't the current order.
+    expected_order = [entity_id for entity_id in base_by_id if entity_id in current_id_set]
+    expected_order.extend(
+        entity[ENTITY_KEY]
+        for entity in added
+        if entity[ENTITY_KEY] not in base_by_id
+    )
+    order = current_ids if expected_order != current_ids else None
+
+    if not (added or changed or removed or nested or order):
+        return None
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "nested": nested,
+        "order": order,
+    }
+
+
+def _apply_entity_list_delta(entities: List[Dict], delta: EntityListDelta) -> List[Dict]:
+    removed = set(delta['removed'])
+    added = {entity[ENTITY_KEY]: entity for entity in delta['added']}
+    out = []
+    for entity in entities:
+        entity_id = entity[ENTITY_KEY]
+        if entity_id in removed:
+            continue
+        if entity_id in added:
+            out.append(added.pop(entity_id))
+            continue
+        if entity_id in delta['changed']:
+            entity = {**entity, **delta['changed'][entity_id]}
+        if entity_id in delta['nested']:
+            entity = {
+                **entity,
+                **{
+                    field: _apply_entity_list_delta(entity[field], field_delta)
+                    for field, field_delta in delta['nested'][entity_id].items()
+                },
+            }
+        out.append(entity)
+    out.extend(added.values())
+    if delta['order'] is not None:
+        by_id = {entity[ENTITY_KEY]: entity for entity in out}
+        out = [by_id[entity_id] for entity_id in delta['order']]
+    return out
+
+
+def diff_states(base: Dict, current: Dict) -> Dict:
+    changed = {}
+    entities = {}
+    for key, value in current.items():
+        if key in ALWAYS_SENT_KEYS:
+            continue
+        if key in ENTITY_LISTS and key in base:
+            entity_delta = _diff_entity_list(base[key], value, ENTITY_LISTS[key])
+            if entity_delta is not None:
+                entities[key] = entity_delta
+        elif key not in base or base[key] != value:
+            changed[key] = value
+    return {
+        **{key: current[key] for key in ALWAYS_SENT_KEYS if key in current},
+        "keyframe": False,
+        "base_frame": base['game_frame'],
+        "changed": changed,
+        "removed": [key for key in base if key not in current],
+        "entities": entities,
+    }
+
+
+def apply_delta(base: Optional[Dict], delta: Dict) -> Dict:
+    """ Rebuild the full state from the base state and a delta (or keyframe) payload.
+    """
+    if delta['keyframe']:
+        return {k: v for k, v in delta.items() if k != 'keyframe'}
+    if base is None or base.get('game_frame') != delta['base_frame']:
+        raise ValueError("delta does not apply to this base frame")
+
+    state = {k: v for k, v in base.items() if k not in delta['removed']}
+    for key in ALWAYS_SENT_KEYS:
+        if key in delta:
+            state[key] = delta[key]
+    state.update(delta['changed'])
+    for key, entity_delta in delta['entities'].items():
+        state[key] = _apply_entity_list_delta(state[key], entity_delta)
+    return state
+
+
+class DeltaEncoder:
+
+    def __init__(self, keyframe_interval: int = DELTA_KEYFRAME_INTERVAL_FRAMES):
+        self.keyframe_interval = keyframe_interval
+        # game_frame -> snapshot of states that were sent, oldest first.
+        self._sent: Dict[int, Dict] = OrderedDict()
+        self._acked_frame: Optional[int] = None
+        self._last_keyframe_frame: Optional[int] = None
+
+    def ack(self, game_frame: Optional[int]):
+        """ The consumer has applied the state for game_frame.
+            Unknown (or already superseded) frames are ignored.
+            None means the consumer has no state, the next payload is a keyframe.
+        """
+        if game_frame is None:
+            self._acked_frame = None
+            return
+        if game_frame not in self._sent:
+            return
+        if self._acked_frame is not None and game_frame < self._acked_frame:
+            return
+        self._acked_frame = game_frame
+        for frame in list(self._sent.keys()):
+            if frame >= game_frame:
+                break
+            del self._sent[frame]
+
+    def _needs_keyframe(self, state: Dict) -> bool:
+        return (
+            self._acked_frame is None
+            or self._last_keyframe_frame is None
+            or state['game_frame'] - self._last_keyframe_frame >= self.keyframe_interval
+        )
+
+    def encode(self, state: Dict) -> Dict:
+        if state['phase'] != GamePhase.LIVE:
+            # Frames don't advance outside of LIVE, so they can't be acknowledged.
+            self._sent.clear()
+            self._acked_frame = None
+            return {**state, "keyframe": True}
+
+        if self._needs_keyframe(state):
+            payload = {**state, "keyframe": True}
+            self._last_keyframe_frame = state['game_frame']
+        else:
+            payload = diff_states(self._sent[self._acked_frame], state)
+
+        self._sent[state['game_frame']] = _freeze(state)
+        if len(self._sent) > self.keyframe_interval:
+            # Consumer stopped acknowledging, keep memory bounded.
+            oldest_frame = next(iter(self._sent))
+            del self._sent[oldest_frame]
+            if oldest_frame == self._acked_frame:
+                self._acked_frame = None
+        return payload
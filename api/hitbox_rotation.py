@@ -0,0 +1,59 @@
+""" Lookup tables of rotated hitbox coordinates.
+
+    Ships (and drones) rotate the same few relative hitbox coordinates every time
+    their heading changes. Every entity with the same hitbox geometry shares one
+    table, which is filled with the rotated coordinates for each whole degree
+    heading the first time that heading is used.
+
+    Results are identical to calling utils2d.rotate() with the heading,
+    fractional headings are not tabled and are rotated directly.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from api.constants import ORGIN_COORD
+from api import utils2d
+
+
+Coord = Tuple[int, int]
+
+
+class HitboxRotationTable:
+
+    def __init__(self, fixed_coords: Tuple[Coord, ...]):
+        self.fixed_coords = fixed_coords
+        self._rotations: List[Optional[Tuple[Coord, ...]]] = [None] * 360
+
+    def _rotate(self, heading: float) -> Tuple[Coord, ...]:
+        delta_radians = utils2d.degrees_to_radians(
+            utils2d.heading_to_delta_heading_from_zero(heading)
+        )
+        return tuple(
+            utils2d.rotate(ORGIN_COORD, coord, delta_radians)
+            for coord in self.fixed_coords
+        )
+
+    def get(self, heading: float) -> Tuple[Coord, ...]:
+        """ Rotated coordinates, in the same order as fixed_coords.
+        """
+        if heading.__class__ is not int or not (0 <= heading < 360):
+            return self._rotate(heading)
+        rotated = self._rotations[heading]
+        if rotated is None:
+            rotated = self._rotations[heading] = self._rotate(heading)
+        return rotated
+
+
+# fixed coords -> table, shared by all entities with that geometry.
+_tables: Dict[Tuple[Coord, ...], HitboxRotationTable] = {}
+
+
+def get_hitbox_rotation_table(fixed_coords: Tuple[Coord, ...]) -> HitboxRotationTable:
+    table = _tables.get(fixed_coords)
+    if table is None:
+        table = _tables[fixed_coords] = HitboxRotationTable(fixed_coords)
+    return table
+
+
+def get_rotated_hitbox(fixed_coords: Tuple[Coord, ...], heading: float) -> Tuple[Coord, ...]:
+    return get_hitbox_rotation_table(fixed_coords).get(heading)
@@ -1,16 +1,16 @@
 
 import argparse
 from functools import wraps
-import json
-from typing import Dict
 import socketserver
+import threading
 import traceback
 
+from api.commands import GameCommandMixin, CommandError
 from api.models.game import Game
 from api.logger import get_logger
 
 
-class TCPHandlerException(Exception):
+class TCPHandlerException(CommandError):
     pass
 
 
@@ -29,81 +29,80 @@ def log_handle(method):
     return wrapper
 
 
-class TCPHandler(socketserver.StreamRequestHandler):
+class ThreadedTCPServer(socketserver.ThreadingTCPServer):
+    # Threaded so that one-shot commands (ping, etc) can still be
+    # served while the game loop holds a session connection open.
+    daemon_threads = True
 
-    game = Game()
-
-    tcplogger = get_logger("tcp")
 
+class TCPHandler(GameCommandMixin, socketserver.StreamRequestHandler):
 
-    # Debug
-    CMD_ROOT_PING = 'ping'
+    game = Game()
 
-    # Phase 0
-    CMD_ROOT_ADD_PLAYER = 'add_player'
-    CMD_ROOT_REMOVE_PLAYER = 'remove_player'
-    CMD_ROOT_SET_MAP = "set_map"
-    CMD_ROOT_ADVANCE_TO_PHASE_1_STARTING = 'advance_to_phase_1_starting'
+    # Session connections and one-shot connections are served on separate
+    # threads, but all of them mutate the same Game instance.
+    game_lock = threading.Lock()
 
-    # Phase 1
-    CMD_ROOT_DECR_PHASE_1_STARTING_COUNTDOWN = 'decr_phase_1_starting_countdown'
+    tcplogger = get_logger("tcp")
 
-    # PHase 2
-    CMD_ROOT_RUN_FRAME = 'run_frame'
+    # Set for sessions opened with {"delta": true} or {"per_team": true}
+    session_options = None
 
 
     def read_stripped_line(self) -> bytes:
         return self.rfile.readline().strip()
 
-    def build_write_payload(self) -> bytes:
-        return json.dumps(self.game.get_state()).encode()
-
-    def build_ping_response(self) -> bytes:
-        data = {
-            k: v
-            for k, v in self.game.get_state().items()
-            if k in self.game.BASE_STATE_KEYS
-        }
-        return json.dumps(data).encode()
+    def run_command(self, command_root: str, request) -> bytes:
+        return self.run_game_command(self.game, command_root, request, self.session_options)
+
+    def handle_session(self, request, request_id) -> None:
+        """ Serve an unbounded stream of newline delimited commands.
+            Responses are written in the order the commands were received. Every
+            command gets one newline terminated JSON response, except run_frame in a
+            per_team session while the game is LIVE. That response is a header line,
+            the JSON response with "team_frames": N (and the request_id), followed by
+            N newline terminated "<team_id> <frame JSON>" lines (see build_team_frames_payload).
+        """
+        self.session_options = self.build_session_options(request)
+        with self.game_lock:
+            ack = self.build_ping_response(self.game)
+        self.wfile.write(self.add_request_id(ack, request_id) + b"\n")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                # Client hung up.
+                return
+            payload = line.strip()
+            if not payload:
+                continue
+
+            request_id = None
+            try:
+                command_root, request, request_id = self.parse_command(payload)
+                if command_root == self.CMD_ROOT_SESSION:
+                    raise TCPHandlerException("session already open")
+                with self.game_lock:
+                    response = self.run_command(command_root, request)
+            except Exception as e:
+                # Don't tear down the whole session over one bad command.
+                self.tcplogger.error(str(e))
+                self.tcplogger.error(traceback.format_exc())
+                response = self.build_error_response(e)
+
+            self.wfile.write(self.add_request_id(response, request_id) + b"\n")
 
     @log_handle
     def handle(self):
         payload = self.read_stripped_line()
+        command_root, request, request_id = self.parse_command(payload)
 
-        data: Dict = json.loads(payload.decode())
-        command_root: str = next(iter(data.keys()))
-
-        request = data[command_root]
-
-        if command_root == self.CMD_ROOT_RUN_FRAME:
-            self.game.run_frame(request)
-
-        elif command_root == self.CMD_ROOT_ADD_PLAYER:
-            self.game.register_player(request)
-
-        elif command_root == self.CMD_ROOT_REMOVE_PLAYER:
-            player_id = request
-            self.game.remove_player(player_id)
-
-        elif command_root == self.CMD_ROOT_SET_MAP:
-            self.game.set_map(request)
-
-        elif command_root == self.CMD_ROOT_ADVANCE_TO_PHASE_1_STARTING:
-            self.game.advance_to_phase_1_starting(request)
-
-        elif command_root == self.CMD_ROOT_DECR_PHASE_1_STARTING_COUNTDOWN:
-            self.game.decr_phase_1_starting_countdown()
-
-        elif command_root == self.CMD_ROOT_PING:
-            self.wfile.write(self.build_ping_response())
-            return
-
-        else:
-            raise TCPHandlerException("NotImplementedError")
-
-
-        self.wfile.write(self.build_write_payload())
+        if command_root == self.CMD_ROOT_SESSION:
+            return self.handle_session(request, request_id)
 
+        with self.game_lock:
+            response = self.run_command(command_root, request)
+        self.wfile.write(self.add_request_id(response, request_id))
 
 
 if __name__ == '__main__':
@@ -116,6 +115,6 @@ if __name__ == '__main__':
     args = parser.parse_args()
 
     HOST, PORT = "localhost", args.port
-    with socketserver.TCPServer((HOST, PORT), TCPHandler) as server:
+    with ThreadedTCPServer((HOST, PORT), TCPHandler) as server:
         print("listening...")
         server.serve_forever()
@@ -1,7 +1,23 @@
-
+from itertools import count
 import uuid
 
 
 class BaseModel:
+    __slots__ = ('id',)
+
     def __init__(self, id=None):
+        # Models that outlive a game (IE ships) keep uuids,
+        # short lived entities are given ids by an IdAllocator.
         self.id = id or str(uuid.uuid4().hex)
+
+
+class IdAllocator:
+    """ Short sequential ids that are unique within one game.
+        The prefix tells entity types apart, IE "m1f" and "x20".
+    """
+
+    def __init__(self):
+        self._counter = count(1)
+
+    def next_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._counter):x}"
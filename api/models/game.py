@@ -1,17 +1,18 @@
 
 from collections import OrderedDict
-from itertools import cycle
 import json
+import math
 import datetime as dt
-from typing import Tuple, TypedDict, Optional, List, Dict, Set
+from typing import Tuple, TypedDict, Optional, List, Dict, Set, Union
 from time import sleep
 import re
 import traceback
-from uuid import uuid4
+
+import numpy as np
 
 from api import constants
 
-from .base import BaseModel
+from .base import BaseModel, IdAllocator
 from .ship import (
     Ship,
     ShipCommands,
@@ -29,16 +30,20 @@ from .special_weapons import (
     HunterDrone,
 )
 from api import utils2d
+from api import physics
 from api.constants import (
     MAX_SERVER_FPS,
     MIN_ELAPSED_TIME_PER_FRAME,
     GAME_START_COUNTDOWN_FROM,
 )
-from api.coord_cache import (
-    CoordDistanceCache,
-    CoordHeadingCache,
-)
+from api.coord_cache import EntityPairCache
 from api.logger import get_logger
+from api.spatial_index import MapFeatureIndex, SpatialHash
+from api.angular_index import AngularIntervalIndex
+from api.projectile_table import ProjectileTable, get_slots
+from api.profiler import FrameProfiler
+from api.timer_wheel import TimerWheel
+from api.scheduler import PeriodicScheduler, PeriodicTask
 
 
 LEADING_ZEROS_TIME = re.compile(r"^0+\:")
@@ -56,6 +61,20 @@ class GamePhase:
     NON_LOBBY_PHASES = (STARTING, LIVE, COMPLETE, )
 
 
+class TimerEvent:
+    # Events are (TimerEvent, payload) tuples.
+    KILLFEED_EXPIRED = 'killfeed_expired'
+
+
+class EntityIdPrefix:
+    MAGNET_MINE = 'm'
+    EMP = 'e'
+    HUNTER_DRONE = 'd'
+    EXPLOSION = 'x'
+    EXPLOSION_SHOCKWAVE = 's'
+    EMP_BLAST = 'b'
+
+
 class PlayerDetails(TypedDict):
     player_name: str
     player_id: str
@@ -103,6 +122,14 @@ class GameState(TypedDict):
     ships: Optional[List]
 
 
+class WorldDocument(TypedDict):
+    world_version: int
+    map_config: MapConfigDetails
+    space_stations: List[MapSpaceStation]
+    ore_mines: List[MapMiningLocationDetails]
+    special_weapon_costs: Dict[str, int]
+
+
 class StartGameCountdownRequest(TypedDict):
     ship_asset_map: Dict[str, str]
 
@@ -115,6 +142,8 @@ class FrameCommand(TypedDict):
 
 class RunFrameDetails(TypedDict):
     commands: List[FrameCommand]
+    # Delta encoded sessions only, last game_frame the consumer applied.
+    ack_frame: Optional[int]
 
 
 class EBeamRayDetails(TypedDict):
@@ -156,20 +185,14 @@ class EBeamTargetingLine(TypedDict):
 class Game(BaseModel):
 
     BASE_STATE_KEYS = ('ok', 'phase', 'map_config', 'players',)
+    # Base state sent to every team along with its own ship (see get_team_frame_parts).
+    TEAM_FRAME_BASE_KEYS = ('phase', 'game_frame', 'server_fps', 'server_fps_throttle_seconds',)
 
-    def __init__(self):
+    def __init__(self, logger=None):
         super().__init__()
 
-        # This property (_is_testing) is a bit of an antipattern.
-        # Ideally game logic should work exactly the same in unit tests
-        # as it does in a live environment.
-        # This field should only be referenced when you want CPU intensive
-        # tasks to only run on every Nth frame, but for ease of testing
-        # you want the task to run every frame. BE CAREFUL WHEN TIEING
-        # LOGIC TO CODE PATHS THAT DONT RUN EVERY FRAME! - Jon
-        self._is_testing = False
-
-        self.logger = get_logger("Game-Logger")
+        # Processes hosting many games can share one logger between them.
+        self.logger = logger or get_logger("Game-Logger")
 
         self._spawn_points: List[MapSpawnPoint] = []
 
@@ -177,6 +200,8 @@ class Game(BaseModel):
         self._ships: Dict[str, Ship] = OrderedDict()
         self._ebeam_rays: List[EBeamRayDetails] = []
         self._killfeed: List[KillFeedElement] = []
+        # State changes that happen at a known future frame.
+        self._timers = TimerWheel()
         self._explosion_shockwaves: List[ExplosionShockwave] = []
         self._ships_hit_by_shockwave: Dict[str, Set[str]] = {}
         self._explosions: List[Explosion] = []
@@ -188,10 +213,22 @@ class Game(BaseModel):
         self._space_stations: List[MapSpaceStation] = []
         self._ore_mines: List[MapMiningLocationDetails] = []
         self._ore_mines_remaining_ore: Dict[str, float] = {}
+        # Map features don't move, these are built once in set_map.
+        self._space_station_index = MapFeatureIndex(self._space_stations)
+        self._ore_mine_index = MapFeatureIndex(self._ore_mines)
 
+        # Map data that doesn't change once the game is live.
+        # Built once in advance_to_phase_2_live, LIVE frames only carry its version.
+        self._world: Optional[WorldDocument] = None
+        self._world_version = 0
+
+        # Ids for projectiles, explosions and blasts.
+        self._ids = IdAllocator()
         self._magnet_mines: Dict[str, MagnetMine] = OrderedDict()
         self._emps: Dict[str, EMP] = OrderedDict()
         self._hunter_drones: Dict[str, HunterDrone] = OrderedDict()
+        # Shared array storage for projectile positions, velocities and timers.
+        self._projectile_table = ProjectileTable()
 
         self._magnet_mine_targeting_lines: List[EBeamTargetingLine] = []
 
@@ -214,17 +251,20 @@ class Game(BaseModel):
         self._fps = MAX_SERVER_FPS
         self._last_frame_at = None
         self._frame_sleep = None
+        # Headless simulations set this to run frames back to back at a fixed FPS.
+        self._fixed_fps: Optional[int] = None
 
         self._game_start_time = None
 
         self._colision_cycle_mine = "mine"
         self._colision_cycle_station = "station"
         self._colision_cycle_wall = "wall"
-        self._collision_cycle = cycle((
-            # self._colision_cycle_mine,
-            # self._colision_cycle_station,
+        # Checked for every ship, every frame.
+        self._collision_types = (
+            self._colision_cycle_mine,
+            self._colision_cycle_station,
             self._colision_cycle_wall,
-        ))
+        )
 
         # Special Weapons
         self._special_weapon_costs = {
@@ -247,11 +287,37 @@ class Game(BaseModel):
         self._hunter_drone_max_proximity_to_explode_meters = constants.HUNTER_DRONE_MAX_PROXIMITY_TO_EXPLODE_METERS
         self._hunter_drone_explode_damage_radius_meters = constants.HUNTER_DRONE_EXPLODE_DAMAGE_RADIUS_METERS
 
-        self._heading_cache = CoordHeadingCache()
-        self._distance_cache = CoordDistanceCache()
+        self._proximity_check_max_defer_frames = constants.PROXIMITY_CHECK_MAX_DEFER_FRAMES
 
-    def get_state(self) -> GameState:
-        base_state = {
+        self._pair_cache = EntityPairCache()
+
+        self._batched_physics_min_ships = constants.BATCHED_PHYSICS_MIN_SHIPS
+
+        self.profiler = FrameProfiler()
+
+        # CPU intensive tasks that only run every Nth frame (see scheduler.py)
+        # Tests can set _scheduler.run_everything to run them on every frame.
+        # BE CAREFUL WHEN TIEING LOGIC TO CODE PATHS THAT DONT RUN EVERY FRAME! - Jon
+        self._scheduler = PeriodicScheduler(self.profiler)
+
+        # Spatial indexes are only valid inside run_frame, between ship physics
+        # and the end of the frame (ships don't move in between).
+        # When None, helpers fall back to scanning every entity.
+        self._ship_index: Optional[SpatialHash] = None
+        self._magnet_mine_index: Optional[SpatialHash] = None
+        self._emp_index: Optional[SpatialHash] = None
+        self._hunter_drone_index: Optional[SpatialHash] = None
+        # ship_id -> AngularIntervalIndex, same lifetime as the spatial indexes.
+        self._autofire_indexes: Dict[str, AngularIntervalIndex] = {}
+        # Fastest ship and strongest engine this frame, same lifetime as the spatial indexes.
+        self._max_ship_speed_meters_per_second = 0.0
+        self._max_ship_acceleration_ms = 0.0
+        # game_frame -> (fastest ship speed, ship_id -> coords) for the frames a proximity
+        # check can be deferred over, oldest first (see _record_ship_positions).
+        self._ship_position_history: Dict[int, Tuple[float, Dict[str, Tuple]]] = {}
+
+    def _get_base_state(self) -> Dict:
+        return {
             'ok': True,
             'phase': self._phase,
             'game_frame': self._game_frame,
@@ -266,7 +332,12 @@ class Game(BaseModel):
             }
         }
 
+    def get_state(self) -> GameState:
+        base_state = self._get_base_state()
+
         if self._phase == GamePhase.LIVE:
+            # Static map data is in the world document (see get_world).
+            del base_state['map_config']
             return {
                 **base_state,
                 **self._get_live_state(),
@@ -289,20 +360,40 @@ class Game(BaseModel):
 
     def _get_live_state(self) -> Dict:
         return {
-            'elapsed_time': LEADING_ZEROS_TIME.sub("", str(dt.datetime.now() - self._game_start_time)).split(".")[0],
+            **self._get_live_shared_state(),
             'ships': [ship.to_dict() for ship in self._ships.values()],
+        }
+
+    def _get_live_shared_state(self) -> Dict:
+        return {
+            'elapsed_time': LEADING_ZEROS_TIME.sub("", str(dt.datetime.now() - self._game_start_time)).split(".")[0],
             'ebeam_rays': self._ebeam_rays,
             'explosion_shockwaves': self._explosion_shockwaves,
             'explosions': self._explosions,
             'emp_blasts': self._emp_blasts,
             "winning_team": self._winning_team,
             "killfeed": self._killfeed,
-            "space_stations": self._space_stations,
-            "ore_mines": self._ore_mines,
-            "special_weapon_costs": self._special_weapon_costs,
             "magnet_mine_targeting_lines": self._magnet_mine_targeting_lines,
+            "world_version": self._world_version,
         }
 
+    def get_team_frame_parts(self) -> Tuple[Dict, Dict[str, Ship]]:
+        """ Per team frames, split into the frame data every team receives
+            and each team's own ship (team_id -> ship). Ships without a team
+            (the player left) aren't sent to anyone.
+        """
+        base_state = self._get_base_state()
+        shared = {
+            **{k: base_state[k] for k in self.TEAM_FRAME_BASE_KEYS},
+            **self._get_live_shared_state(),
+        }
+        team_ships = {
+            ship.team_id: ship
+            for ship in self._ships.values()
+            if ship.team_id
+        }
+        return shared, team_ships
+
 
     # Phase 0 # #
     def register_player(self, request: PlayerDetails):
@@ -353,6 +444,8 @@ class Game(BaseModel):
         ]
         for om in self._ore_mines:
             self._ore_mines_remaining_ore[om['uuid']] = om['starting_ore_amount_kg']
+        self._space_station_index = MapFeatureIndex(self._space_stations, self._map_units_per_meter)
+        self._ore_mine_index = MapFeatureIndex(self._ore_mines, self._map_units_per_meter)
 
         self._explosion_shockwave_max_radius_meters = 4000
 
@@ -460,8 +553,24 @@ class Game(BaseModel):
         self._validate_advance_to_phase_2_live()
         self._phase = GamePhase.LIVE
         self._game_start_time = dt.datetime.now()
+        self._build_world()
         self.incr_game_frame()
 
+    def _build_world(self):
+        self._world_version += 1
+        self._world = {
+            "world_version": self._world_version,
+            "map_config": self._get_base_state()['map_config'],
+            "space_stations": self._space_stations,
+            "ore_mines": self._ore_mines,
+            "special_weapon_costs": self._special_weapon_costs,
+        }
+
+    def get_world(self) -> WorldDocument:
+        if self._world is None:
+            raise GameError("world is not built until the game is live")
+        return self._world
+
     def incr_game_frame(self):
         self._game_frame += 1
 
@@ -472,13 +581,27 @@ class Game(BaseModel):
             raise GameError("Cannot advance to phase 2 live unless in phase 1 starting")
 
 
+    def get_frame_throttle_seconds(self) -> float:
+        """ Seconds left before the next frame can run without exceeding MAX_SERVER_FPS.
+            Callers that can't block (asyncio) should wait this out before calling run_frame.
+        """
+        if self._last_frame_at is None or self._fixed_fps is not None:
+            return 0
+        ellapsed_seconds = (dt.datetime.now() - self._last_frame_at).total_seconds()
+        return max(0, MIN_ELAPSED_TIME_PER_FRAME - ellapsed_seconds)
+
     def run_frame(self, request: RunFrameDetails):
         """ Run frame phases and increment game frame number.
         """
 
         # Calculate Frame Per Second, throttle with sleep command if FPS is too high
         now_ts = dt.datetime.now()
-        if self._last_frame_at is None:
+        if self._fixed_fps is not None:
+            # No throttle, frames are simulated faster than real time.
+            self._frame_sleep = None
+            self._fps = self._fixed_fps
+
+        elif self._last_frame_at is None:
             if self._game_frame != 1:
                 raise Exception(
                     "Expected game_frame number to be 1 when _last_frame_at is None."
@@ -503,9 +626,14 @@ class Game(BaseModel):
                 self._fps = fps
                 self._last_frame_at = now_ts
 
-        if self._fps < MAX_SERVER_FPS:
+        if self._fps < MAX_SERVER_FPS and self._fixed_fps is None:
             self.logger.warn(f"FPS<30: {self._fps}")
 
+        # Throttle sleep is deliberately not part of the frame timings.
+        self.profiler.start_frame()
+
+        self._clear_spatial_indexes()
+
         # Process user commands.
         for command in request['commands']:
             try:
@@ -515,16 +643,24 @@ class Game(BaseModel):
                 self.logger.error(json.dumps(command))
                 tb = traceback.format_exc()
                 self.logger.error(tb)
+        self.profiler.lap("commands")
 
         self._ebeam_rays.clear()
-        check_for_gravity_brake_catches = self._game_frame % 4 == 0
-        check_for_ore_mine_parking = self._game_frame % 60 == 0
+        self._scheduler.start_frame(self._game_frame)
 
-        for ship_id in self._ships:
-            self._ships[ship_id].calculate_physics(self._fps, self._game_frame)
+        if len(self._ships) >= self._batched_physics_min_ships:
+            physics.calculate_ships_physics(list(self._ships.values()), self._fps, self._game_frame)
+        else:
+            for ship_id in self._ships:
+                self._ships[ship_id].calculate_physics(self._fps, self._game_frame)
+        self.profiler.lap("physics")
 
-        self._heading_cache.clear()
-        self._distance_cache.clear()
+        self.profiler.count("pair_cache_hits", self._pair_cache.hits)
+        self.profiler.count("pair_cache_misses", self._pair_cache.misses)
+        self._pair_cache.clear()
+        self._build_spatial_indexes()
+        self._record_ship_positions()
+        self.profiler.lap("spatial_index")
 
         for ship_id, ship in self._ships.items():
             ship.advance_upgrades(self._fps)
@@ -532,8 +668,13 @@ class Game(BaseModel):
             ship.adjust_resources(self._fps, self._game_frame)
             ship.advance_heading_traversal(self._fps)
             ship.advance_thermal_signature(self._fps)
-            self.reset_and_update_scanner_states(ship_id)
+        self.profiler.lap("ship_updates")
+
+        # Every ship scans the same snapshot of the other ships.
+        self.update_scanner_states()
+        self.profiler.lap("scanner")
 
+        for ship_id, ship in self._ships.items():
             # Autopilot/weapons updates must run after scanner/physics updates
             try:
                 ship.run_autopilot()
@@ -541,18 +682,16 @@ class Game(BaseModel):
                 self.logger.error(f"autopilot error (ship {ship_id}) {e}")
             self.calculate_weapons_and_damage(ship_id)
 
-            if check_for_gravity_brake_catches:
-                self.check_for_gravity_brake_catch(ship_id)
-
-            if check_for_ore_mine_parking:
-                self.check_for_ore_mine_parking(ship_id)
-                self.update_scouted_mine_ore_remaining(ship_id)
+            self._scheduler.run(PeriodicTask.GRAVITY_BRAKE_CATCH, ship_id, self.check_for_gravity_brake_catch, ship_id)
+            self._scheduler.run(PeriodicTask.ORE_MINE_PARKING, ship_id, self._update_ore_mine_parking, ship_id)
 
             self.advance_mining(ship_id)
+        self.profiler.lap("weapons")
 
         self.advance_magnet_mines(self._fps)
         self.advance_emps(self._fps)
         self.advance_hunter_drones(self._fps)
+        self.profiler.lap("projectiles")
 
         if any(self._explosions):
             self.advance_explosions()
@@ -560,18 +699,220 @@ class Game(BaseModel):
             self.advance_emp_blasts()
         if any(self._explosion_shockwaves):
             self.advance_explosion_shockwaves()
+        self.profiler.lap("explosions")
 
         # Post frame checks
-        if self._game_frame % 45 == 0:
-            if not self._winning_team:
-                self.check_for_winning_team()
-            self.check_for_empty_game()
-            self.purge_killfeed(MAX_SERVER_FPS)
+        for event_type, payload in self._timers.advance(self._game_frame):
+            self._handle_timer_event(event_type, payload)
+        self._scheduler.run(PeriodicTask.GAME_CHECKS, None, self._run_game_checks)
+        self._scheduler.end_frame()
+
+        self._clear_spatial_indexes()
+        self.profiler.lap("post_frame_checks")
+        self.profiler.end_frame()
 
         # Increment the game frame for the next frame.
         self.incr_game_frame()
 
 
+    def _build_spatial_indexes(self):
+        cell_size = constants.SPATIAL_INDEX_CELL_SIZE_METERS * self._map_units_per_meter
+        self._ship_index = SpatialHash(cell_size)
+        self._magnet_mine_index = SpatialHash(cell_size)
+        self._emp_index = SpatialHash(cell_size)
+        self._hunter_drone_index = SpatialHash(cell_size)
+        for index, entities in (
+            (self._ship_index, self._ships),
+            (self._magnet_mine_index, self._magnet_mines),
+            (self._emp_index, self._emps),
+            (self._hunter_drone_index, self._hunter_drones),
+        ):
+            for entity_id, entity in entities.items():
+                index.insert(entity_id, entity.coords)
+        self._max_ship_speed_meters_per_second = 0.0
+        self._max_ship_acceleration_ms = 0.0
+        for ship in self._ships.values():
+            self._max_ship_speed_meters_per_second = max(
+                self._max_ship_speed_meters_per_second,
+                math.hypot(ship.velocity_x_meters_per_second, ship.velocity_y_meters_per_second),
+            )
+            self._max_ship_acceleration_ms = max(
+                self._max_ship_acceleration_ms,
+                ship.max_engine_acceleration_ms,
+            )
+
+    def _record_ship_positions(self):
+        """ Record where every ship is this frame, so the swept fuze can sweep
+            from where ships really were at a projectile's last proximity check.
+        """
+        self._ship_position_history[self._game_frame] = (
+            self._max_ship_speed_meters_per_second,
+            {ship_id: ship.coords for ship_id, ship in self._ships.items()},
+        )
+        while len(self._ship_position_history) > self._proximity_check_max_defer_frames + 1:
+            del self._ship_position_history[next(iter(self._ship_position_history))]
+
+    def _clear_spatial_indexes(self):
+        self._ship_index = None
+        self._magnet_mine_index = None
+        self._emp_index = None
+        self._hunter_drone_index = None
+        self._autofire_indexes.clear()
+
+    def _get_ids_within(self, index: Optional[SpatialHash], entities: Dict, coords: Tuple, radius: float) -> List[str]:
+        """ Get IDs of entities that may be within radius (map units) of coords, in registry order.
+            Callers must still check the exact distance.
+        """
+        if index is None:
+            return list(entities)
+        return index.query_radius(coords, radius)
+
+    def _get_ship_ids_within(self, coords: Tuple, radius: float) -> List[str]:
+        return self._get_ids_within(self._ship_index, self._ships, coords, radius)
+
+    def _get_nearest_ship(self, coords: Tuple, predicate=None, max_radius: float = None) -> Tuple[Optional[str], Optional[float]]:
+        """ Get (ship_id, distance in map units) of the closest ship. Ties go to the first ship.
+        """
+        if self._ship_index is not None:
+            return self._ship_index.nearest(coords, predicate, max_radius)
+        closest_id, closest_distance = None, None
+        for ship_id in self._ships:
+            if predicate is not None and not predicate(ship_id):
+                continue
+            distance = utils2d.calculate_point_distance(coords, self._ships[ship_id].coords)
+            if max_radius is not None and distance > max_radius:
+                continue
+            if closest_id is None or distance < closest_distance:
+                closest_id, closest_distance = ship_id, distance
+        return closest_id, closest_distance
+
+    def _record_proximity_check(self, projectile: Union[MagnetMine, EMP, HunterDrone]):
+        projectile.proximity_checked_frame = self._game_frame
+        projectile.proximity_checked_coords = projectile.coords
+
+    def _get_swept_fuze_contact(
+        self,
+        projectile: Union[MagnetMine, EMP, HunterDrone],
+        trigger_radius: float,
+        ship_ids: Optional[List[str]] = None,
+        predicate=None,
+    ) -> Tuple[Optional[str], Optional[Tuple]]:
+        """ Proximity checks don't run every frame, so at high closing speeds a projectile
+            can pass through a ship's trigger radius (map units) between checks.
+            Check the segment the projectile swept since its last check against the
+            segment each ship swept over the same frames, from the ship's recorded position
+            at the last check (see _record_ship_positions) to its current position.
+            Ships without a recorded position are assumed to have kept their current velocity.
+
+            Returns (ship_id, fuze coords) of the first ship to come within trigger_radius.
+            Fuze coords are where the contact happened: the ship's position at contact plus
+            the projectile's offset from it. The ship may have moved on since.
+        """
+        if projectile.proximity_checked_frame is None:
+            return None, None
+        seconds = (self._game_frame - projectile.proximity_checked_frame) / self._fps
+        start_x, start_y = projectile.proximity_checked_coords
+        end_x, end_y = projectile.coords
+        max_ship_speed = self._max_ship_speed_meters_per_second
+        checked_ship_coords = {}
+        if projectile.proximity_checked_frame in self._ship_position_history:
+            checked_ship_coords = self._ship_position_history[projectile.proximity_checked_frame][1]
+            max_ship_speed = max(
+                speed
+                for game_frame, (speed, _) in self._ship_position_history.items()
+                if game_frame >= projectile.proximity_checked_frame
+            )
+        if ship_ids is None:
+            ship_ids = self._get_ship_ids_within(
+                projectile.coords,
+                trigger_radius
+                + math.hypot(end_x - start_x, end_y - start_y)
+                + max_ship_speed * seconds * self._map_units_per_meter,
+            )
+        contact_ship_id, contact_t, contact_coords = None, None, None
+        for ship_id in ship_ids:
+            if predicate is not None and not predicate(ship_id):
+                continue
+            ship = self._ships[ship_id]
+            ship_x, ship_y = ship.coords
+            checked_coords = checked_ship_coords.get(ship_id)
+            if checked_coords is None:
+                checked_coords = (
+                    ship_x - ship.velocity_x_meters_per_second * seconds * self._map_units_per_meter,
+                    ship_y - ship.velocity_y_meters_per_second * seconds * self._map_units_per_meter,
+                )
+            rel_start = (start_x - checked_coords[0], start_y - checked_coords[1])
+            rel_end = (end_x - ship_x, end_y - ship_y)
+            t = utils2d.calculate_swept_contact(rel_start, rel_end, trigger_radius)
+            if t is not None and (contact_t is None or t < contact_t):
+                contact_ship_id, contact_t = ship_id, t
+                contact_ship_x = checked_coords[0] + (ship_x - checked_coords[0]) * t
+                contact_ship_y = checked_coords[1] + (ship_y - checked_coords[1]) * t
+                contact_coords = (
+                    contact_ship_x + rel_start[0] + (rel_end[0] - rel_start[0]) * t,
+                    contact_ship_y + rel_start[1] + (rel_end[1] - rel_start[1]) * t,
+                )
+        return contact_ship_id, contact_coords
+
+    def _defer_proximity_checks(
+        self,
+        task: str,
+        projectile: Union[MagnetMine, EMP, HunterDrone],
+        gap: Optional[float],
+        max_acceleration_ms: float,
+        ship: Optional[Ship] = None,
+    ):
+        """ Skip the projectile's proximity checks until the earliest frame a ship could
+            come within its trigger radius. gap (map units) is the distance from the nearest
+            ship to the edge of the trigger radius, None if there's no ship to check against.
+
+            Closing speed is bounded by the projectile's speed plus the ship's, closing
+            acceleration by the projectile's max acceleration plus the ship's engine. The fastest
+            ship/strongest engine this frame are used unless a ship is given.
+            Delta-v from shockwaves and tube weapon recoil isn't bounded, so deferrals are capped
+            and end early when either pushes a ship (see _end_proximity_check_deferrals). The swept fuze
+            still catches ships passed in between, along straight lines from their recorded
+            positions at the last check.
+        """
+        if self._ship_index is None:
+            # Fastest ship/strongest engine are only known inside run_frame.
+            return
+        frames = self._proximity_check_max_defer_frames
+        if gap is not None:
+            if ship is None:
+                ship_speed = self._max_ship_speed_meters_per_second
+                ship_acceleration = self._max_ship_acceleration_ms
+            else:
+                ship_speed = math.hypot(ship.velocity_x_meters_per_second, ship.velocity_y_meters_per_second)
+                ship_acceleration = ship.max_engine_acceleration_ms
+            seconds = utils2d.calculate_earliest_contact_seconds(
+                gap / self._map_units_per_meter,
+                math.hypot(projectile.velocity_x_meters_per_second, projectile.velocity_y_meters_per_second) + ship_speed,
+                max_acceleration_ms + ship_acceleration,
+            )
+            if seconds is not None:
+                frames = min(frames, int(seconds * self._fps))
+        if frames > self._scheduler.tasks[task]:
+            self._scheduler.defer(task, projectile.id, self._game_frame + frames)
+
+    def _end_proximity_check_deferrals(self, pushed_ships: List[Ship]):
+        """ Ships were pushed faster than their engines can accelerate (IE recoil or a shockwave).
+            Every projectile's proximity checks are due on their own frames again, and
+            checks deferred later this frame see the pushed ships' speeds.
+        """
+        for ship in pushed_ships:
+            self._max_ship_speed_meters_per_second = max(
+                self._max_ship_speed_meters_per_second,
+                math.hypot(ship.velocity_x_meters_per_second, ship.velocity_y_meters_per_second),
+            )
+        for task, projectiles in (
+            (PeriodicTask.MAGNET_MINE_PROXIMITY, self._magnet_mines),
+            (PeriodicTask.EMP_PROXIMITY, self._emps),
+            (PeriodicTask.HUNTER_DRONE_PROXIMITY, self._hunter_drones),
+        ):
+            for projectile_id in projectiles:
+                self._scheduler.defer(task, projectile_id, None)
+
     def _shock_wave_delta_v_calculator(self, distance: float) -> float:
         # calculate total magnitude a shockwave should have on an element
         # relative to the distance from the shock wave's center
@@ -584,7 +925,7 @@ class Game(BaseModel):
         delta_radius = constants.SPEED_OF_SOUND_METERS_PER_SECOND / self._fps
         ix_to_remove = set()
         sw_ids_to_remove = set()
-        check_for_sw_physics = self._is_testing or self._game_frame % 5 == 0
+        pushed_ships = []
         for ix, esw in enumerate(self._explosion_shockwaves):
             # Adjust radius of shockwave
             new_radius = esw['radius_meters'] + delta_radius
@@ -595,36 +936,45 @@ class Game(BaseModel):
                 self._explosion_shockwaves[ix]['radius_meters'] = new_radius
 
             # adjust ship velocities if they have been struck by the shock wave
-            if check_for_sw_physics:
-                for ship_id in self._ships:
-                    if (
-                        ship_id in self._ships_hit_by_shockwave[esw['id']]
-                        or self._ships[ship_id].exploded
-                        or self._ships[ship_id].docked_at_station
-                        or self._ships[ship_id].docking_at_station
-                    ):
-                        continue
-                    distance_meters = utils2d.calculate_point_distance(
-                        self._ships[ship_id].coords,
+            if self._scheduler.is_due(PeriodicTask.SHOCKWAVE_PHYSICS, esw['id']):
+                with self._scheduler.timed(PeriodicTask.SHOCKWAVE_PHYSICS):
+                    for ship_id in self._get_ship_ids_within(
                         esw['origin_point'],
-                    ) / self._map_units_per_meter
-                    if distance_meters <= esw['radius_meters']:
-                        self._ships_hit_by_shockwave[esw['id']].add(ship_id)
-                        acc_heading = utils2d.calculate_heading_to_point(
-                            esw['origin_point'],
-                            self._ships[ship_id].coords
-                        )
-                        delta_v_meters = self._shock_wave_delta_v_calculator(distance_meters)
-                        if not delta_v_meters > 0:
+                        esw['radius_meters'] * self._map_units_per_meter,
+                    ):
+                        if (
+                            ship_id in self._ships_hit_by_shockwave[esw['id']]
+                            or self._ships[ship_id].exploded
+                            or self._ships[ship_id].docked_at_station
+                            or self._ships[ship_id].docking_at_station
+                        ):
                             continue
-                        fx_meters, fy_meters = utils2d.calculate_x_y_components(
-                            delta_v_meters,
-                            acc_heading,
-                        )
-                        # No FPS calculation here, acceleration is instant
-                        # and occurs over a single frame.
-                        self._ships[ship_id].velocity_x_meters_per_second += fx_meters
-                        self._ships[ship_id].velocity_y_meters_per_second += fy_meters
+                        distance_meters = utils2d.calculate_point_distance(
+                            self._ships[ship_id].coords,
+                            esw['origin_point'],
+                        ) / self._map_units_per_meter
+                        if distance_meters <= esw['radius_meters']:
+                            self._ships_hit_by_shockwave[esw['id']].add(ship_id)
+                            acc_heading = utils2d.calculate_heading_to_point(
+                                esw['origin_point'],
+                                self._ships[ship_id].coords
+                            )
+                            delta_v_meters = self._shock_wave_delta_v_calculator(distance_meters)
+                            if not delta_v_meters > 0:
+                                continue
+                            fx_meters, fy_meters = utils2d.calculate_x_y_components(
+                                delta_v_meters,
+                                acc_heading,
+                            )
+                            # No FPS calculation here, acceleration is instant
+                            # and occurs over a single frame.
+                            self._ships[ship_id].velocity_x_meters_per_second += fx_meters
+                            self._ships[ship_id].velocity_y_meters_per_second += fy_meters
+                            pushed_ships.append(self._ships[ship_id])
+
+        if pushed_ships:
+            # Proximity checks were deferred assuming ships can't outrun their engines.
+            self._end_proximity_check_deferrals(pushed_ships)
 
         if ix_to_remove:
             self._explosion_shockwaves = [
@@ -637,6 +987,8 @@ class Game(BaseModel):
                 for k, v in self._ships_hit_by_shockwave.items()
                 if k not in sw_ids_to_remove
             }
+            for sw_id in sw_ids_to_remove:
+                self._scheduler.forget(sw_id)
 
     def advance_explosions(self):
         ix_to_remove = []
@@ -665,7 +1017,7 @@ class Game(BaseModel):
         fade_ms: int,
         extras={}
     ):
-        shockwave_id = str(uuid4())
+        shockwave_id = self._ids.next_id(EntityIdPrefix.EXPLOSION_SHOCKWAVE)
         self._explosion_shockwaves.append({
             "id": shockwave_id,
             "origin_point": origin_point,
@@ -673,7 +1025,7 @@ class Game(BaseModel):
         })
         self._ships_hit_by_shockwave[shockwave_id] = set()
         self._explosions.append({
-            "id": str(uuid4()),
+            "id": self._ids.next_id(EntityIdPrefix.EXPLOSION),
             "origin_point": origin_point,
             "radius_meters": 1,
             "max_radius_meters": max_radius_meters,
@@ -699,26 +1051,31 @@ class Game(BaseModel):
                 if ix not in ix_to_remove
             ]
 
-    def reset_and_update_scanner_states(self, ship_id: str):
-
+    def _reset_scanner_data(self, ship_id: str):
         self._ships[ship_id].scanner_ship_data.clear()
         self._ships[ship_id].scanner_magnet_mine_data.clear()
         self._ships[ship_id].scanner_emp_data.clear()
         self._ships[ship_id].scanner_hunter_drone_data.clear()
 
+    def reset_and_update_scanner_states(self, ship_id: str):
+
+        self._reset_scanner_data(ship_id)
+
         ship_coords = self._ships[ship_id].coords
         scan_range = self._ships[ship_id].scanner_range if self._ships[ship_id].scanner_online else None
         visual_range = self._ships[ship_id].visual_range
+        # Distances are rounded to the nearest meter before being compared to ranges.
+        query_radius = (max(visual_range, scan_range or 0) + 1) * self._map_units_per_meter
 
         # Add ships to scanner data
-        for other_id in (v for v in self._ships if v != ship_id):
+        for other_id in (v for v in self._get_ship_ids_within(ship_coords, query_radius) if v != ship_id):
 
             if self._ships[other_id]._removed_from_map:
                 continue
 
             other_coords = self._ships[other_id].coords
 
-            distance = self._distance_cache.get_val(ship_coords, other_coords)
+            distance = self._pair_cache.get_distance(ship_id, ship_coords, other_id, other_coords)
             distance_meters = round(distance / self._map_units_per_meter)
 
             is_visual = visual_range >= distance_meters
@@ -746,60 +1103,147 @@ class Game(BaseModel):
                 is_scannable = False
 
             if is_visual or is_scannable:
-                exact_heading = self._heading_cache.get_val(ship_coords, other_coords)
-                other_scanner_online = self._ships[other_id].scanner_online
-                other_scanner_mode = self._ships[other_id].scanner_mode
-                scanner_ship_data: ScannedShipElement = {
-                    'id': other_id,
-                    'skin_slug': self._ships[other_id].skin_slug,
-                    'designator': self._ships[other_id].scanner_designator,
-                    'anti_radar_coating_level': self._ships[other_id].anti_radar_coating_level,
-                    'scanner_thermal_signature': self._ships[other_id].scanner_thermal_signature,
-                    'visual_scanner_mode': other_scanner_mode if other_scanner_online else None,
-                    'visual_scanner_sensitivity': (
-                        self._ships[other_id].scanner_radar_sensitivity
-                        if other_scanner_online and other_scanner_mode == ShipScannerMode.RADAR
-                        else None
-                    ),
-                    'visual_scanner_range_meters': self._ships[other_id].scanner_range if other_scanner_online else None,
-                    'coord_x': other_coords[0],
-                    'coord_y': other_coords[1],
-                    'visual_heading': self._ships[other_id].heading,
-                    'visual_map_nose_coord': self._ships[other_id].map_nose_coord,
-                    'visual_map_bottom_left_coord': self._ships[other_id].map_bottom_left_coord,
-                    'visual_map_bottom_right_coord': self._ships[other_id].map_bottom_right_coord,
-                    'visual_map_bottom_center_coord': self._ships[other_id].map_bottom_center_coord,
-                    'velocity_x_meters_per_second': self._ships[other_id].velocity_x_meters_per_second,
-                    'velocity_y_meters_per_second': self._ships[other_id].velocity_y_meters_per_second,
-                    'alive': self._ships[other_id].died_on_frame is None,
-                    'aflame': self._ships[other_id].aflame_since_frame is not None,
-                    'exploded': self._ships[other_id].exploded,
-                    'in_visual_range': is_visual,
-                    'visual_ebeam_charge_percent': self._ships[other_id].ebeam_charge / self._ships[other_id].ebeam_charge_capacity,
-                    'visual_engine_lit': self._ships[other_id].engine_lit,
-                    'visual_engine_boosted_last_frame': self._ships[other_id].engine_boosted_last_frame,
-                    'visual_ebeam_firing': self._ships[other_id].ebeam_firing,
-                    'visual_gravity_brake_position': self._ships[other_id].gravity_brake_position,
-                    'visual_gravity_brake_deployed_position': self._ships[other_id].gravity_brake_deployed_position,
-                    'visual_gravity_brake_active': self._ships[other_id].gravity_brake_active,
-                    'visual_mining_ore_location': (
-                        self._ships[other_id].parked_at_ore_mine
-                        if self._ships[other_id].mining_ore
-                        else None
-                    ),
-                    'visual_fueling_at_station': self._ships[other_id].fueling_at_station,
-                    "visual_last_tube_fire_frame": self._ships[other_id].last_tube_fire_frame,
-                    "distance": round(distance_meters),
-                    "relative_heading": round(exact_heading),
-                    "target_heading": exact_heading,
-                }
+                exact_heading = self._pair_cache.get_heading(ship_id, ship_coords, other_id, other_coords)
+                self._ships[ship_id].scanner_ship_data[other_id] = self._build_scanned_ship_element(
+                    other_id,
+                    distance_meters,
+                    is_visual,
+                    exact_heading,
+                )
+
+        self._update_scanner_projectile_data(ship_id)
+        self._update_scanner_lock_state(ship_id)
 
-                self._ships[ship_id].scanner_ship_data[other_id] = scanner_ship_data
+    def update_scanner_states(self):
+        """ Batched reset_and_update_scanner_states() for every ship.
+            Ship to ship distances and visibility masks are computed for all
+            pairs at once, scanner elements are only built for visible pairs.
+        """
+        ship_ids = list(self._ships)
+        if not ship_ids:
+            return
+        ships = [self._ships[ship_id] for ship_id in ship_ids]
+
+        coords = np.array([ship.coords for ship in ships], dtype=np.float64)
+        # [i, j] = component of vector from ship i to ship j
+        dx = coords[:, 0][np.newaxis, :] - coords[:, 0][:, np.newaxis]
+        dy = coords[:, 1][np.newaxis, :] - coords[:, 1][:, np.newaxis]
+        # Same operations as utils2d.calculate_point_distance, and np.round
+        # rounds half to even like round(), so results are bit identical.
+        distance_meters = np.round(np.sqrt(dx * dx + dy * dy) / self._map_units_per_meter)
+
+        scanner_online = np.array([ship.scanner_online for ship in ships])
+        visual_range = np.array([ship.visual_range for ship in ships])
+        scan_range = np.array([ship.scanner_range for ship in ships])
+        is_ir = np.array([ship.scanner_mode == ShipScannerMode.IR for ship in ships])
+        is_radar = np.array([ship.scanner_mode == ShipScannerMode.RADAR for ship in ships])
+        ir_minimum = np.array([ship.scanner_ir_minimum_thermal_signature for ship in ships])
+        radar_sensitivity = np.array([ship.scanner_radar_sensitivity for ship in ships])
+        thermal_signature = np.array([ship.scanner_thermal_signature for ship in ships])
+        anti_radar_coating = np.array([ship.anti_radar_coating_level for ship in ships])
+        on_map = np.array([not ship._removed_from_map for ship in ships])
+
+        # Rows are the scanning ship, columns are the scanned ship.
+        is_visual = visual_range[:, np.newaxis] >= distance_meters
+        is_scannable = scanner_online[:, np.newaxis] & (scan_range[:, np.newaxis] >= distance_meters)
+        scan_only = is_scannable & ~is_visual
+        ir_too_cold = (
+            scan_only
+            & is_ir[:, np.newaxis]
+            & ~(thermal_signature[np.newaxis, :] >= ir_minimum[:, np.newaxis])
+        )
+        radar_stealthed = (
+            scan_only
+            & is_radar[:, np.newaxis]
+            & (anti_radar_coating[np.newaxis, :] > radar_sensitivity[:, np.newaxis])
+        )
+        visible = (is_visual | (is_scannable & ~ir_too_cold & ~radar_stealthed)) & on_map[np.newaxis, :]
+        np.fill_diagonal(visible, False)
+
+        distance_meters = distance_meters.tolist()
+        is_visual = is_visual.tolist()
+        for ix, ship_id in enumerate(ship_ids):
+            self._reset_scanner_data(ship_id)
+            ship_coords = ships[ix].coords
+            for other_ix in np.flatnonzero(visible[ix]).tolist():
+                other_id = ship_ids[other_ix]
+                exact_heading = self._pair_cache.get_heading(ship_id, ship_coords, other_id, ships[other_ix].coords)
+                ships[ix].scanner_ship_data[other_id] = self._build_scanned_ship_element(
+                    other_id,
+                    int(distance_meters[ix][other_ix]),
+                    is_visual[ix][other_ix],
+                    exact_heading,
+                )
+            self._update_scanner_projectile_data(ship_id)
+            self._update_scanner_lock_state(ship_id)
+
+    def _build_scanned_ship_element(
+        self,
+        other_id: str,
+        distance_meters: int,
+        is_visual: bool,
+        exact_heading: float,
+    ) -> ScannedShipElement:
+        other_coords = self._ships[other_id].coords
+        other_scanner_online = self._ships[other_id].scanner_online
+        other_scanner_mode = self._ships[other_id].scanner_mode
+        nose_coord, bottom_left_coord, bottom_center_coord, bottom_right_coord = self._ships[other_id].hitbox_coords
+        return {
+            'id': other_id,
+            'skin_slug': self._ships[other_id].skin_slug,
+            'designator': self._ships[other_id].scanner_designator,
+            'anti_radar_coating_level': self._ships[other_id].anti_radar_coating_level,
+            'scanner_thermal_signature': self._ships[other_id].scanner_thermal_signature,
+            'visual_scanner_mode': other_scanner_mode if other_scanner_online else None,
+            'visual_scanner_sensitivity': (
+                self._ships[other_id].scanner_radar_sensitivity
+                if other_scanner_online and other_scanner_mode == ShipScannerMode.RADAR
+                else None
+            ),
+            'visual_scanner_range_meters': self._ships[other_id].scanner_range if other_scanner_online else None,
+            'coord_x': other_coords[0],
+            'coord_y': other_coords[1],
+            'visual_heading': self._ships[other_id].heading,
+            'visual_map_nose_coord': nose_coord,
+            'visual_map_bottom_left_coord': bottom_left_coord,
+            'visual_map_bottom_right_coord': bottom_right_coord,
+            'visual_map_bottom_center_coord': bottom_center_coord,
+            'velocity_x_meters_per_second': self._ships[other_id].velocity_x_meters_per_second,
+            'velocity_y_meters_per_second': self._ships[other_id].velocity_y_meters_per_second,
+            'alive': self._ships[other_id].died_on_frame is None,
+            'aflame': self._ships[other_id].aflame_since_frame is not None,
+            'exploded': self._ships[other_id].exploded,
+            'in_visual_range': is_visual,
+            'visual_ebeam_charge_percent': self._ships[other_id].ebeam_charge / self._ships[other_id].ebeam_charge_capacity,
+            'visual_engine_lit': self._ships[other_id].engine_lit,
+            'visual_engine_boosted_last_frame': self._ships[other_id].engine_boosted_last_frame,
+            'visual_ebeam_firing': self._ships[other_id].ebeam_firing,
+            'visual_gravity_brake_position': self._ships[other_id].gravity_brake_position,
+            'visual_gravity_brake_deployed_position': self._ships[other_id].gravity_brake_deployed_position,
+            'visual_gravity_brake_active': self._ships[other_id].gravity_brake_active,
+            'visual_mining_ore_location': (
+                self._ships[other_id].parked_at_ore_mine
+                if self._ships[other_id].mining_ore
+                else None
+            ),
+            'visual_fueling_at_station': self._ships[other_id].fueling_at_station,
+            "visual_last_tube_fire_frame": self._ships[other_id].last_tube_fire_frame,
+            "distance": round(distance_meters),
+            "relative_heading": round(exact_heading),
+            "target_heading": exact_heading,
+        }
+
+    def _update_scanner_projectile_data(self, ship_id: str):
+        ship_coords = self._ships[ship_id].coords
+        scan_range = self._ships[ship_id].scanner_range if self._ships[ship_id].scanner_online else None
+        visual_range = self._ships[ship_id].visual_range
+        # Distances are rounded to the nearest meter before being compared to ranges.
+        query_radius = (max(visual_range, scan_range or 0) + 1) * self._map_units_per_meter
 
         # Add magnet mines to scanner data
-        for mm_id in self._magnet_mines:
+        for mm_id in self._get_ids_within(self._magnet_mine_index, self._magnet_mines, ship_coords, query_radius):
             mine_coords = self._magnet_mines[mm_id].coords
-            distance = utils2d.calculate_point_distance(ship_coords, mine_coords)
+            distance = self._pair_cache.get_distance(ship_id, ship_coords, mm_id, mine_coords)
             distance_meters = round(distance / self._map_units_per_meter)
             is_visual = visual_range >= distance_meters
             is_scannable = (
@@ -808,7 +1252,7 @@ class Game(BaseModel):
                 and self._ships[ship_id].scanner_mode == ShipScannerMode.RADAR
             )
             if is_visual or is_scannable:
-                exact_heading = utils2d.calculate_heading_to_point(ship_coords, mine_coords)
+                exact_heading = self._pair_cache.get_heading(ship_id, ship_coords, mm_id, mine_coords)
                 self._ships[ship_id].scanner_magnet_mine_data[mm_id] = {
                     'id': mm_id,
                     'velocity_x_meters_per_second': self._magnet_mines[mm_id].velocity_x_meters_per_second,
@@ -822,9 +1266,9 @@ class Game(BaseModel):
                 }
 
         # Add EMPs to scanner data
-        for emp_id in self._emps:
+        for emp_id in self._get_ids_within(self._emp_index, self._emps, ship_coords, query_radius):
             emp_coords = self._emps[emp_id].coords
-            distance = utils2d.calculate_point_distance(ship_coords, emp_coords)
+            distance = self._pair_cache.get_distance(ship_id, ship_coords, emp_id, emp_coords)
             distance_meters = round(distance / self._map_units_per_meter)
             is_visual = visual_range >= distance_meters
             is_scannable = (
@@ -833,7 +1277,7 @@ class Game(BaseModel):
                 and self._ships[ship_id].scanner_mode == ShipScannerMode.RADAR
             )
             if is_visual or is_scannable:
-                exact_heading = utils2d.calculate_heading_to_point(ship_coords, emp_coords)
+                exact_heading = self._pair_cache.get_heading(ship_id, ship_coords, emp_id, emp_coords)
                 self._ships[ship_id].scanner_emp_data[emp_id] = {
                     'id': emp_id,
                     'coord_x': emp_coords[0],
@@ -844,9 +1288,9 @@ class Game(BaseModel):
                 }
 
         # Add Hunter Drones to scanner data
-        for hd_id in self._hunter_drones:
+        for hd_id in self._get_ids_within(self._hunter_drone_index, self._hunter_drones, ship_coords, query_radius):
             drone_coords = self._hunter_drones[hd_id].coords
-            distance = utils2d.calculate_point_distance(ship_coords, drone_coords)
+            distance = self._pair_cache.get_distance(ship_id, ship_coords, hd_id, drone_coords)
             distance_meters = round(distance / self._map_units_per_meter)
             is_visual = visual_range >= distance_meters
             is_scannable = (
@@ -854,7 +1298,7 @@ class Game(BaseModel):
                 and scan_range >= distance_meters
             )
             if is_visual or is_scannable:
-                exact_heading = utils2d.calculate_heading_to_point(ship_coords, drone_coords)
+                exact_heading = self._pair_cache.get_heading(ship_id, ship_coords, hd_id, drone_coords)
                 self._ships[ship_id].scanner_hunter_drone_data[hd_id] = {
                     'id': hd_id,
                     'coord_x': drone_coords[0],
@@ -868,6 +1312,7 @@ class Game(BaseModel):
                     'visual_map_bottom_center_coord': self._hunter_drones[hd_id].map_bottom_center_coord,
                 }
 
+    def _update_scanner_lock_state(self, ship_id: str):
         # Check if scanner target has gone out of range
         if self._ships[ship_id].scanner_lock_target and self._ships[ship_id].scanner_lock_target not in self._ships[ship_id].scanner_ship_data:
             self._ships[ship_id].scanner_lock_traversal_slack = None
@@ -923,10 +1368,7 @@ class Game(BaseModel):
         ix_frames_since_death = 1
 
         if death_data and death_data[ix_frames_since_death] == 0:
-            self._killfeed.append({
-                "created_at_frame": self._game_frame,
-                "victim_name": self._ships[ship_id].scanner_designator,
-            })
+            self._add_killfeed_entry(self._ships[ship_id].scanner_designator)
         if death_data and death_data[ix_visual_type] == ShipDeathType.EXPLOSION_NEW:
             is_firey = self._ships[ship_id].fuel_level > 6000
             self.register_explosion_on_map(
@@ -939,18 +1381,14 @@ class Game(BaseModel):
         if death_data:
             return
 
-        if self._game_frame % 2 == 0:
-            collision_type = next(self._collision_cycle)
+        for collision_type in self._collision_types:
             death_data = self._advance_collisions(
                 ship_id,
                 collision_type,
             )
             if death_data:
                 is_firey = self._ships[ship_id].fuel_level > 6000
-                self._killfeed.append({
-                    "created_at_frame": self._game_frame,
-                    "victim_name": self._ships[ship_id].scanner_designator,
-                })
+                self._add_killfeed_entry(self._ships[ship_id].scanner_designator)
                 if death_data[ix_visual_type] == ShipDeathType.EXPLOSION_NEW:
                     self.register_explosion_on_map(
                         self._ships[ship_id].coords,
@@ -975,10 +1413,7 @@ class Game(BaseModel):
                     self._ships[ship_id].ebeam_last_hit_frame = self._game_frame
                 for hit_ship_id in hits:
                     self._ships[hit_ship_id].die(self._game_frame)
-                    self._killfeed.append({
-                        "created_at_frame": self._game_frame,
-                        "victim_name": self._ships[hit_ship_id].scanner_designator,
-                    })
+                    self._add_killfeed_entry(self._ships[hit_ship_id].scanner_designator)
 
         elif self._ships[ship_id].ebeam_autofire_enabled:
             if self._ships[ship_id].ebeam_charge < self._ships[ship_id].ebeam_charge_fire_minimum:
@@ -998,10 +1433,7 @@ class Game(BaseModel):
                         self._ships[ship_id].ebeam_last_hit_frame = self._game_frame
                     for hit_ship_id in hits:
                         self._ships[hit_ship_id].die(self._game_frame)
-                        self._killfeed.append({
-                            "created_at_frame": self._game_frame,
-                            "victim_name": self._ships[hit_ship_id].scanner_designator,
-                        })
+                        self._add_killfeed_entry(self._ships[hit_ship_id].scanner_designator)
                 else:
                     print("not enough charge", self._fps, self._ships[ship_id].ebeam_charge)
                     self._ships[ship_id].ebeam_autofire_enabled = False
@@ -1014,7 +1446,7 @@ class Game(BaseModel):
             # Spawn a new magnet mine.
             self._ships[ship_id].magnet_mine_firing = False
             self._ships[ship_id].last_tube_fire_frame = self._game_frame
-            mine = MagnetMine(self._game_frame, ship_id)
+            mine = MagnetMine(self._game_frame, ship_id, self._ids.next_id(EntityIdPrefix.MAGNET_MINE))
             extra_x, extra_y = utils2d.calculate_x_y_components(
                 self._ships[ship_id].magnet_mine_launch_velocity,
                 self._ships[ship_id].heading,
@@ -1023,13 +1455,15 @@ class Game(BaseModel):
             mine.velocity_y_meters_per_second = extra_y + self._ships[ship_id].velocity_y_meters_per_second
             mine.coord_x, mine.coord_y =  self._ships[ship_id].map_nose_coord
             self._magnet_mines[mine.id] = mine
+            if self._magnet_mine_index is not None:
+                self._magnet_mine_index.insert(mine.id, mine.coords)
             apply_tubeweapon_recoil = not self._ships[ship_id].recoilless_tube_launches
 
         elif self._ships[ship_id].emp_firing:
             # Spawn a new EMP
             self._ships[ship_id].emp_firing = False
             self._ships[ship_id].last_tube_fire_frame = self._game_frame
-            emp = EMP(self._game_frame, ship_id)
+            emp = EMP(self._game_frame, ship_id, self._ids.next_id(EntityIdPrefix.EMP))
             extra_x, extra_y = utils2d.calculate_x_y_components(
                 self._ships[ship_id].emp_launch_velocity_ms,
                 self._ships[ship_id].heading,
@@ -1038,6 +1472,8 @@ class Game(BaseModel):
             emp.velocity_y_meters_per_second = extra_y + self._ships[ship_id].velocity_y_meters_per_second
             emp.coord_x, emp.coord_y =  self._ships[ship_id].map_nose_coord
             self._emps[emp.id] = emp
+            if self._emp_index is not None:
+                self._emp_index.insert(emp.id, emp.coords)
             apply_tubeweapon_recoil = not self._ships[ship_id].recoilless_tube_launches
 
         elif self._ships[ship_id].hunter_drone_firing:
@@ -1061,8 +1497,11 @@ class Game(BaseModel):
                 start_y,
                 self._ships[ship_id]._hunter_drone_max_target_acquisition_distance_meters,
                 self._ships[ship_id]._hunter_drone_tracking_acceleration_ms,
+                self._ids.next_id(EntityIdPrefix.HUNTER_DRONE),
             )
             self._hunter_drones[hunter_drone.id] = hunter_drone
+            if self._hunter_drone_index is not None:
+                self._hunter_drone_index.insert(hunter_drone.id, hunter_drone.coords)
             apply_tubeweapon_recoil = not self._ships[ship_id].recoilless_tube_launches
 
         if apply_tubeweapon_recoil:
@@ -1072,6 +1511,8 @@ class Game(BaseModel):
             )
             self._ships[ship_id].velocity_x_meters_per_second += recoil_x
             self._ships[ship_id].velocity_y_meters_per_second += recoil_y
+            # Proximity checks were deferred assuming ships can't outrun their engines.
+            self._end_proximity_check_deferrals([self._ships[ship_id]])
 
 
     def advance_magnet_mines(self, fps: int):
@@ -1079,95 +1520,122 @@ class Game(BaseModel):
         self._magnet_mine_targeting_lines.clear()
         arm_time_ms = self._magnet_mine_arming_time_seconds * 1000
 
-        # Check if mine is within explosion range of any ship
-        # and check if mine should accelerate towards a new target.
-        check_proximity = self._is_testing or self._game_frame % 3 == 0
-
-        for mm_id in self._magnet_mines:
-
-            if self._magnet_mines[mm_id].exploded:
+        live_ids = []
+        for mm_id, mine in self._magnet_mines.items():
+            if mine.exploded:
                 keys_to_drop.append(mm_id)
-                continue
-
-            self._magnet_mines[mm_id].elapsed_milliseconds += (1000 / fps)
+            else:
+                live_ids.append(mm_id)
+
+        # Advance timers of every live mine at once.
+        table = self._projectile_table
+        slots = get_slots((self._magnet_mines[mm_id] for mm_id in live_ids), table)
+        table.elapsed_milliseconds[slots] += (1000 / fps)
+        past_arm_time = (table.elapsed_milliseconds[slots] > arm_time_ms).tolist()
+        percent_armed = (table.elapsed_milliseconds[slots] / arm_time_ms).tolist()
+        # Read columns once, table backed attributes are slower to read than lists.
+        elapsed_milliseconds = table.elapsed_milliseconds[slots].tolist()
+        mine_coords = list(zip(table.coord_x[slots].tolist(), table.coord_y[slots].tolist()))
+        moving = np.ones(len(live_ids), dtype=bool)
+
+        for ix, mm_id in enumerate(live_ids):
+            coords = mine_coords[ix]
 
             # Arm the mine if enough time has passed
             if (
                 not self._magnet_mines[mm_id].armed
-                and self._magnet_mines[mm_id].elapsed_milliseconds > arm_time_ms
+                and past_arm_time[ix]
             ):
                 self._magnet_mines[mm_id].armed = True
                 self._magnet_mines[mm_id].percent_armed = 1
 
             elif not self._magnet_mines[mm_id].armed:
-                self._magnet_mines[mm_id].percent_armed = (
-                    self._magnet_mines[mm_id].elapsed_milliseconds / arm_time_ms
-                )
+                self._magnet_mines[mm_id].percent_armed = percent_armed[ix]
 
             explode_mine = False
+            fuze_ship_id = None
             if self._magnet_mines[mm_id].armed:
                 trigger_radius = self._magnet_mine_max_proximity_to_explode_meters * self._map_units_per_meter
                 damage_radius = self._magnet_mine_explode_damage_radius_meters * self._map_units_per_meter
-                ship_id_distance_pairs = None
-                if check_proximity or self._magnet_mines[mm_id].closest_ship_id is None:
-                    # create ship, distance pairs
-                    # sorted by shortest distance to longest distance.
-                    ship_id_distance_pairs = sorted([
-                        (
-                            ship_id,
-                            utils2d.calculate_point_distance(
-                                self._magnet_mines[mm_id].coords,
-                                self._ships[ship_id].coords,
-                            )
+                proximity_due = self._scheduler.is_due(PeriodicTask.MAGNET_MINE_PROXIMITY, mm_id)
+                if (
+                    proximity_due
+                    or self._scheduler.is_due(PeriodicTask.MAGNET_MINE_TARGETING, mm_id)
+                    or self._magnet_mines[mm_id].closest_ship_id is None
+                ):
+                    # Target mine towards closest ship. Proximity checks can be deferred,
+                    # targeting isn't so the mine keeps homing on the closest ship.
+                    with self._scheduler.timed(PeriodicTask.MAGNET_MINE_TARGETING):
+                        closest_ship_id, closest_distance = self._get_nearest_ship(
+                            coords,
+                            lambda ship_id: not self._ships[ship_id].exploded,
                         )
-                        for ship_id in self._ships
-                        if not self._ships[ship_id].exploded
-                    ], key=lambda pair: pair[1])
-
-                    # Explode mine if close enough to target
-                    # if nothing close enough, target mine towards closest ship.
-                    if any(ship_id_distance_pairs):
-                        self._magnet_mines[mm_id].closest_ship_id = ship_id_distance_pairs[0][0]
-                        self._magnet_mines[mm_id].distance_to_closest_ship = ship_id_distance_pairs[0][1]
-                        if ship_id_distance_pairs[0][1] <= trigger_radius:
-                            explode_mine = True
+                        if closest_ship_id is not None:
+                            self._magnet_mines[mm_id].closest_ship_id = closest_ship_id
+                            self._magnet_mines[mm_id].distance_to_closest_ship = closest_distance
+                if proximity_due:
+                    with self._scheduler.timed(PeriodicTask.MAGNET_MINE_PROXIMITY):
+                        # Explode mine if close enough to target
+                        explode_mine = closest_ship_id is not None and closest_distance <= trigger_radius
+                        if not explode_mine:
+                            # Explode mine if it passed a ship since the last check.
+                            fuze_ship_id, fuze_coords = self._get_swept_fuze_contact(
+                                self._magnet_mines[mm_id],
+                                trigger_radius,
+                                predicate=lambda ship_id: not self._ships[ship_id].exploded,
+                            )
+                            if fuze_ship_id is not None:
+                                explode_mine = True
+                                self._magnet_mines[mm_id].coord_x, self._magnet_mines[mm_id].coord_y = fuze_coords
+                                coords = fuze_coords
+                        self._record_proximity_check(self._magnet_mines[mm_id])
+                        if not explode_mine:
+                            self._defer_proximity_checks(
+                                PeriodicTask.MAGNET_MINE_PROXIMITY,
+                                self._magnet_mines[mm_id],
+                                None if closest_ship_id is None else closest_distance - trigger_radius,
+                                self._magnet_mine_tracking_acceleration_ms,
+                            )
 
                 if not explode_mine:
-                    if self._magnet_mines[mm_id].elapsed_milliseconds > (self._magnet_mine_max_seconds_to_detonate * 1000):
+                    if elapsed_milliseconds[ix] > (self._magnet_mine_max_seconds_to_detonate * 1000):
                         # explode mine if timer has expired
                         explode_mine = True
-                        if ship_id_distance_pairs is None:
-                            ship_id_distance_pairs = sorted([
-                                (
-                                    ship_id,
-                                    utils2d.calculate_point_distance(
-                                        self._magnet_mines[mm_id].coords,
-                                        self._ships[ship_id].coords,
-                                    )
-                                )
-                                for ship_id in self._ships
-                                if not self._ships[ship_id].exploded
-                            ], key=lambda pair: pair[1])
-
 
                 if explode_mine:
                     self._magnet_mines[mm_id].exploded = True
                     self.register_explosion_on_map(
-                        self._magnet_mines[mm_id].coords,
+                        coords,
                         self._magnet_mine_explode_damage_radius_meters * 1.1,
                         1200,
                         2000,
                     )
+                    # create ship, distance pairs for ships within the damage radius
+                    # sorted by shortest distance to longest distance.
+                    ship_id_distance_pairs = sorted([
+                        (
+                            ship_id,
+                            utils2d.calculate_point_distance(
+                                coords,
+                                self._ships[ship_id].coords,
+                            )
+                        )
+                        for ship_id in self._get_ship_ids_within(coords, damage_radius)
+                        if not self._ships[ship_id].exploded
+                    ], key=lambda pair: pair[1])
                     for pair in ship_id_distance_pairs:
                         if pair[1] <= damage_radius:
                             self._ships[pair[0]].die(self._game_frame)
                         else:
                             break
+                    if fuze_ship_id is not None and not self._ships[fuze_ship_id].exploded:
+                        # The ship that passed the mine may be out of the damage radius by now.
+                        self._ships[fuze_ship_id].die(self._game_frame)
 
                 elif self._magnet_mines[mm_id].closest_ship_id:
                     # Accelerate towards closest target
                     heading_to_closest = utils2d.calculate_heading_to_point(
-                        self._magnet_mines[mm_id].coords,
+                        coords,
                         self._ships[self._magnet_mines[mm_id].closest_ship_id].coords,
                     )
                     x_acc, y_acc = utils2d.calculate_x_y_components(
@@ -1179,139 +1647,219 @@ class Game(BaseModel):
 
                     # draw targeting line
                     self._magnet_mine_targeting_lines.append({
-                        "mine_coord": self._magnet_mines[mm_id].coords,
+                        "mine_coord": coords,
                         "target_coord": self._ships[self._magnet_mines[mm_id].closest_ship_id].coords,
                     })
 
-            # Adjust position
-            if not explode_mine:
-                self._magnet_mines[mm_id].coord_x += (
-                    (self._magnet_mines[mm_id].velocity_x_meters_per_second
-                    * self._map_units_per_meter)
-                    / fps)
-                self._magnet_mines[mm_id].coord_y += (
-                    (self._magnet_mines[mm_id].velocity_y_meters_per_second
-                    * self._map_units_per_meter)
-                    / fps)
+            moving[ix] = not explode_mine
+
+        # Adjust position of every mine that didn't explode
+        slots = slots[moving]
+        table.coord_x[slots] += (
+            (table.velocity_x_meters_per_second[slots]
+            * self._map_units_per_meter)
+            / fps)
+        table.coord_y[slots] += (
+            (table.velocity_y_meters_per_second[slots]
+            * self._map_units_per_meter)
+            / fps)
 
         # mines get deleted from dict on the frame after they explode.
         if any(keys_to_drop):
             for k in keys_to_drop:
+                self._magnet_mines[k].detach()
                 del self._magnet_mines[k]
+                self._scheduler.forget(k)
 
     def advance_emps(self, fps: int):
         keys_to_drop = []
 
-        # For a performance boost, only check proximity every 3rd frame
-        check_proximity = self._is_testing or self._game_frame % 3 == 0
-
-        for emp_id in self._emps:
-            if self._emps[emp_id].exploded:
+        live_ids = []
+        for emp_id, emp in self._emps.items():
+            if emp.exploded:
                 keys_to_drop.append(emp_id)
-                continue
-
-            self._emps[emp_id].elapsed_milliseconds += (1000 / fps)
-
+            else:
+                live_ids.append(emp_id)
+
+        # Advance timers of every live EMP at once.
+        table = self._projectile_table
+        slots = get_slots((self._emps[emp_id] for emp_id in live_ids), table)
+        table.elapsed_milliseconds[slots] += (1000 / fps)
+        timer_expired = (
+            table.elapsed_milliseconds[slots] > (self._emp_max_seconds_to_detonate * 1000)
+        ).tolist()
+        emp_coords = list(zip(table.coord_x[slots].tolist(), table.coord_y[slots].tolist()))
+        moving = np.ones(len(live_ids), dtype=bool)
+
+        for ix, emp_id in enumerate(live_ids):
+            coords = emp_coords[ix]
             # Blow up EMP if timer has expired
-            explode = False
-            if self._emps[emp_id].elapsed_milliseconds > (self._emp_max_seconds_to_detonate * 1000):
-                explode = True
-
-            if explode or check_proximity:
-                ship_id_in_kill_range = []
-                for ship_id in self._ships:
-                    is_shooter = ship_id == self._emps[emp_id].ship_id
-                    if self._ships[ship_id].exploded:
-                        continue
-                    distance_meters = utils2d.calculate_point_distance(
-                        self._emps[emp_id].coords,
-                        self._ships[ship_id].coords,
-                    ) / self._map_units_per_meter
-                    if not is_shooter and not explode and distance_meters <= self._emp_max_proximity_to_explode_meters:
-                        # Blow up EMP if it's within proximity of an enemy ship
-                        explode = True
-                        ship_id_in_kill_range.append(ship_id)
-                    elif distance_meters <= self._emp_explode_damage_radius_meters:
-                        ship_id_in_kill_range.append(ship_id)
-                if explode:
-                    self._emps[emp_id].exploded = True
-                    self._emp_blasts.append({
-                        "id": str(uuid4()),
-                        "origin_point": self._emps[emp_id].coords,
-                        "max_radius_meters":  self._emp_explode_damage_radius_meters,
-                        "flare_ms": 200,
-                        "fade_ms": 3000,
-                        "elapsed_ms": 10,
-                    })
-                    for ship_id in ship_id_in_kill_range:
-                        self._ships[ship_id].emp(self._emp_electricity_drain)
+            explode = timer_expired[ix]
+
+            if explode or self._scheduler.is_due(PeriodicTask.EMP_PROXIMITY, emp_id):
+                with self._scheduler.timed(PeriodicTask.EMP_PROXIMITY):
+                    ship_id_in_kill_range = []
+                    for ship_id in self._get_ship_ids_within(
+                        coords,
+                        max(
+                            self._emp_max_proximity_to_explode_meters,
+                            self._emp_explode_damage_radius_meters,
+                        ) * self._map_units_per_meter,
+                    ):
+                        is_shooter = ship_id == self._emps[emp_id].ship_id
+                        if self._ships[ship_id].exploded:
+                            continue
+                        distance_meters = utils2d.calculate_point_distance(
+                            coords,
+                            self._ships[ship_id].coords,
+                        ) / self._map_units_per_meter
+                        if not is_shooter and not explode and distance_meters <= self._emp_max_proximity_to_explode_meters:
+                            # Blow up EMP if it's within proximity of an enemy ship
+                            explode = True
+                            ship_id_in_kill_range.append(ship_id)
+                        elif distance_meters <= self._emp_explode_damage_radius_meters:
+                            ship_id_in_kill_range.append(ship_id)
+                    if not explode:
+                        # Blow up EMP if it passed an enemy ship since the last check.
+                        fuze_ship_id, fuze_coords = self._get_swept_fuze_contact(
+                            self._emps[emp_id],
+                            self._emp_max_proximity_to_explode_meters * self._map_units_per_meter,
+                            predicate=lambda ship_id: (
+                                ship_id != self._emps[emp_id].ship_id
+                                and not self._ships[ship_id].exploded
+                            ),
+                        )
+                        if fuze_ship_id is not None:
+                            explode = True
+                            self._emps[emp_id].coord_x, self._emps[emp_id].coord_y = fuze_coords
+                            coords = fuze_coords
+                            damage_radius = self._emp_explode_damage_radius_meters * self._map_units_per_meter
+                            # The ship that passed the EMP may be out of the damage radius by now.
+                            ship_id_in_kill_range = [fuze_ship_id] + [
+                                ship_id
+                                for ship_id in self._get_ship_ids_within(fuze_coords, damage_radius)
+                                if ship_id != fuze_ship_id
+                                and not self._ships[ship_id].exploded
+                                and utils2d.calculate_point_distance(fuze_coords, self._ships[ship_id].coords) <= damage_radius
+                            ]
+                    self._record_proximity_check(self._emps[emp_id])
+                    if not explode:
+                        trigger_radius = self._emp_max_proximity_to_explode_meters * self._map_units_per_meter
+                        _, closest_distance = self._get_nearest_ship(
+                            coords,
+                            lambda ship_id: (
+                                ship_id != self._emps[emp_id].ship_id
+                                and not self._ships[ship_id].exploded
+                            ),
+                        )
+                        self._defer_proximity_checks(
+                            PeriodicTask.EMP_PROXIMITY,
+                            self._emps[emp_id],
+                            None if closest_distance is None else closest_distance - trigger_radius,
+                            0,
+                        )
+                    if explode:
+                        self._emps[emp_id].exploded = True
+                        self._emp_blasts.append({
+                            "id": self._ids.next_id(EntityIdPrefix.EMP_BLAST),
+                            "origin_point": coords,
+                            "max_radius_meters":  self._emp_explode_damage_radius_meters,
+                            "flare_ms": 200,
+                            "fade_ms": 3000,
+                            "elapsed_ms": 10,
+                        })
+                        for ship_id in ship_id_in_kill_range:
+                            self._ships[ship_id].emp(self._emp_electricity_drain)
+
+            moving[ix] = not explode
 
-            # Adjust position
-            if not explode:
-                self._emps[emp_id].coord_x += (self._emps[emp_id].velocity_x_meters_per_second * self._map_units_per_meter / fps)
-                self._emps[emp_id].coord_y += (self._emps[emp_id].velocity_y_meters_per_second * self._map_units_per_meter / fps)
+        # Adjust position of every EMP that didn't explode
+        slots = slots[moving]
+        table.coord_x[slots] += (table.velocity_x_meters_per_second[slots] * self._map_units_per_meter / fps)
+        table.coord_y[slots] += (table.velocity_y_meters_per_second[slots] * self._map_units_per_meter / fps)
 
         # EMPs get deleted from dict on the frame after they  explode.
         if any(keys_to_drop):
             for k in keys_to_drop:
+                self._emps[k].detach()
                 del self._emps[k]
+                self._scheduler.forget(k)
 
 
     def advance_hunter_drones(self, fps: int):
         keys_to_drop = []
         arm_time_ms = self._hunter_drone_arming_time_seconds * 1000
 
-        # For a performance boost, only check proximity every 2nd frame
-        check_proximity = self._is_testing or self._game_frame % 2 == 0
-
-        for hd_id in self._hunter_drones:
-            if self._hunter_drones[hd_id].exploded:
+        live_ids = []
+        for hd_id, drone in self._hunter_drones.items():
+            if drone.exploded:
                 keys_to_drop.append(hd_id)
+            else:
+                live_ids.append(hd_id)
+
+        # Arm drones, or advance "percent armed" property
+        # and position (no acceleration), for every unarmed drone at once.
+        table = self._projectile_table
+        slots = get_slots((self._hunter_drones[hd_id] for hd_id in live_ids), table)
+        arming = np.array([not self._hunter_drones[hd_id].armed for hd_id in live_ids], dtype=bool)
+        table.elapsed_milliseconds[slots[arming]] += (1000 / fps)
+        newly_armed = arming & (table.elapsed_milliseconds[slots] > arm_time_ms)
+        arming &= ~newly_armed
+        percent_armed = (table.elapsed_milliseconds[slots] / arm_time_ms).tolist()
+        arming_slots = slots[arming]
+        table.coord_x[arming_slots] += (
+            table.velocity_x_meters_per_second[arming_slots] * self._map_units_per_meter / fps)
+        table.coord_y[arming_slots] += (
+            table.velocity_y_meters_per_second[arming_slots] * self._map_units_per_meter / fps)
+
+        # Read columns once, table backed attributes are slower to read than lists.
+        drone_coords = dict(zip(live_ids, zip(table.coord_x[slots].tolist(), table.coord_y[slots].tolist())))
+        drone_velocities = dict(zip(live_ids, zip(
+            table.velocity_x_meters_per_second[slots].tolist(),
+            table.velocity_y_meters_per_second[slots].tolist(),
+        )))
+
+        armed_ids = []
+        for ix, hd_id in enumerate(live_ids):
+            if newly_armed[ix]:
+                self._hunter_drones[hd_id].armed = True
+                self._hunter_drones[hd_id].percent_armed = 1
+            elif arming[ix]:
+                self._hunter_drones[hd_id].percent_armed = percent_armed[ix]
                 continue
+            armed_ids.append(hd_id)
 
-            # Arm drone, or advance "percent armed" property
-            # and position (no acceleration)
-            if not self._hunter_drones[hd_id].armed:
-                self._hunter_drones[hd_id].elapsed_milliseconds += (1000 / fps)
-                if self._hunter_drones[hd_id].elapsed_milliseconds > arm_time_ms:
-                    self._hunter_drones[hd_id].armed = True
-                    self._hunter_drones[hd_id].percent_armed = 1
-                else:
-                    self._hunter_drones[hd_id].percent_armed = self._hunter_drones[hd_id].elapsed_milliseconds / arm_time_ms
-                    self._hunter_drones[hd_id].coord_x += (
-                        self._hunter_drones[hd_id].velocity_x_meters_per_second * self._map_units_per_meter / fps)
-                    self._hunter_drones[hd_id].coord_y += (
-                        self._hunter_drones[hd_id].velocity_y_meters_per_second * self._map_units_per_meter / fps)
-                    continue
+        proximity_due_ids = {
+            hd_id for hd_id in armed_ids
+            if self._scheduler.is_due(PeriodicTask.HUNTER_DRONE_PROXIMITY, hd_id)
+        }
 
+        for hd_id in armed_ids:
+            coords = drone_coords[hd_id]
+            velocity_x, velocity_y = drone_velocities[hd_id]
             # Drone armed, search for target
-            if self._hunter_drones[hd_id].target_ship_id is None and check_proximity:
-                min_distance_ship_id = None
-                min_distance_map_units = None
-                for ship_id in self._ships:
-                    if self._hunter_drones[hd_id].team_id == self._ships[ship_id].team_id:
-                        continue # ignore ship/team that launched drone.
-                    distance = utils2d.calculate_point_distance(
-                        self._ships[ship_id].coords,
-                        self._hunter_drones[hd_id].coords,
+            if self._hunter_drones[hd_id].target_ship_id is None and hd_id in proximity_due_ids:
+                with self._scheduler.timed(PeriodicTask.HUNTER_DRONE_PROXIMITY):
+                    min_distance_ship_id, min_distance_map_units = self._get_nearest_ship(
+                        coords,
+                        # ignore ship/team that launched drone.
+                        lambda ship_id: self._hunter_drones[hd_id].team_id != self._ships[ship_id].team_id,
+                        self._hunter_drones[hd_id].max_acquisition_meters * self._map_units_per_meter,
                     )
-                    if min_distance_ship_id is None or distance < min_distance_map_units:
-                        min_distance_ship_id = ship_id
-                        min_distance_map_units = distance
-                if (
-                    min_distance_map_units is not None
-                    and (min_distance_map_units/self._map_units_per_meter) < self._hunter_drones[hd_id].max_acquisition_meters
-                ):
-                    # Target aquired
-                    self._hunter_drones[hd_id].target_ship_id = min_distance_ship_id
+                    if (
+                        min_distance_map_units is not None
+                        and (min_distance_map_units/self._map_units_per_meter) < self._hunter_drones[hd_id].max_acquisition_meters
+                    ):
+                        # Target aquired
+                        self._hunter_drones[hd_id].target_ship_id = min_distance_ship_id
 
             # Adjust heading
             target_ship_id = self._hunter_drones[hd_id].target_ship_id
             if target_ship_id is None:
                 # No target: fly patrol.
                 _, current_velocity_heading = utils2d.calculate_resultant_vector(
-                    self._hunter_drones[hd_id].velocity_x_meters_per_second,
-                    self._hunter_drones[hd_id].velocity_y_meters_per_second,
+                    velocity_x,
+                    velocity_y,
                 )
                 delta_degrees = (
                     90
@@ -1332,6 +1880,8 @@ class Game(BaseModel):
                 # start flying patrol on next frame.
                 self._hunter_drones[hd_id].target_ship_id = None
                 target_ship_id = None
+                # Checks were deferred against the old target.
+                self._scheduler.defer(PeriodicTask.HUNTER_DRONE_PROXIMITY, hd_id, None)
 
             elif (
                 target_ship_id is not None
@@ -1339,12 +1889,12 @@ class Game(BaseModel):
             ):
                 # Set intercept heading.
                 intercept_angle = utils2d.calculate_heading_to_point(
-                    self._hunter_drones[hd_id].coords,
+                    coords,
                     self._ships[target_ship_id].coords,
                 )
                 _, velocity_angle = utils2d.calculate_resultant_vector(
-                    self._hunter_drones[hd_id].velocity_x_meters_per_second,
-                    self._hunter_drones[hd_id].velocity_y_meters_per_second,
+                    velocity_x,
+                    velocity_y,
                 )
                 intercept_angle_delta = utils2d.calculate_delta_degrees(
                     velocity_angle,
@@ -1369,73 +1919,120 @@ class Game(BaseModel):
                     )
                     self._hunter_drones[hd_id].set_heading(new_heading)
 
-            # Apply acceleration and update position.
+            # Apply acceleration.
             acc_x, acc_y = utils2d.calculate_x_y_components(
                 self._hunter_drones[hd_id].tracking_acceleration_ms/fps,
                 self._hunter_drones[hd_id].heading,
             )
             self._hunter_drones[hd_id].velocity_x_meters_per_second += acc_x
             self._hunter_drones[hd_id].velocity_y_meters_per_second += acc_y
-            self._hunter_drones[hd_id].coord_x += (
-                self._hunter_drones[hd_id].velocity_x_meters_per_second*self._map_units_per_meter/fps)
-            self._hunter_drones[hd_id].coord_y += (
-                self._hunter_drones[hd_id].velocity_y_meters_per_second*self._map_units_per_meter/fps)
 
+        # Update position of every armed drone at once.
+        armed_slots = slots[~arming]
+        table.coord_x[armed_slots] += (
+            table.velocity_x_meters_per_second[armed_slots]*self._map_units_per_meter/fps)
+        table.coord_y[armed_slots] += (
+            table.velocity_y_meters_per_second[armed_slots]*self._map_units_per_meter/fps)
+        drone_coords = dict(zip(armed_ids, zip(
+            table.coord_x[armed_slots].tolist(),
+            table.coord_y[armed_slots].tolist(),
+        )))
+
+        for hd_id in armed_ids:
+            coords = drone_coords[hd_id]
             # Check for proximity detonations and ship damamge.
-            if check_proximity and target_ship_id is not None:
-                distance_to_target = utils2d.calculate_point_distance(
-                    self._hunter_drones[hd_id].coords,
-                    self._ships[target_ship_id].coords,
-                ) / self._map_units_per_meter
-                if distance_to_target <= self._hunter_drone_max_proximity_to_explode_meters:
-                    # Explode drone, kill target ship.
-                    self._hunter_drones[hd_id].exploded = True
-                    self.register_explosion_on_map(
-                        self._hunter_drones[hd_id].coords,
-                        self._hunter_drone_explode_damage_radius_meters * 1.1,
-                        800,
-                        1400,
-                    )
-                    self._ships[target_ship_id].die(self._game_frame)
-                    # Kill any other ships within damage AOE.
-                    for ship_id in self._ships:
-                        if target_ship_id == ship_id:
-                            continue # Already dead.
-                        distance_to_ship = utils2d.calculate_point_distance(
-                            self._hunter_drones[hd_id].coords,
-                            self._ships[ship_id].coords,
-                        ) / self._map_units_per_meter
-                        if distance_to_ship <= self._hunter_drone_explode_damage_radius_meters:
-                            self._ships[ship_id].die(self._game_frame)
+            target_ship_id = self._hunter_drones[hd_id].target_ship_id
+            if hd_id in proximity_due_ids and target_ship_id is not None:
+                with self._scheduler.timed(PeriodicTask.HUNTER_DRONE_PROXIMITY):
+                    distance_to_target = utils2d.calculate_point_distance(
+                        coords,
+                        self._ships[target_ship_id].coords,
+                    ) / self._map_units_per_meter
+                    explode = distance_to_target <= self._hunter_drone_max_proximity_to_explode_meters
+                    if not explode:
+                        # Explode drone if it passed the target since the last check.
+                        fuze_ship_id, fuze_coords = self._get_swept_fuze_contact(
+                            self._hunter_drones[hd_id],
+                            self._hunter_drone_max_proximity_to_explode_meters * self._map_units_per_meter,
+                            ship_ids=[target_ship_id],
+                        )
+                        if fuze_ship_id is not None:
+                            explode = True
+                            self._hunter_drones[hd_id].coord_x, self._hunter_drones[hd_id].coord_y = fuze_coords
+                            coords = fuze_coords
+                    if explode:
+                        # Explode drone, kill target ship.
+                        self._hunter_drones[hd_id].exploded = True
+                        self.register_explosion_on_map(
+                            coords,
+                            self._hunter_drone_explode_damage_radius_meters * 1.1,
+                            800,
+                            1400,
+                        )
+                        self._ships[target_ship_id].die(self._game_frame)
+                        # Kill any other ships within damage AOE.
+                        for ship_id in self._get_ship_ids_within(
+                            coords,
+                            self._hunter_drone_explode_damage_radius_meters * self._map_units_per_meter,
+                        ):
+                            if target_ship_id == ship_id:
+                                continue # Already dead.
+                            distance_to_ship = utils2d.calculate_point_distance(
+                                coords,
+                                self._ships[ship_id].coords,
+                            ) / self._map_units_per_meter
+                            if distance_to_ship <= self._hunter_drone_explode_damage_radius_meters:
+                                self._ships[ship_id].die(self._game_frame)
+
+            if hd_id in proximity_due_ids and not self._hunter_drones[hd_id].exploded:
+                with self._scheduler.timed(PeriodicTask.HUNTER_DRONE_PROXIMITY):
+                    self._record_proximity_check(self._hunter_drones[hd_id])
+                    if target_ship_id is not None:
+                        # Next check is a detonation check against the target.
+                        self._defer_proximity_checks(
+                            PeriodicTask.HUNTER_DRONE_PROXIMITY,
+                            self._hunter_drones[hd_id],
+                            utils2d.calculate_point_distance(
+                                coords,
+                                self._ships[target_ship_id].coords,
+                            ) - self._hunter_drone_max_proximity_to_explode_meters * self._map_units_per_meter,
+                            self._hunter_drones[hd_id].tracking_acceleration_ms,
+                            self._ships[target_ship_id],
+                        )
+                    else:
+                        # Next check is a search for a target.
+                        acquisition_radius = self._hunter_drones[hd_id].max_acquisition_meters * self._map_units_per_meter
+                        _, closest_distance = self._get_nearest_ship(
+                            coords,
+                            lambda ship_id: self._hunter_drones[hd_id].team_id != self._ships[ship_id].team_id,
+                        )
+                        self._defer_proximity_checks(
+                            PeriodicTask.HUNTER_DRONE_PROXIMITY,
+                            self._hunter_drones[hd_id],
+                            None if closest_distance is None else closest_distance - acquisition_radius,
+                            self._hunter_drones[hd_id].tracking_acceleration_ms,
+                        )
 
         # Hunter Drone keys get deleted from dict on the frame after they explode.
         if any(keys_to_drop):
             for k in keys_to_drop:
+                self._hunter_drones[k].detach()
                 del self._hunter_drones[k]
+                self._scheduler.forget(k)
 
 
     def _advance_collisions(self, ship_id: str, collision_type: str):
         if collision_type == self._colision_cycle_mine:
-            for mine in self._ore_mines:
-                dist = utils2d.calculate_point_distance(
-                    (mine['position_map_units_x'], mine['position_map_units_y']),
-                    self._ships[ship_id].coords,
-                )
-                if dist < (mine['collision_radius_meters'] * self._map_units_per_meter):
-                    self._ships[ship_id].die(self._game_frame)
-                    self._ships[ship_id].explode()
-                    return ShipDeathType.EXPLOSION_NEW, 0
+            if self._ore_mine_index.get_collision(self._ships[ship_id].coords):
+                self._ships[ship_id].die(self._game_frame)
+                self._ships[ship_id].explode()
+                return ShipDeathType.EXPLOSION_NEW, 0
 
         elif collision_type == self._colision_cycle_station:
-            for st in self._space_stations:
-                dist = utils2d.calculate_point_distance(
-                    (st['position_map_units_x'], st['position_map_units_y']),
-                    self._ships[ship_id].coords,
-                )
-                if dist < (st['collision_radius_meters'] * self._map_units_per_meter):
-                    self._ships[ship_id].die(self._game_frame)
-                    self._ships[ship_id].explode()
-                    return ShipDeathType.EXPLOSION_NEW, 0
+            if self._space_station_index.get_collision(self._ships[ship_id].coords):
+                self._ships[ship_id].die(self._game_frame)
+                self._ships[ship_id].explode()
+                return ShipDeathType.EXPLOSION_NEW, 0
 
         elif collision_type == self._colision_cycle_wall:
             if (
@@ -1462,30 +2059,61 @@ class Game(BaseModel):
             (pm_x, pm_y),
             ray_point_b,
         )
+        may_touch_ray = utils2d.ray_circle_broadphase_factory((pm_x, pm_y), ship.ebeam_heading)
         hits = []
         for other_id, other_ship in self._ships.items():
             if other_id == ship.id or other_ship.died_on_frame:
                 continue
+            if other_ship.hitbox_radius is not None and not may_touch_ray(other_ship.coords, other_ship.hitbox_radius):
+                continue
             if intercept_calculator(other_ship.hitbox_lines):
                 hits.append(other_id)
 
         return line, hits
 
+    def _get_autofire_index(self, ship_id: str) -> AngularIntervalIndex:
+        """ Bearings from the ship to every other ship within its autofire range,
+            widened to the other ship's hitbox radius.
+            Positions don't change while weapons are calculated, so inside run_frame
+            the index is built once per ship per frame.
+        """
+        if ship_id in self._autofire_indexes:
+            return self._autofire_indexes[ship_id]
+
+        ship_coords = self._ships[ship_id].coords
+        max_range = self._ships[ship_id].ebeam_autofire_max_range
+        intervals = []
+        for other_id in self._get_ship_ids_within(ship_coords, max_range * self._map_units_per_meter):
+            if other_id == ship_id:
+                continue
+            other_ship = self._ships[other_id]
+            distance = self._pair_cache.get_distance(ship_id, ship_coords, other_id, other_ship.coords)
+            if distance / self._map_units_per_meter > max_range:
+                continue
+            if other_ship.hitbox_radius is None or distance <= other_ship.hitbox_radius:
+                half_width = 180
+            else:
+                half_width = math.degrees(math.asin(other_ship.hitbox_radius / distance))
+            intervals.append((
+                self._pair_cache.get_heading(ship_id, ship_coords, other_id, other_ship.coords),
+                half_width,
+                other_id,
+            ))
+        index = AngularIntervalIndex(intervals)
+        if self._ship_index is not None:
+            self._autofire_indexes[ship_id] = index
+        return index
+
     def search_for_firing_solution(self, ship_id: str) -> bool:
         shooter_angle = self._ships[ship_id].heading
         ship_coords = self._ships[ship_id].coords
-        for other_id, other_ship in self._ships.items():
-            if other_id == ship_id or other_ship.died_on_frame:
-                continue
-            distance_meters = self._distance_cache.get_val(
-                    ship_coords,
-                    other_ship.coords,
-            ) / self._map_units_per_meter
-            if distance_meters > self._ships[ship_id].ebeam_autofire_max_range:
+        for other_id in self._get_autofire_index(ship_id).query(shooter_angle):
+            other_ship = self._ships[other_id]
+            if other_ship.died_on_frame:
                 continue
 
             bearings = tuple(
-                self._heading_cache.get_val(
+                utils2d.calculate_heading_to_point(
                     ship_coords,
                     hb_coord,
                 )
@@ -1502,8 +2130,8 @@ class Game(BaseModel):
                     b + (360 if b < 180 else 0)
                     for b in bearings
                 )
-                shooter_angle += 360 if shooter_angle < 180 else 0
-                if min(bearings) < shooter_angle < max(bearings):
+                reoriented_shooter_angle = shooter_angle + (360 if shooter_angle < 180 else 0)
+                if min(bearings) < reoriented_shooter_angle < max(bearings):
                     return True
 
         return False
@@ -1518,12 +2146,33 @@ class Game(BaseModel):
         if len(alive_teams) == 1:
             self._winning_team = alive_teams.pop()
 
+    def _run_game_checks(self):
+        if not self._winning_team:
+            self.check_for_winning_team()
+        self.check_for_empty_game()
+
     def check_for_empty_game(self):
         if len(self._players) == 0:
             self._phase = GamePhase.COMPLETE
 
+    def _handle_timer_event(self, event_type: str, payload):
+        if event_type == TimerEvent.KILLFEED_EXPIRED:
+            self.purge_killfeed(MAX_SERVER_FPS)
+        else:
+            raise NotImplementedError(event_type)
+
+    def _add_killfeed_entry(self, victim_name: str):
+        self._killfeed.append({
+            "created_at_frame": self._game_frame,
+            "victim_name": victim_name,
+        })
+        self._timers.schedule(
+            self._game_frame + constants.KILLFEED_SECONDS * MAX_SERVER_FPS + 1,
+            (TimerEvent.KILLFEED_EXPIRED, None),
+        )
+
     def purge_killfeed(self, fps: int):
-        oldest_frame = self._game_frame - fps * 8
+        oldest_frame = self._game_frame - fps * constants.KILLFEED_SECONDS
         self._killfeed = [
             k for k in self._killfeed
             if k['created_at_frame'] >= oldest_frame
@@ -1537,7 +2186,7 @@ class Game(BaseModel):
         ):
             return
 
-        for ix, st in enumerate(self._space_stations):
+        for st in self._space_station_index.get_service_candidates(self._ships[ship_id].coords):
             dist = utils2d.calculate_point_distance(
                 (st['position_map_units_x'], st['position_map_units_y']),
                 self._ships[ship_id].coords,
@@ -1557,7 +2206,16 @@ class Game(BaseModel):
                 ] = self._game_frame
 
                 # Update Fog of War for other ships
-                for other_id in (i for i in self._ships if i != ship_id):
+                max_fow_map_units = max(
+                    s.current_FOW_vision for s in self._ships.values()
+                ) * self._map_units_per_meter
+                for other_id in (
+                    i for i in self._get_ship_ids_within(
+                        (st['position_map_units_x'], st['position_map_units_y']),
+                        max_fow_map_units,
+                    )
+                    if i != ship_id
+                ):
                     dist = utils2d.calculate_point_distance(
                         (st['position_map_units_x'], st['position_map_units_y']),
                         self._ships[other_id].coords,
@@ -1567,6 +2225,10 @@ class Game(BaseModel):
                             st['uuid']
                         ] = self._game_frame
 
+    def _update_ore_mine_parking(self, ship_id: str) -> None:
+        self.check_for_ore_mine_parking(ship_id)
+        self.update_scouted_mine_ore_remaining(ship_id)
+
     def check_for_ore_mine_parking(self, ship_id: str) -> None:
         ship = self._ships[ship_id]
         if not ship.is_stationary:
@@ -1577,7 +2239,7 @@ class Game(BaseModel):
             return
 
         ship_coords = ship.coords
-        for om in self._ore_mines:
+        for om in self._ore_mine_index.get_service_candidates(ship_coords):
             dist = utils2d.calculate_point_distance(
                 (om['position_map_units_x'], om['position_map_units_y']),
                 ship_coords,
@@ -1621,15 +2283,15 @@ class Game(BaseModel):
     def update_scouted_mine_ore_remaining(self, ship_id: str):
         ship = self._ships[ship_id]
         ship_coords = ship.coords
-        for om in self._ore_mines:
+        scan_range = ship.scanner_range if ship.scanner_online else 0
+        visual_range = ship.visual_range
+        max_range = max(scan_range, visual_range)
+        for om in self._ore_mine_index.query_radius(ship_coords, max_range * self._map_units_per_meter):
             mine_uuid = om['uuid']
             dist_meters = utils2d.calculate_point_distance(
                 (om['position_map_units_x'], om['position_map_units_y']),
                 ship_coords,
             ) / self._map_units_per_meter
-            scan_range = ship.scanner_range if ship.scanner_online else 0
-            visual_range = ship.visual_range
-            max_range = max(scan_range, visual_range)
             if dist_meters <= max_range:
                 self._ships[ship_id].scouted_mine_ore_remaining[
                     mine_uuid
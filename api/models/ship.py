@@ -1,6 +1,8 @@
 
 from collections import OrderedDict
+import json
 import math
+from operator import attrgetter
 import random
 from typing import Tuple, Dict, TypedDict, Optional, Generator, List, Union
 
@@ -8,6 +10,7 @@ from api.models.base import BaseModel
 from api.models.ship_skin import ship_skins, DEFAULT_SKIN_SLUG
 from api import utils2d
 from api import constants
+from api.hitbox_rotation import get_rotated_hitbox
 from .ship_upgrade import (
     get_upgrade_profile_1,
     UpgradeType,
@@ -16,6 +19,42 @@ from .ship_upgrade import (
 )
 
 
+# Serialized ship fields that only change on spawn, upgrade or a few commands.
+# Their encoded JSON is reused until one of them changes (see Ship.to_json).
+SLOW_CHANGING_FIELDS = (
+    'id',
+    'team_id',
+    'skin_slug',
+    'battery_capacity',
+    'fuel_capacity',
+    'fuel_cost_ore_kg_per_fuel_unit',
+    'engine_newtons',
+    'engine_lit_thermal_signature_rate_per_second',
+    'apu_battery_charge_per_second',
+    'apu_fuel_usage_per_second',
+    'apu_online_thermal_signature_rate_per_second',
+    'scanner_radar_range',
+    'scanner_ir_range',
+    'scanner_ir_minimum_thermal_signature',
+    'scanner_locking_max_traversal_degrees',
+    'scanner_locked_max_traversal_degrees',
+    'scanner_radar_sensitivity',
+    'anti_radar_coating_level',
+    'ebeam_charge_capacity',
+    'ebeam_color',
+    'ebeam_charge_rate_per_second',
+    'ebeam_charge_power_usage_per_second',
+    'ebeam_charge_thermal_signature_rate_per_second',
+    'ebeam_charge_fire_minimum',
+    'ebeam_autofire_max_range',
+    'special_weapons_tubes_count',
+    'gravity_brake_deployed_position',
+    'cargo_ore_mass_capacity_kg',
+    'visual_range',
+)
+_get_slow_changing_values = attrgetter(*SLOW_CHANGING_FIELDS)
+
+
 class ShipCommandError(Exception):
     pass
 
@@ -208,7 +247,198 @@ class AutoPilotPrograms:
     HEADING_LOCK_WAYPOINT = 'lock_waypoint'
 
 
+class MapHitbox:
+    """ A ship's hitbox in map coordinates, along with the position
+        and rotated hitbox coordinates that it was computed from.
+    """
+    __slots__ = (
+        'coord_x',
+        'coord_y',
+        'rel_nose',
+        'rel_bottom_left',
+        'rel_bottom_center',
+        'rel_bottom_right',
+        'coords',
+        'lines',
+    )
+
+    def __init__(self, ship: "Ship"):
+        self.coord_x = coord_x = ship.coord_x
+        self.coord_y = coord_y = ship.coord_y
+        self.rel_nose = ship.rel_rot_coord_hitbox_nose
+        self.rel_bottom_left = ship.rel_rot_coord_hitbox_bottom_left
+        self.rel_bottom_center = ship.rel_rot_coord_hitbox_bottom_center
+        self.rel_bottom_right = ship.rel_rot_coord_hitbox_bottom_right
+        nose = (coord_x + self.rel_nose[0], coord_y + self.rel_nose[1])
+        bottom_left = (coord_x + self.rel_bottom_left[0], coord_y + self.rel_bottom_left[1])
+        bottom_center = (coord_x + self.rel_bottom_center[0], coord_y + self.rel_bottom_center[1])
+        bottom_right = (coord_x + self.rel_bottom_right[0], coord_y + self.rel_bottom_right[1])
+        self.coords = (nose, bottom_left, bottom_center, bottom_right)
+        self.lines = (
+            (nose, bottom_left),
+            (bottom_left, bottom_center),
+            (bottom_center, bottom_right),
+            (bottom_right, nose),
+        )
+
+
 class Ship(BaseModel):
+    # Every instance attribute is declared here, ships don't have a __dict__.
+    # Fields changed by name (IE ship upgrade effects) must be declared too.
+    __slots__ = (
+        'skin_slug',
+        'map_units_per_meter',
+        'team_id',
+        'coord_x',
+        'coord_y',
+        'heading',
+        'desired_heading',
+        'ship_traversal_degrees_per_second',
+        'rel_rot_coord_hitbox_nose',
+        'rel_rot_coord_hitbox_bottom_left',
+        'rel_rot_coord_hitbox_bottom_right',
+        'rel_rot_coord_hitbox_bottom_center',
+        'rel_fixed_coord_hitbox_nose',
+        'rel_fixed_coord_hitbox_bottom_left',
+        'rel_fixed_coord_hitbox_bottom_right',
+        'rel_fixed_coord_hitbox_bottom_center',
+        'hitbox_radius',
+        '_map_hitbox',
+        'velocity_x_meters_per_second',
+        'velocity_y_meters_per_second',
+        '_upgrades',
+        '_ship_upgrade_active_indexes',
+        '_core_upgrade_active_indexes',
+        '_upgrade_summary',
+        '_upgrade_summary_json',
+        '_slow_changing_values',
+        '_slow_changing_json',
+        'visual_range',
+        'battery_power',
+        'battery_capacity',
+        'battery_mass',
+        'fuel_level',
+        'fuel_capacity',
+        'fueling_at_station',
+        'fuel_cost_ore_kg_per_fuel_unit',
+        'refueling_rate_fuel_units_per_second',
+        'engine_mass',
+        'engine_newtons',
+        'engine_lit',
+        'engine_online',
+        'engine_boosting',
+        'engine_boosted',
+        'engine_boosted_last_frame',
+        'engine_boost_multiple',
+        'engine_starting',
+        'engine_startup_power_used',
+        'engine_idle_power_requirement_per_second',
+        'engine_seconds_to_activate',
+        'engine_activation_power_required_total',
+        'engine_activation_power_required_per_second',
+        'engine_fuel_usage_per_second',
+        'engine_battery_charge_per_second',
+        'engine_lit_thermal_signature_rate_per_second',
+        'apu_starting',
+        'apu_startup_power_used',
+        'apu_online',
+        'apu_seconds_to_activate',
+        'apu_activation_power_required_total',
+        'apu_activation_power_required_per_second',
+        'apu_online_thermal_signature_rate_per_second',
+        'apu_fuel_usage_per_second',
+        'apu_battery_charge_per_second',
+        'scanner_designator',
+        'scanner_online',
+        'scanner_starting',
+        'scanner_mode',
+        'scanner_radar_range',
+        'scanner_ir_range',
+        'scanner_ir_minimum_thermal_signature',
+        'scanner_radar_sensitivity',
+        'scanner_idle_power_requirement_per_second',
+        'scanner_activation_power_required_total',
+        'scanner_activation_power_required_per_second',
+        'scanner_startup_power_used',
+        'scanner_seconds_to_activate',
+        'scanner_locked',
+        'scanner_locking',
+        'scanner_locking_power_used',
+        'scanner_lock_target',
+        'scanner_get_lock_power_requirement_total',
+        'scanner_get_lock_power_requirement_per_second',
+        'scanner_ship_data',
+        'scanner_magnet_mine_data',
+        'scanner_emp_data',
+        'scanner_hunter_drone_data',
+        'scanner_thermal_signature',
+        'anti_radar_coating_level',
+        'scanner_thermal_signature_dissipation_per_second',
+        'scanner_locking_max_traversal_degrees',
+        'scanner_locked_max_traversal_degrees',
+        'scanner_lock_traversal_degrees_previous_frame',
+        'scanner_lock_traversal_slack',
+        'ebeam_charge_rate_per_second',
+        'ebeam_charge_power_usage_per_second',
+        'ebeam_charge_thermal_signature_rate_per_second',
+        'ebeam_charge',
+        'ebeam_charge_capacity',
+        'ebeam_charging',
+        'ebeam_firing',
+        'ebeam_discharge_rate_per_second',
+        'ebeam_charge_fire_minimum',
+        'ebeam_color',
+        'ebeam_last_hit_frame',
+        'ebeam_autofire_max_range',
+        'ebeam_autofire_enabled',
+        'special_weapons_tubes_count',
+        'recoilless_tube_launches',
+        'last_tube_fire_frame',
+        '_special_weapon_costs',
+        'magnet_mines_loaded',
+        'emps_loaded',
+        'emp_launch_velocity_ms',
+        'hunter_drones_loaded',
+        'magnet_mine_firing',
+        'magnet_mine_launch_velocity',
+        'emp_firing',
+        'hunter_drone_firing',
+        '_hunter_drone_max_target_acquisition_distance_meters',
+        '_hunter_drone_tracking_acceleration_ms',
+        'hunter_drone_launch_velocity',
+        'autopilot_program',
+        'autopilot_waypoint_uuid',
+        'autopilot_waypoint_type',
+        'died_on_frame',
+        'aflame_since_frame',
+        '_seconds_to_aflame',
+        'explode_immediately',
+        'exploded',
+        '_removed_from_map',
+        '_seconds_to_explode',
+        'docked_at_station',
+        'docking_at_station',
+        'gravity_brake_position',
+        'gravity_brake_deployed_position',
+        'gravity_brake_traversal_per_second',
+        'gravity_brake_retracting',
+        'gravity_brake_extending',
+        'gravity_brake_active',
+        'scouted_station_gravity_brake_catches_last_frame',
+        'parked_at_ore_mine',
+        'cargo_ore_mass_capacity_kg',
+        'cargo_ore_mass_kg',
+        'virtual_ore_kg',
+        'mining_ore',
+        'mining_ore_power_usage_per_second',
+        'mining_ore_kg_collected_per_second',
+        'scouted_mine_ore_remaining',
+        'last_ore_deposit_frame',
+        '_ore_mines',
+        '_space_stations',
+        '_state',
+    )
+
     def __init__(self):
         super().__init__()
 
@@ -244,6 +474,10 @@ class Ship(BaseModel):
         self.rel_fixed_coord_hitbox_bottom_right = (None, None, )
         self.rel_fixed_coord_hitbox_bottom_center = (None, None, )
         # </END OF RELATIVE COORDINATES>
+        # Radius of a circle around the ship's coords that contains the hitbox at any heading.
+        self.hitbox_radius: Optional[float] = None
+        # Map hitbox coordinates, see _get_map_hitbox()
+        self._map_hitbox: Optional[MapHitbox] = None
 
         # Velocity
         self.velocity_x_meters_per_second = float(0)
@@ -258,6 +492,12 @@ class Ship(BaseModel):
         # External data that is sent to the front end.
         self._upgrade_summary: Dict[str, Dict[str, UpgradeSummary]] = {}
 
+        # Encoded JSON fragments reused by to_json().
+        # Set _upgrade_summary_json to None after changing _upgrade_summary.
+        self._upgrade_summary_json: Optional[str] = None
+        self._slow_changing_values: Optional[Tuple] = None
+        self._slow_changing_json: Optional[str] = None
+
         self.visual_range = None
 
         # Battery
@@ -415,33 +655,41 @@ class Ship(BaseModel):
     def coords(self) -> Tuple[int]:
         return (self.coord_x, self.coord_y,)
 
+    def _get_map_hitbox(self) -> "MapHitbox":
+        """ Map hitbox coordinates are read many times per frame (scanners, weapons, collisions)
+            but only change when the ship moves or its rotated hitbox changes (heading).
+            Rotated hitbox coords are immutable tuples that are replaced when the heading changes,
+            so comparing them by identity is enough to detect a change.
+        """
+        map_hitbox = self._map_hitbox
+        if (
+            map_hitbox is not None
+            and map_hitbox.coord_x == self.coord_x
+            and map_hitbox.coord_y == self.coord_y
+            and map_hitbox.rel_nose is self.rel_rot_coord_hitbox_nose
+            and map_hitbox.rel_bottom_left is self.rel_rot_coord_hitbox_bottom_left
+            and map_hitbox.rel_bottom_center is self.rel_rot_coord_hitbox_bottom_center
+            and map_hitbox.rel_bottom_right is self.rel_rot_coord_hitbox_bottom_right
+        ):
+            return map_hitbox
+        map_hitbox = self._map_hitbox = MapHitbox(self)
+        return map_hitbox
+
     @property
     def map_nose_coord(self) -> Tuple:
-        return (
-            self.coord_x + self.rel_rot_coord_hitbox_nose[0],
-            self.coord_y + self.rel_rot_coord_hitbox_nose[1],
-        )
+        return self._get_map_hitbox().coords[0]
 
     @property
     def map_bottom_left_coord(self) -> Tuple:
-        return (
-            self.coord_x + self.rel_rot_coord_hitbox_bottom_left[0],
-            self.coord_y + self.rel_rot_coord_hitbox_bottom_left[1],
-        )
+        return self._get_map_hitbox().coords[1]
 
     @property
     def map_bottom_right_coord(self) -> Tuple:
-        return (
-            self.coord_x + self.rel_rot_coord_hitbox_bottom_right[0],
-            self.coord_y + self.rel_rot_coord_hitbox_bottom_right[1],
-        )
+        return self._get_map_hitbox().coords[3]
 
     @property
     def map_bottom_center_coord(self) -> Tuple:
-        return (
-            self.coord_x + self.rel_rot_coord_hitbox_bottom_center[0],
-            self.coord_y + self.rel_rot_coord_hitbox_bottom_center[1],
-        )
+        return self._get_map_hitbox().coords[2]
 
     @property
     def ebeam_heading(self) -> Union[float, int]:
@@ -452,21 +700,11 @@ class Ship(BaseModel):
 
     @property
     def hitbox_lines(self) -> Tuple[Tuple[Tuple]]:
-        return (
-            (self.map_nose_coord, self.map_bottom_left_coord),
-            (self.map_bottom_left_coord, self.map_bottom_center_coord),
-            (self.map_bottom_center_coord, self.map_bottom_right_coord),
-            (self.map_bottom_right_coord, self.map_nose_coord),
-        )
+        return self._get_map_hitbox().lines
 
     @property
     def hitbox_coords(self) -> Tuple[Tuple]:
-        return (
-            self.map_nose_coord,
-            self.map_bottom_left_coord,
-            self.map_bottom_center_coord,
-            self.map_bottom_right_coord,
-        )
+        return self._get_map_hitbox().coords
 
     @property
     def mass(self) -> int:
@@ -479,6 +717,15 @@ class Ship(BaseModel):
             + constants.PILOT_MASS
         ))
 
+    @property
+    def max_engine_acceleration_ms(self) -> float:
+        """ Acceleration (meters/second/second) with the engine lit and boosted.
+        """
+        mass = self.mass
+        if not mass:
+            return 0.0
+        return self.engine_newtons * (self.engine_boost_multiple or 1) / mass
+
     @property
     def is_stationary(self) -> bool:
         return self.velocity_x_meters_per_second == 0 and self.velocity_y_meters_per_second == 0
@@ -513,9 +760,31 @@ class Ship(BaseModel):
             this is all seen by the user in the SPA via ApiService::frameData.ship
         """
         return {
-            'id': self.id,
-            'team_id': self.team_id,
-            'skin_slug': self.skin_slug,
+            **dict(zip(SLOW_CHANGING_FIELDS, _get_slow_changing_values(self))),
+            'upgrade_summary': self._upgrade_summary,
+            **self._get_volatile_dict(),
+        }
+
+    def to_json(self) -> str:
+        """ JSON encoded to_dict().
+            Slow changing fields and the upgrade summary are only re-encoded when they change.
+        """
+        slow_changing_values = _get_slow_changing_values(self)
+        if slow_changing_values != self._slow_changing_values:
+            self._slow_changing_values = slow_changing_values
+            self._slow_changing_json = json.dumps(dict(zip(SLOW_CHANGING_FIELDS, slow_changing_values)))[1:-1]
+        if self._upgrade_summary_json is None:
+            self._upgrade_summary_json = json.dumps(self._upgrade_summary)
+        return (
+            '{' + self._slow_changing_json
+            + ', "upgrade_summary": ' + self._upgrade_summary_json
+            + ', ' + json.dumps(self._get_volatile_dict())[1:]
+        )
+
+    def _get_volatile_dict(self) -> Dict:
+        # Fields that may change on any frame.
+        map_nose_coord, map_bottom_left_coord, map_bottom_center_coord, map_bottom_right_coord = self.hitbox_coords
+        return {
             'mass': self.mass,
             'coord_x': self.coord_x,
             'coord_y': self.coord_y,
@@ -523,68 +792,43 @@ class Ship(BaseModel):
             'velocity_x_meters_per_second': self.velocity_x_meters_per_second,
             'velocity_y_meters_per_second': self.velocity_y_meters_per_second,
             'battery_power': self.battery_power,
-            'battery_capacity': self.battery_capacity,
             'fuel_level': self.fuel_level,
-            'fuel_capacity': self.fuel_capacity,
             'fueling_at_station': self.fueling_at_station,
-            'fuel_cost_ore_kg_per_fuel_unit': self.fuel_cost_ore_kg_per_fuel_unit,
-
-            'map_nose_coord': self.map_nose_coord,
-            'map_bottom_left_coord': self.map_bottom_left_coord,
-            'map_bottom_right_coord': self.map_bottom_right_coord,
-            'map_bottom_center_coord': self.map_bottom_center_coord,
 
-            'upgrade_summary': self._upgrade_summary,
+            'map_nose_coord': map_nose_coord,
+            'map_bottom_left_coord': map_bottom_left_coord,
+            'map_bottom_right_coord': map_bottom_right_coord,
+            'map_bottom_center_coord': map_bottom_center_coord,
 
-            'engine_newtons': self.engine_newtons,
             'engine_online': self.engine_online,
             'engine_lit': self.engine_lit,
             'engine_starting': self.engine_starting,
             'engine_boosted': self.engine_boosted,
             'engine_boosted_last_frame': self.engine_boosted_last_frame,
-            'engine_lit_thermal_signature_rate_per_second': self.engine_lit_thermal_signature_rate_per_second,
 
             'apu_starting': self.apu_starting,
             'apu_online': self.apu_online,
-            'apu_battery_charge_per_second': self.apu_battery_charge_per_second,
-            'apu_fuel_usage_per_second': self.apu_fuel_usage_per_second,
-            'apu_online_thermal_signature_rate_per_second': self.apu_online_thermal_signature_rate_per_second,
 
             'scanner_online': self.scanner_online,
             'scanner_locking': self.scanner_locking,
             'scanner_locked': self.scanner_locked,
             'scanner_lock_target': self.scanner_lock_target,
+            'scanner_lock_traversal_slack': self.scanner_lock_traversal_slack,
             'scanner_starting': self.scanner_starting,
             'scanner_mode': self.scanner_mode,
-            'scanner_radar_range': self.scanner_radar_range,
-            'scanner_ir_range': self.scanner_ir_range,
-            'scanner_ir_minimum_thermal_signature': self.scanner_ir_minimum_thermal_signature,
             'scanner_ship_data': list(self.scanner_ship_data.values()),
             'scanner_magnet_mine_data': list(self.scanner_magnet_mine_data.values()),
             'scanner_emp_data': list(self.scanner_emp_data.values()),
             'scanner_hunter_drone_data': list(self.scanner_hunter_drone_data.values()),
             'scanner_thermal_signature': self.scanner_thermal_signature,
-            'scanner_lock_traversal_slack': self.scanner_lock_traversal_slack,
-            'scanner_locking_max_traversal_degrees': self.scanner_locking_max_traversal_degrees,
-            'scanner_locked_max_traversal_degrees': self.scanner_locked_max_traversal_degrees,
-            'scanner_radar_sensitivity': self.scanner_radar_sensitivity,
-            'anti_radar_coating_level': self.anti_radar_coating_level,
 
             'ebeam_firing': self.ebeam_firing,
             'ebeam_charging': self.ebeam_charging,
-            'ebeam_charge_capacity': self.ebeam_charge_capacity,
-            'ebeam_color': self.ebeam_color,
             'ebeam_charge': self.ebeam_charge,
             'ebeam_can_fire': self.ebeam_charge >= self.ebeam_charge_fire_minimum and not self.ebeam_firing,
             'ebeam_last_hit_frame': self.ebeam_last_hit_frame,
-            'ebeam_charge_rate_per_second': self.ebeam_charge_rate_per_second,
-            'ebeam_charge_power_usage_per_second': self.ebeam_charge_power_usage_per_second,
-            'ebeam_charge_thermal_signature_rate_per_second': self.ebeam_charge_thermal_signature_rate_per_second,
-            'ebeam_charge_fire_minimum': self.ebeam_charge_fire_minimum,
             'ebeam_autofire_enabled': self.ebeam_autofire_enabled,
-            'ebeam_autofire_max_range': self.ebeam_autofire_max_range,
 
-            'special_weapons_tubes_count': self.special_weapons_tubes_count,
             'last_tube_fire_frame': self.last_tube_fire_frame,
             'special_weapons_loaded': self.special_weapons_loaded,
             'magnet_mines_loaded': self.magnet_mines_loaded,
@@ -594,7 +838,6 @@ class Ship(BaseModel):
             'docked_at_station': self.docked_at_station,
             'scouted_station_gravity_brake_catches_last_frame': self.scouted_station_gravity_brake_catches_last_frame,
             'gravity_brake_position': self.gravity_brake_position,
-            'gravity_brake_deployed_position': self.gravity_brake_deployed_position,
             'gravity_brake_retracting': self.gravity_brake_retracting,
             'gravity_brake_extending': self.gravity_brake_extending,
             'gravity_brake_active': self.gravity_brake_active,
@@ -603,7 +846,6 @@ class Ship(BaseModel):
             'parked_at_ore_mine': self.parked_at_ore_mine,
             'mining_ore': self.mining_ore,
             'cargo_ore_mass_kg': self.cargo_ore_mass_kg,
-            'cargo_ore_mass_capacity_kg': self.cargo_ore_mass_capacity_kg,
             'virtual_ore_kg': self.virtual_ore_kg,
             'scouted_mine_ore_remaining': self.scouted_mine_ore_remaining,
             'last_ore_deposit_frame': self.last_ore_deposit_frame,
@@ -613,8 +855,6 @@ class Ship(BaseModel):
             'aflame': self.aflame_since_frame is not None,
             'exploded': self.exploded,
 
-            'visual_range': self.visual_range,
-
             'autopilot_program': self.autopilot_program,
 
             'timers': list(self.get_timer_items()),
@@ -683,6 +923,16 @@ class Ship(BaseModel):
         bottom_center_y = nose_y * -1
         instance.rel_rot_coord_hitbox_bottom_center = (bottom_center_x, bottom_center_y, )
         instance.rel_fixed_coord_hitbox_bottom_center = (bottom_center_x, bottom_center_y, )
+        # Rotated coords are rounded, pad the radius so that it always contains them.
+        instance.hitbox_radius = max(
+            math.hypot(*coord)
+            for coord in (
+                instance.rel_fixed_coord_hitbox_nose,
+                instance.rel_fixed_coord_hitbox_bottom_left,
+                instance.rel_fixed_coord_hitbox_bottom_right,
+                instance.rel_fixed_coord_hitbox_bottom_center,
+            )
+        ) + 2
 
 
         instance.battery_power = constants.BATTERY_STARTING_POWER
@@ -1104,11 +1354,7 @@ class Ship(BaseModel):
                     self.velocity_y_meters_per_second = 0
 
             if self.is_stationary:
-                # Docking complete
-                self.gravity_brake_active = False
-                self.docked_at_station = self.docking_at_station
-                self.docking_at_station = None
-                self._cmd_trade_ore_for_ore_coin(game_frame)
+                self.complete_gravity_brake_docking(game_frame)
                 return
 
 
@@ -1141,6 +1387,12 @@ class Ship(BaseModel):
             distance_map_units,
         )
 
+    def complete_gravity_brake_docking(self, game_frame=None) -> None:
+        self.gravity_brake_active = False
+        self.docked_at_station = self.docking_at_station
+        self.docking_at_station = None
+        self._cmd_trade_ore_for_ore_coin(game_frame)
+
     def use_ebeam_charge(self, fps: int) -> bool:
         if not self.ebeam_firing:
             return False
@@ -1377,6 +1629,9 @@ class Ship(BaseModel):
             raise NotImplementedError
 
     def advance_upgrades(self, fps: int) -> None:
+        if self._core_upgrade_active_indexes or self._ship_upgrade_active_indexes:
+            self._upgrade_summary_json = None
+
         # CORE UPGRADES # #
         core_ix_to_remove = []
         utype = UpgradeType.CORE
@@ -1566,29 +1821,19 @@ class Ship(BaseModel):
 
 
     def _set_relative_coords(self) -> None:
-        delta_radians = utils2d.degrees_to_radians(
-            utils2d.heading_to_delta_heading_from_zero(self.heading)
-        )
-
-        self.rel_rot_coord_hitbox_nose = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_nose,
-            delta_radians,
-        )
-        self.rel_rot_coord_hitbox_bottom_left = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_bottom_left,
-            delta_radians,
-        )
-        self.rel_rot_coord_hitbox_bottom_center = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_bottom_center,
-            delta_radians,
-        )
-        self.rel_rot_coord_hitbox_bottom_right = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_bottom_right,
-            delta_radians,
+        (
+            self.rel_rot_coord_hitbox_nose,
+            self.rel_rot_coord_hitbox_bottom_left,
+            self.rel_rot_coord_hitbox_bottom_center,
+            self.rel_rot_coord_hitbox_bottom_right,
+        ) = get_rotated_hitbox(
+            (
+                self.rel_fixed_coord_hitbox_nose,
+                self.rel_fixed_coord_hitbox_bottom_left,
+                self.rel_fixed_coord_hitbox_bottom_center,
+                self.rel_fixed_coord_hitbox_bottom_right,
+            ),
+            self.heading,
         )
 
     # Engine Commands
@@ -1794,6 +2039,7 @@ class Ship(BaseModel):
         self._upgrades[utype][upgrade_ix].seconds_researched = 0
         self._core_upgrade_active_indexes.append(upgrade_ix)
         self._upgrade_summary[utype][slug]['seconds_researched'] = 0
+        self._upgrade_summary_json = None
 
     def cmd_start_ship_upgrade(self, slug: str) -> None:
         utype = UpgradeType.SHIP
@@ -1830,6 +2076,7 @@ class Ship(BaseModel):
         self._upgrades[utype][upgrade_ix].seconds_researched = 0
         self._ship_upgrade_active_indexes.append(upgrade_ix)
         self._upgrade_summary[utype][slug]['seconds_researched'] = 0
+        self._upgrade_summary_json = None
 
     def cmd_cancel_core_upgrade(self, slug: str) -> None:
         self._cancel_upgrade(UpgradeType.CORE, slug)
@@ -1881,6 +2128,7 @@ class Ship(BaseModel):
         self._upgrade_summary[utype][
                 self._upgrades[utype][upgrade_ix].slug
             ]['seconds_researched'] = None
+        self._upgrade_summary_json = None
 
     # TUBE WEAPON COMMANDS
     def cmd_buy_magnet_mine(self):
@@ -1,4 +1,5 @@
 
+from itertools import chain, product
 import random
 from typing import Dict
 def get_designations(ship_ids) -> Dict:
@@ -29,19 +30,29 @@ def get_designations(ship_ids) -> Dict:
         raise Exception("part_1 word too long")
     if any(len(w) > 6 for w in part_2):
         raise Exception("part_2 word too long")
-    if len(ship_ids) > len(part_1) or len(ship_ids) > len(part_2):
+    # Large games (IE the 128 ship benchmarks) reuse words, so capacity is the
+    # number of word pairs, less designators longer than 10 characters
+    # which are skipped below.
+    capacity = sum(1 for p1, p2 in product(part_1, part_2) if len(p1) + len(p2) + 1 <= 10)
+    if len(ship_ids) > capacity:
         raise Exception("too many ships to assign a unique identifier")
     shuffled_parts_1 = sorted(part_1, key=lambda v: random.random())
     shuffled_parts_2 = sorted(part_2, key=lambda v: random.random())
     out = {}
-    parts = zip(shuffled_parts_1, shuffled_parts_2)
+    parts = chain(
+        zip(shuffled_parts_1, shuffled_parts_2),
+        # Large games run out of unused words, start reusing them.
+        product(shuffled_parts_1, shuffled_parts_2),
+    )
+    used = set()
     for ship_id in ship_ids:
         while True:
             parts_this_ship = next(parts)
             designator = f"{parts_this_ship[0]} {parts_this_ship[1]}"
-            if len(designator) > 10:
+            if len(designator) > 10 or designator in used:
                 continue
             else:
                 break
+        used.add(designator)
         out[ship_id] = designator
     return out
@@ -1,12 +1,13 @@
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 from api.models.base import BaseModel
+from api.projectile_table import TableBackedProjectile
 from api import constants
-from api import utils2d
+from api.hitbox_rotation import get_rotated_hitbox
 
 
-class MagnetMine(BaseModel):
+class MagnetMine(TableBackedProjectile, BaseModel):
     """ Guided explosive munition (dumb acceleration model)
         that tracks any closest ship (including the shooter).
         Arms after a short period.
@@ -14,8 +15,20 @@ class MagnetMine(BaseModel):
         within a large AOE.
     """
 
-    def __init__(self, game_frame: int, ship_id: str):
-        super().__init__()
+    __slots__ = TableBackedProjectile.TABLE_SLOTS + (
+        'created_frame',
+        'ship_id',
+        'armed',
+        'percent_armed',
+        'exploded',
+        'closest_ship_id',
+        'distance_to_closest_ship',
+        'proximity_checked_frame',
+        'proximity_checked_coords',
+    )
+
+    def __init__(self, game_frame: int, ship_id: str, id: Optional[str] = None):
+        super().__init__(id)
         self.elapsed_milliseconds = 0
         self.created_frame = game_frame
         self.ship_id = ship_id
@@ -32,6 +45,11 @@ class MagnetMine(BaseModel):
         self.velocity_x_meters_per_second = float(0)
         self.velocity_y_meters_per_second = float(0)
 
+        # Frame and position of the last proximity check, the fuze checks
+        # the path swept since then (see Game._get_swept_fuze_contact)
+        self.proximity_checked_frame = None
+        self.proximity_checked_coords = None
+
         self.closest_ship_id = None
         self.distance_to_closest_ship = None
 
@@ -40,14 +58,22 @@ class MagnetMine(BaseModel):
         return (self.coord_x, self.coord_y,)
 
 
-class EMP(BaseModel):
+class EMP(TableBackedProjectile, BaseModel):
     """ Unguided munition. Arms after a number of seconds.
         Explodes within proximity of any ship.
         AOE effect that deactivates all systems and drains power.
     """
 
-    def __init__(self, game_frame: int, ship_id: str):
-        super().__init__()
+    __slots__ = TableBackedProjectile.TABLE_SLOTS + (
+        'created_frame',
+        'ship_id',
+        'exploded',
+        'proximity_checked_frame',
+        'proximity_checked_coords',
+    )
+
+    def __init__(self, game_frame: int, ship_id: str, id: Optional[str] = None):
+        super().__init__(id)
         self.elapsed_milliseconds = 0
         self.created_frame = game_frame
         self.ship_id = ship_id
@@ -61,12 +87,15 @@ class EMP(BaseModel):
         self.velocity_x_meters_per_second = float(0)
         self.velocity_y_meters_per_second = float(0)
 
+        self.proximity_checked_frame = None
+        self.proximity_checked_coords = None
+
     @property
     def coords(self):
         return (self.coord_x, self.coord_y,)
 
 
-class HunterDrone(BaseModel):
+class HunterDrone(TableBackedProjectile, BaseModel):
     """ guided munition that patroles
         and tracks (smart acceleration model)
         first enemy ship encountered.
@@ -74,6 +103,29 @@ class HunterDrone(BaseModel):
         within a small AOE.
     """
 
+    __slots__ = TableBackedProjectile.TABLE_SLOTS + (
+        'created_frame',
+        'ship_id',
+        'team_id',
+        'target_ship_id',
+        'max_acquisition_meters',
+        'tracking_acceleration_ms',
+        'armed',
+        'percent_armed',
+        'exploded',
+        'heading',
+        'rel_fixed_coord_hitbox_nose',
+        'rel_fixed_coord_hitbox_bottom_left',
+        'rel_fixed_coord_hitbox_bottom_right',
+        'rel_rot_coord_hitbox_nose',
+        'rel_rot_coord_hitbox_bottom_left',
+        'rel_rot_coord_hitbox_bottom_right',
+        'autopilot_mode',
+        'autopilot_patrol_pattern',
+        'proximity_checked_frame',
+        'proximity_checked_coords',
+    )
+
     AUTOPILOT_MODE_PATROL = "patrol"
     AUTOPILOT_PATROL_PATERN_CLOCKWISE = "cw"
     AUTOPILOT_PATROL_PATERN_COUNTERCLOCKWISE = "ccw"
@@ -92,8 +144,9 @@ class HunterDrone(BaseModel):
         coord_y: int,
         max_acquisition_meters: int,
         tracking_acceleration_ms: int,
+        id: Optional[str] = None,
     ):
-        super().__init__()
+        super().__init__(id)
         self.elapsed_milliseconds = 0
         self.created_frame = game_frame
         self.ship_id = ship_id      # ship the drone was spawned from
@@ -114,6 +167,9 @@ class HunterDrone(BaseModel):
         self.velocity_x_meters_per_second = float(initial_velocity_x_meters_per_second)
         self.velocity_y_meters_per_second = float(initial_velocity_y_meters_per_second)
 
+        self.proximity_checked_frame = None
+        self.proximity_checked_coords = None
+
         # Heading of drone in degrees (between 0 and 359)
         self.heading = None
 
@@ -179,21 +235,15 @@ class HunterDrone(BaseModel):
 
 
     def _set_relative_coords(self) -> None:
-        delta_radians = utils2d.degrees_to_radians(
-            utils2d.heading_to_delta_heading_from_zero(self.heading)
-        )
-        self.rel_rot_coord_hitbox_nose = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_nose,
-            delta_radians,
-        )
-        self.rel_rot_coord_hitbox_bottom_left = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_bottom_left,
-            delta_radians,
-        )
-        self.rel_rot_coord_hitbox_bottom_right = utils2d.rotate(
-            constants.ORGIN_COORD,
-            self.rel_fixed_coord_hitbox_bottom_right,
-            delta_radians,
+        (
+            self.rel_rot_coord_hitbox_nose,
+            self.rel_rot_coord_hitbox_bottom_left,
+            self.rel_rot_coord_hitbox_bottom_right,
+        ) = get_rotated_hitbox(
+            (
+                self.rel_fixed_coord_hitbox_nose,
+                self.rel_fixed_coord_hitbox_bottom_left,
+                self.rel_fixed_coord_hitbox_bottom_right,
+            ),
+            self.heading,
         )
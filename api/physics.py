@@ -0,0 +1,160 @@
+""" Batched ship physics.
+
+    Struct of arrays version of Ship.calculate_physics(). Ship state is copied
+    into contiguous arrays, every ship is integrated in one vectorized pass and
+    results are written back to the Ship objects.
+
+    Results are bit identical to the scalar path:
+     - sin/cos come from lookup tables built with the same math calls utils2d uses.
+     - sqrt, division and multiplication are IEEE 754 exact in both numpy and python.
+     - np.round and round() both round half to even.
+     - numpy's arctan may differ from math.atan in the last bit, so headings that land
+       close to a rounding boundary are recomputed with utils2d.
+
+    Ships with a non integer heading fall back to Ship.calculate_physics().
+"""
+
+import math
+from typing import List
+
+import numpy as np
+
+from api import utils2d
+from api.models.ship import Ship
+
+
+# sin/cos for every whole degree.
+SIN_LUT = np.array([math.sin(utils2d.degrees_to_radians(d)) for d in range(360)])
+COS_LUT = np.array([math.cos(utils2d.degrees_to_radians(d)) for d in range(360)])
+
+# Headings within this many degrees of a .5 boundary are recomputed in python.
+ROUNDING_GUARD_DEGREES = 1e-6
+
+
+def _can_batch(ship: Ship) -> bool:
+    return type(ship.heading) is int and 0 <= ship.heading <= 360
+
+
+def _apply_gravity_brake(velocity: np.ndarray, braking: np.ndarray, fps: int):
+    """ Vectorized gravity brake slowdown for one velocity axis.
+        Returns new velocities, a mask of velocities that were snapped
+        to 0, and a mask of velocities that were changed.
+    """
+    braking = braking & (velocity != 0)
+    magnitude = np.abs(velocity)
+    delta = np.where(
+        magnitude > utils2d.MAX_VELOCITY_FOR_GRAVITY_BRAKE,
+        magnitude - utils2d.MAX_VELOCITY_FOR_GRAVITY_BRAKE,
+        np.minimum(magnitude, velocity * velocity + 2) / fps,
+    )
+    direction = np.where(velocity < 0, 1, -1)
+    velocity = np.where(braking, velocity + delta * direction, velocity)
+    stopped = braking & (np.abs(velocity) < 5)
+    return np.where(stopped, 0.0, velocity), stopped, braking
+
+
+def calculate_ships_physics(ships: List[Ship], fps: int, game_frame=None) -> None:
+    batch: List[Ship] = []
+    for ship in ships:
+        if _can_batch(ship):
+            batch.append(ship)
+        else:
+            ship.calculate_physics(fps, game_frame)
+
+    if not batch:
+        return
+
+    coord_x = np.array([ship.coord_x for ship in batch], dtype=np.float64)
+    coord_y = np.array([ship.coord_y for ship in batch], dtype=np.float64)
+    velocity_x = np.array([ship.velocity_x_meters_per_second for ship in batch], dtype=np.float64)
+    velocity_y = np.array([ship.velocity_y_meters_per_second for ship in batch], dtype=np.float64)
+    heading = np.array([ship.heading for ship in batch], dtype=np.int64)
+    map_units_per_meter = np.array([ship.map_units_per_meter for ship in batch], dtype=np.float64)
+
+    # Apply gravity brake.
+    braking = np.array([ship.gravity_brake_active for ship in batch])
+    stopped_x = stopped_y = updated_x = updated_y = np.zeros(len(batch), dtype=bool)
+    if braking.any():
+        velocity_x, stopped_x, updated_x = _apply_gravity_brake(velocity_x, braking, fps)
+        velocity_y, stopped_y, updated_y = _apply_gravity_brake(velocity_y, braking, fps)
+    docked = braking & (velocity_x == 0) & (velocity_y == 0)
+
+    # Apply engine thrust.
+    thrusting = np.array([
+        ship.engine_lit and ship.docked_at_station is None
+        for ship in batch
+    ]) & ~braking
+    if thrusting.any():
+        force = np.array([
+            ship.engine_newtons * (ship.engine_boost_multiple if ship.engine_boosted else 1)
+            if thrusting[ix] else 0
+            for ix, ship in enumerate(batch)
+        ], dtype=np.float64)
+        mass = np.array([ship.mass for ship in batch], dtype=np.float64)
+        adj_meters_per_frame = (force / mass) / fps
+        # utils2d.calculate_x_y_components returns (0, 0) for a zero magnitude.
+        thrusting &= adj_meters_per_frame != 0
+        thrust_heading = heading % 360
+        velocity_x = np.where(thrusting, velocity_x + adj_meters_per_frame * SIN_LUT[thrust_heading], velocity_x)
+        velocity_y = np.where(thrusting, velocity_y + adj_meters_per_frame * COS_LUT[thrust_heading], velocity_y)
+
+    # Calculate new coordinates with current velocity.
+    moving = ((velocity_x != 0) | (velocity_y != 0)) & ~docked
+    moved_heading = np.zeros(len(batch), dtype=np.int64)
+    distance_map_units = np.zeros(len(batch), dtype=np.float64)
+    if moving.any():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            meters = np.sqrt(velocity_x * velocity_x + velocity_y * velocity_y)
+            angle = np.where(
+                velocity_y != 0,
+                np.degrees(np.arctan(velocity_x / velocity_y)),
+                np.where(velocity_x > 0, 90.0, 270.0),
+            )
+        rounded = np.round(angle).astype(np.int64)
+        x_negative = velocity_x < 0
+        y_negative = velocity_y < 0
+        unsigned = np.where(rounded >= 0, rounded % 360, 360 + rounded)
+        inverted = np.where(unsigned >= 180, unsigned - 180, unsigned + 180)
+        moved_heading = np.select(
+            [
+                ~x_negative & ~y_negative,
+                x_negative & y_negative,
+                y_negative,
+            ],
+            [
+                rounded,
+                np.where(rounded >= 180, rounded - 180, rounded + 180),
+                inverted,
+            ],
+            default=unsigned,
+        )
+        distance_map_units = np.round((meters * map_units_per_meter) / fps)
+
+        near_boundary = moving & (np.abs(np.abs(angle - np.floor(angle)) - 0.5) < ROUNDING_GUARD_DEGREES)
+        for ix in np.flatnonzero(near_boundary).tolist():
+            _, moved_heading[ix] = utils2d.calculate_resultant_vector(
+                velocity_x[ix].item(),
+                velocity_y[ix].item(),
+            )
+
+    translate_heading = moved_heading % 360
+    new_x = np.round(coord_x + distance_map_units * SIN_LUT[translate_heading])
+    new_y = np.round(coord_y + distance_map_units * COS_LUT[translate_heading])
+
+    # Write back. Only touch values the scalar path would have
+    # assigned, so ints stay ints in the state payload.
+    velocity_x = velocity_x.tolist()
+    velocity_y = velocity_y.tolist()
+    new_x = new_x.tolist()
+    new_y = new_y.tolist()
+    for ix, ship in enumerate(batch):
+        if thrusting[ix] or updated_x[ix]:
+            ship.velocity_x_meters_per_second = 0 if stopped_x[ix] else velocity_x[ix]
+        if thrusting[ix] or updated_y[ix]:
+            ship.velocity_y_meters_per_second = 0 if stopped_y[ix] else velocity_y[ix]
+        if docked[ix]:
+            # Docking complete
+            ship.complete_gravity_brake_docking(game_frame)
+        elif moving[ix]:
+            ship.coord_x = int(new_x[ix])
+            ship.coord_y = int(new_y[ix])
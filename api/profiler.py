@@ -0,0 +1,98 @@
+""" Per phase frame timing.
+
+    Game.run_frame() calls lap() after each phase, the time since the previous
+    lap is recorded against the phase. Samples are kept in a rolling window,
+    summarized as p50/p95/p99/max by get_stats().
+    Counters (IE cache hits) are totals since the last reset, see get_counters().
+"""
+
+from collections import deque, OrderedDict
+from time import perf_counter_ns
+from typing import Deque, Dict, Iterable, List, Optional, TypedDict
+
+
+class PhaseStats(TypedDict):
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def _percentile(sorted_samples: List[int], percent: int) -> int:
+    # Nearest rank percentile.
+    rank = max(1, -(-percent * len(sorted_samples) // 100))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples: Iterable[int]) -> PhaseStats:
+    """ Summarize nanosecond samples as millisecond percentiles.
+    """
+    sorted_samples = sorted(samples)
+    return {
+        "count": len(sorted_samples),
+        "p50_ms": _percentile(sorted_samples, 50) / 1e6,
+        "p95_ms": _percentile(sorted_samples, 95) / 1e6,
+        "p99_ms": _percentile(sorted_samples, 99) / 1e6,
+        "max_ms": sorted_samples[-1] / 1e6,
+    }
+
+
+class FrameProfiler:
+
+    # Total time for the frame, from start_frame() to end_frame()
+    FRAME = "frame"
+
+    def __init__(self, window: int = 900):
+        self.window = window
+        self._samples: Dict[str, Deque[int]] = OrderedDict()
+        self._frame_started_at: Optional[int] = None
+        self._lap_started_at: Optional[int] = None
+        self._counters: Dict[str, int] = OrderedDict()
+
+    def _get_samples(self, phase: str) -> Deque[int]:
+        if phase not in self._samples:
+            self._samples[phase] = deque(maxlen=self.window)
+        return self._samples[phase]
+
+    def start_frame(self):
+        self._frame_started_at = self._lap_started_at = perf_counter_ns()
+
+    def lap(self, phase: str):
+        """ Record time elapsed since the previous lap (or start of frame) against phase.
+        """
+        now = perf_counter_ns()
+        if self._lap_started_at is not None:
+            self._get_samples(phase).append(now - self._lap_started_at)
+        self._lap_started_at = now
+
+    def end_frame(self):
+        if self._frame_started_at is not None:
+            self._get_samples(self.FRAME).append(perf_counter_ns() - self._frame_started_at)
+        self._frame_started_at = self._lap_started_at = None
+
+    def record(self, phase: str, duration_ns: int):
+        """ Record a duration measured outside of the frame (IE serialization)
+        """
+        self._get_samples(phase).append(duration_ns)
+
+    def count(self, name: str, amount: int = 1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self, window: Optional[int] = None):
+        """ Drop every sample and counter, optionally resizing the rolling window.
+        """
+        if window is not None:
+            self.window = window
+        self._samples.clear()
+        self._counters.clear()
+
+    def get_stats(self) -> Dict[str, PhaseStats]:
+        stats = {}
+        for phase, samples in self._samples.items():
+            if samples:
+                stats[phase] = summarize(samples)
+        return stats
+
+    def get_counters(self) -> Dict[str, int]:
+        return dict(self._counters)
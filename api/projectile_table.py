@@ -0,0 +1,127 @@
+""" Pooled, array backed storage for projectile (magnet mine, EMP, hunter drone) kinematics.
+
+    Projectile objects keep their public attributes (coord_x, velocity_x_meters_per_second, etc),
+    but once attached to a table the values live in numpy arrays so the game loop
+    can advance every projectile with vectorized operations.
+    Slots of removed projectiles are put on a free list and reused.
+"""
+
+from typing import Iterable, List
+
+import numpy as np
+
+
+class ProjectileTable:
+
+    FIELDS = (
+        'coord_x',
+        'coord_y',
+        'velocity_x_meters_per_second',
+        'velocity_y_meters_per_second',
+        'elapsed_milliseconds',
+    )
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        for field in self.FIELDS:
+            setattr(self, field, np.zeros(capacity, dtype=np.float64))
+        # Pop from the end, so lower slots are handed out first.
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return self.capacity - len(self._free)
+
+    def _grow(self):
+        new_capacity = self.capacity * 2
+        for field in self.FIELDS:
+            column = np.zeros(new_capacity, dtype=np.float64)
+            column[:self.capacity] = getattr(self, field)
+            setattr(self, field, column)
+        self._free = list(range(new_capacity - 1, self.capacity - 1, -1)) + self._free
+        self.capacity = new_capacity
+
+    def allocate(self) -> int:
+        if not self._free:
+            self._grow()
+        return self._free.pop()
+
+    def release(self, slot: int):
+        for field in self.FIELDS:
+            getattr(self, field)[slot] = 0
+        self._free.append(slot)
+
+
+class TableField:
+    """ Descriptor for a projectile attribute that is stored
+        in a ProjectileTable column while the projectile is attached.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        # Slot that holds the value while the projectile is detached.
+        self.detached_name = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if instance._table is None:
+            return getattr(instance, self.detached_name)
+        # ndarray.item(ix) returns a python float without creating a numpy scalar first.
+        return getattr(instance._table, self.name).item(instance._slot)
+
+    def __set__(self, instance, value):
+        if instance._table is None:
+            setattr(instance, self.detached_name, value)
+        else:
+            getattr(instance._table, self.name)[instance._slot] = value
+
+
+class TableBackedProjectile:
+    """ Mixin for slotted projectile models,
+        subclasses must include TABLE_SLOTS in their __slots__.
+    """
+    __slots__ = ()
+
+    TABLE_SLOTS = ('_table', '_slot') + tuple('_' + field for field in ProjectileTable.FIELDS)
+
+    coord_x = TableField()
+    coord_y = TableField()
+    velocity_x_meters_per_second = TableField()
+    velocity_y_meters_per_second = TableField()
+    elapsed_milliseconds = TableField()
+
+    def __init__(self, *args, **kwargs):
+        self._table = None
+        self._slot = None
+        super().__init__(*args, **kwargs)
+
+    def attach(self, table: ProjectileTable) -> int:
+        values = {field: getattr(self, field) for field in ProjectileTable.FIELDS}
+        self._slot = table.allocate()
+        self._table = table
+        for field, value in values.items():
+            setattr(self, field, value)
+        return self._slot
+
+    def detach(self):
+        """ Copy values out of the table and free the slot.
+        """
+        if self._table is None:
+            return
+        values = {field: getattr(self, field) for field in ProjectileTable.FIELDS}
+        self._table.release(self._slot)
+        self._table = None
+        self._slot = None
+        for field, value in values.items():
+            setattr(self, field, value)
+
+
+def get_slots(projectiles: Iterable[TableBackedProjectile], table: ProjectileTable) -> np.ndarray:
+    """ Get table slots for projectiles, attaching any projectile that isn't attached yet.
+    """
+    slots = []
+    for projectile in projectiles:
+        if projectile._table is None:
+            projectile.attach(table)
+        slots.append(projectile._slot)
+    return np.array(slots, dtype=np.int64)
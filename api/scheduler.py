@@ -0,0 +1,136 @@
+""" Periodic ("every Nth frame") game tasks.
+
+    Tasks are declared in PERIODIC_TASKS with their period in frames. Work done
+    per entity (IE per ship) is staggered: every entity is given an offset the
+    first time it's checked, and is due once per period on its own frame, so
+    the work for a task is spread evenly across its period instead of every
+    entity landing on the same frame. Work that isn't per entity runs when
+    game_frame % period == 0.
+
+    A task can be deferred for an entity until a later frame (IE proximity checks
+    for a projectile that can't reach any ship yet), it's due on that frame and
+    then on its own frames again. The entity's other tasks aren't deferred.
+
+    With run_everything set every task is due on every frame, so tests can
+    run game logic deterministically.
+
+    Runs and time spent per task are reported to the frame profiler as
+    "task.<name>" samples (one per frame) and "task.<name>.runs" counters.
+    Work that's run with run() is timed for you, work that's inlined behind
+    is_due() is timed with a `with scheduler.timed(task):` block.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import count
+from time import perf_counter_ns
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from api.profiler import FrameProfiler
+
+
+class PeriodicTask:
+    GRAVITY_BRAKE_CATCH = 'gravity_brake_catch'
+    ORE_MINE_PARKING = 'ore_mine_parking'
+    GAME_CHECKS = 'game_checks'
+    SHOCKWAVE_PHYSICS = 'shockwave_physics'
+    MAGNET_MINE_TARGETING = 'magnet_mine_targeting'
+    MAGNET_MINE_PROXIMITY = 'magnet_mine_proximity'
+    EMP_PROXIMITY = 'emp_proximity'
+    HUNTER_DRONE_PROXIMITY = 'hunter_drone_proximity'
+
+
+# task -> period in frames
+PERIODIC_TASKS: Dict[str, int] = OrderedDict((
+    (PeriodicTask.GRAVITY_BRAKE_CATCH, 4),
+    (PeriodicTask.ORE_MINE_PARKING, 60),
+    (PeriodicTask.GAME_CHECKS, 45),
+    (PeriodicTask.SHOCKWAVE_PHYSICS, 5),
+    (PeriodicTask.MAGNET_MINE_TARGETING, 3),
+    (PeriodicTask.MAGNET_MINE_PROXIMITY, 3),
+    (PeriodicTask.EMP_PROXIMITY, 3),
+    (PeriodicTask.HUNTER_DRONE_PROXIMITY, 2),
+))
+
+
+class PeriodicScheduler:
+
+    def __init__(self, profiler: Optional[FrameProfiler] = None, tasks: Dict[str, int] = PERIODIC_TASKS):
+        self.profiler = profiler
+        self.tasks = tasks
+        self.run_everything = False
+        self._game_frame = 0
+        self._offset_counter = count()
+        # entity key -> stagger offset
+        self._offsets: Dict[Hashable, int] = {}
+        # (task, entity key) -> first frame the task is due again for the entity
+        self._deferred: Dict[Tuple[str, Hashable], int] = {}
+        # Per frame totals, flushed to the profiler by end_frame()
+        self._runs: Dict[str, int] = {}
+        self._cost_ns: Dict[str, int] = {}
+
+    def start_frame(self, game_frame: int):
+        self._game_frame = game_frame
+
+    def is_due(self, task: str, key: Optional[Hashable] = None) -> bool:
+        """ Is the task due this frame (for the entity with this key).
+        """
+        if not self.run_everything:
+            offset = 0
+            deferred_until = None
+            if key is not None:
+                offset = self._offsets.get(key)
+                if offset is None:
+                    offset = self._offsets[key] = next(self._offset_counter)
+                deferred_until = self._deferred.get((task, key))
+            if deferred_until is not None:
+                if self._game_frame < deferred_until:
+                    return False
+                del self._deferred[(task, key)]
+            elif (self._game_frame + offset) % self.tasks[task] != 0:
+                return False
+        self._runs[task] = self._runs.get(task, 0) + 1
+        return True
+
+    def run(self, task: str, key: Optional[Hashable], func: Callable, *args):
+        """ Call func(*args) if the task is due, timing it against the task.
+        """
+        if not self.is_due(task, key):
+            return None
+        with self.timed(task):
+            return func(*args)
+
+    @contextmanager
+    def timed(self, task: str):
+        """ Time the body of the with block against the task.
+        """
+        started_at = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._cost_ns[task] = self._cost_ns.get(task, 0) + perf_counter_ns() - started_at
+
+    def defer(self, task: str, key: Hashable, game_frame: Optional[int]):
+        """ The task isn't due before game_frame for the entity with this key.
+            None cancels the deferral.
+        """
+        if game_frame is None:
+            self._deferred.pop((task, key), None)
+        else:
+            self._deferred[(task, key)] = game_frame
+
+    def forget(self, key: Hashable):
+        """ Drop the offset of an entity that was removed from the game.
+        """
+        self._offsets.pop(key, None)
+        for task in self.tasks:
+            self._deferred.pop((task, key), None)
+
+    def end_frame(self):
+        if self.profiler is not None:
+            for task, runs in self._runs.items():
+                self.profiler.count(f"task.{task}.runs", runs)
+            for task, cost_ns in self._cost_ns.items():
+                self.profiler.record(f"task.{task}", cost_ns)
+        self._runs.clear()
+        self._cost_ns.clear()
@@ -0,0 +1,275 @@
+""" Headless match simulator.
+
+    Builds a Game from a map JSON (the same shape set_map takes), registers
+    synthetic players and steps run_frame() back to back without the webapp,
+    the TCP server or the FPS throttle. Frame commands come from a recorded
+    command log or a scripted bot policy. Prints per frame timings as JSON.
+
+    python -m api.simulate --players 8 --frames 900
+    python -m api.simulate --map map.json --commands match.jsonl
+"""
+
+import argparse
+import json
+import math
+import random
+from time import perf_counter_ns
+from typing import Dict, List, Optional, TypedDict
+
+from api.commands import GameCommandMixin
+from api.constants import MAX_SERVER_FPS
+from api.models.game import (
+    Game,
+    GamePhase,
+    FrameCommand,
+    MapDetails,
+    RunFrameDetails,
+)
+from api.models.ship import ShipCommands
+from api.profiler import PhaseStats, summarize
+
+
+DEFAULT_MAP_UNITS_PER_METER = 10
+DEFAULT_SPAWN_SPACING_METERS = 1500
+
+
+def get_player_id(ix: int) -> str:
+    return f"player-{ix}"
+
+
+def build_map(players: int, spacing_meters: int = DEFAULT_SPAWN_SPACING_METERS) -> MapDetails:
+    """ Generated map with spawn points on a square grid, one per player.
+    """
+    columns = math.ceil(math.sqrt(players))
+    rows = math.ceil(players / columns)
+    return {
+        'mapData': {
+            "meters_x": (columns + 1) * spacing_meters,
+            "meters_y": (rows + 1) * spacing_meters,
+            "name": f"Simulated {players} Player Grid",
+        },
+        'spawnPoints': [
+            {
+                'position_meters_x': (1 + ix % columns) * spacing_meters,
+                'position_meters_y': (1 + ix // columns) * spacing_meters,
+            }
+            for ix in range(players)
+        ],
+        'spaceStations': [],
+        'miningLocations': [],
+    }
+
+
+def build_game(
+    map_details: MapDetails,
+    players: int,
+    fps: int = MAX_SERVER_FPS,
+    map_units_per_meter: int = DEFAULT_MAP_UNITS_PER_METER,
+    logger=None,
+) -> Game:
+    """ Build a game that is LIVE and ready for run_frame().
+    """
+    if players < 2:
+        raise ValueError("At least 2 players are required")
+    if players > len(map_details['spawnPoints']):
+        raise ValueError(
+            f"Map has {len(map_details['spawnPoints'])} spawn points, cannot place {players} players"
+        )
+
+    game = Game(logger=logger)
+    game._max_players = max(game._max_players, players)
+    for ix in range(players):
+        game.register_player({
+            'player_id': get_player_id(ix),
+            'player_name': f"Bot {ix}",
+            'team_id': f"team-{ix}",
+        })
+    game.set_map(map_details, map_units_per_meter=map_units_per_meter)
+    game.advance_to_phase_1_starting()
+    while game._phase == GamePhase.STARTING:
+        game.decr_phase_1_starting_countdown()
+
+    game._fixed_fps = fps
+    return game
+
+
+class CommandLogPolicy:
+    """ Replay frame commands from a recorded JSONL log.
+
+        Each line is either a run_frame request ({"commands": [...]}) or a
+        line captured from a TCP session ({"run_frame": {"commands": [...]}}).
+        Lines with any other command root are skipped.
+        Recorded player IDs are mapped onto synthetic players in the order they
+        first appear. Once the log runs out, frames are run without commands.
+    """
+
+    def __init__(self, lines: List[str], player_ids: List[str]):
+        self.frames: List[List[FrameCommand]] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            request = json.loads(line)
+            if GameCommandMixin.CMD_ROOT_RUN_FRAME in request:
+                request = request[GameCommandMixin.CMD_ROOT_RUN_FRAME]
+            if 'commands' not in request:
+                continue
+            self.frames.append(request['commands'])
+
+        self._player_ids = player_ids
+        self._player_id_map: Dict[str, str] = {}
+        self._frame_ix = 0
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def _map_player_id(self, recorded_player_id: str) -> str:
+        if recorded_player_id not in self._player_id_map:
+            if len(self._player_id_map) >= len(self._player_ids):
+                raise ValueError("Command log has more players than the simulation")
+            self._player_id_map[recorded_player_id] = self._player_ids[len(self._player_id_map)]
+        return self._player_id_map[recorded_player_id]
+
+    def get_commands(self, game: Game) -> List[FrameCommand]:
+        if self._frame_ix >= len(self.frames):
+            return []
+        commands = [
+            {**command, 'player_id': self._map_player_id(command['player_id'])}
+            for command in self.frames[self._frame_ix]
+        ]
+        self._frame_ix += 1
+        return commands
+
+
+class ScriptedBotPolicy:
+    """ Bots that fly around, lock onto ships in scanner range and fire E-Beams.
+
+        Each bot reconsiders its orders every few seconds. All choices come
+        from a seeded random.Random so runs are reproducible.
+    """
+
+    def __init__(self, player_ids: List[str], seed: int = 0, think_every_frames: int = 90):
+        self.player_ids = player_ids
+        self.think_every_frames = think_every_frames
+        self._random = random.Random(seed)
+        # Stagger bots so they don't all think on the same frame.
+        self._next_think_frame = {
+            player_id: self._random.randint(1, think_every_frames)
+            for player_id in player_ids
+        }
+
+    def _get_bot_commands(self, game: Game, player_id: str) -> List[FrameCommand]:
+        ship = game._ships[game._player_id_to_ship_id_map[player_id]]
+        if ship.died_on_frame is not None:
+            return []
+
+        commands = []
+        def add(ship_command: str, *args):
+            commands.append({'player_id': player_id, 'ship_command': ship_command, 'args': list(args)})
+
+        if not ship.engine_online and not ship.engine_starting:
+            add(ShipCommands.ACTIVATE_ENGINE)
+        if not ship.scanner_online and not ship.scanner_starting:
+            add(ShipCommands.ACTIVATE_SCANNER)
+
+        if ship.scanner_locked:
+            if ship.ebeam_charge >= ship.ebeam_charge_fire_minimum:
+                add(ShipCommands.FIRE_EBEAM)
+            elif not ship.ebeam_charging:
+                add(ShipCommands.CHARGE_EBEAM)
+        elif ship.scanner_ship_data and not ship.scanner_locking:
+            add(ShipCommands.SET_SCANNER_LOCK_TARGET, self._random.choice(list(ship.scanner_ship_data)))
+
+        if game._game_frame < self._next_think_frame[player_id]:
+            return commands
+        self._next_think_frame[player_id] = game._game_frame + self.think_every_frames
+
+        if ship.engine_lit:
+            add(ShipCommands.UNLIGHT_ENGINE)
+        else:
+            add(ShipCommands.LIGHT_ENGINE)
+        if not ship.scanner_locking and not ship.scanner_locked:
+            # Turning breaks scanner locks, hold heading while locking on.
+            add(ShipCommands.SET_HEADING, self._random.randint(0, 359))
+        return commands
+
+    def get_commands(self, game: Game) -> List[FrameCommand]:
+        commands = []
+        for player_id in self.player_ids:
+            commands.extend(self._get_bot_commands(game, player_id))
+        return commands
+
+
+class SimulationResults(TypedDict):
+    frames: int
+    players: int
+    fps: int
+    elapsed_seconds: float
+    realtime_factor: float
+    frame: Optional[PhaseStats]
+    phases: Dict[str, PhaseStats]
+    counters: Dict[str, int]
+    frame_ms: Optional[List[float]]
+
+
+def run_simulation(game: Game, policy, frames: int, include_frame_ms: bool = False) -> SimulationResults:
+    """ Step game.run_frame() until frames have run or the game is complete.
+    """
+    # Reset rather than replace the profiler, the game's scheduler reports to it too.
+    game.profiler.reset(window=max(frames, 1))
+    frame_ns: List[int] = []
+    for _ in range(frames):
+        if game._phase != GamePhase.LIVE:
+            break
+        request: RunFrameDetails = {'commands': policy.get_commands(game)}
+        started_at = perf_counter_ns()
+        game.run_frame(request)
+        frame_ns.append(perf_counter_ns() - started_at)
+
+    elapsed_seconds = sum(frame_ns) / 1e9
+    return {
+        "frames": len(frame_ns),
+        "players": len(game._players),
+        "fps": game._fps,
+        "elapsed_seconds": elapsed_seconds,
+        "realtime_factor": (len(frame_ns) / game._fps) / elapsed_seconds if elapsed_seconds else 0,
+        "frame": summarize(frame_ns) if frame_ns else None,
+        "phases": game.profiler.get_stats(),
+        "counters": game.profiler.get_counters(),
+        "frame_ms": [ns / 1e6 for ns in frame_ns] if include_frame_ms else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a headless match and report frame timings')
+    parser.add_argument('--map', help='Path to map JSON, defaults to a generated grid map.')
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--frames', type=int, help='Defaults to the command log length, or 900.')
+    parser.add_argument('--commands', help='Path to a recorded JSONL command log, defaults to bots.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fps', type=int, default=MAX_SERVER_FPS)
+    parser.add_argument('--map-units-per-meter', type=int, default=DEFAULT_MAP_UNITS_PER_METER)
+    parser.add_argument('--frame-ms', action='store_true', help='Include every frame duration in the output.')
+    args = parser.parse_args()
+
+    # Seed the global random too, ship designators and death sequences use it.
+    random.seed(args.seed)
+
+    if args.map:
+        with open(args.map) as f:
+            map_details = json.load(f)
+    else:
+        map_details = build_map(args.players)
+
+    game = build_game(map_details, args.players, args.fps, args.map_units_per_meter)
+    player_ids = list(game._players.keys())
+
+    if args.commands:
+        with open(args.commands) as f:
+            policy = CommandLogPolicy(f.readlines(), player_ids)
+        frames = args.frames if args.frames is not None else len(policy)
+    else:
+        policy = ScriptedBotPolicy(player_ids, seed=args.seed)
+        frames = args.frames if args.frames is not None else 900
+
+    print(json.dumps(run_simulation(game, policy, frames, args.frame_ms), indent=2))
@@ -0,0 +1,210 @@
+""" Uniform grid spatial hash.
+
+    Narrows down candidate entities for radius and nearest neighbour queries
+    so that game loops don't have to scan every entity on the map.
+    Results are always returned in insertion order, so callers that iterate
+    over query results behave exactly like callers that iterate over the
+    original OrderedDicts.
+"""
+
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from api import utils2d
+
+
+class SpatialHash:
+
+    # Padding applied to radius queries so that float rounding never drops
+    # an item that the callers exact distance check would have kept.
+    RADIUS_TOLERANCE = 1e-6
+
+    def __init__(self, cell_size: float):
+        if not cell_size > 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, Hashable, Tuple]]] = {}
+        self._count = 0
+        self._bounds: Optional[List[int]] = None # [min_cx, min_cy, max_cx, max_cy]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        self._cells.clear()
+        self._count = 0
+        self._bounds = None
+
+    def _get_cell(self, coords: Tuple) -> Tuple[int, int]:
+        return (
+            math.floor(coords[0] / self.cell_size),
+            math.floor(coords[1] / self.cell_size),
+        )
+
+    def insert(self, item_id: Hashable, coords: Tuple):
+        cx, cy = self._get_cell(coords)
+        self._cells.setdefault((cx, cy), []).append((self._count, item_id, coords))
+        self._count += 1
+        if self._bounds is None:
+            self._bounds = [cx, cy, cx, cy]
+        else:
+            self._bounds[0] = min(self._bounds[0], cx)
+            self._bounds[1] = min(self._bounds[1], cy)
+            self._bounds[2] = max(self._bounds[2], cx)
+            self._bounds[3] = max(self._bounds[3], cy)
+
+    def query_radius(self, coords: Tuple, radius: float) -> List[Hashable]:
+        """ Get IDs of items within radius of coords, in insertion order.
+        """
+        if self._bounds is None or radius < 0:
+            return []
+
+        x, y = coords
+        min_cx = max(self._bounds[0], math.floor((x - radius) / self.cell_size))
+        min_cy = max(self._bounds[1], math.floor((y - radius) / self.cell_size))
+        max_cx = min(self._bounds[2], math.floor((x + radius) / self.cell_size))
+        max_cy = min(self._bounds[3], math.floor((y + radius) / self.cell_size))
+        if min_cx > max_cx or min_cy > max_cy:
+            return []
+
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+            # Query covers more cells than are occupied, walk the occupied cells instead.
+            buckets = (
+                bucket
+                for (cx, cy), bucket in self._cells.items()
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy
+            )
+        else:
+            buckets = (
+                self._cells[(cx, cy)]
+                for cx in range(min_cx, max_cx + 1)
+                for cy in range(min_cy, max_cy + 1)
+                if (cx, cy) in self._cells
+            )
+
+        padded_radius = radius + self.RADIUS_TOLERANCE * max(1, radius)
+        max_distance_squared = padded_radius * padded_radius
+        found = []
+        for bucket in buckets:
+            for ix, item_id, (ix_x, ix_y) in bucket:
+                dx = ix_x - x
+                dy = ix_y - y
+                if dx * dx + dy * dy <= max_distance_squared:
+                    found.append((ix, item_id))
+        found.sort()
+        return [item_id for _, item_id in found]
+
+    def nearest(
+        self,
+        coords: Tuple,
+        predicate: Optional[Callable[[Hashable], bool]] = None,
+        max_radius: Optional[float] = None,
+    ) -> Tuple[Optional[Hashable], Optional[float]]:
+        """ Get (item_id, distance) of the item closest to coords.
+            Ties go to the item inserted first. Returns (None, None) if no
+            item passes the predicate (or is within max_radius).
+        """
+        if self._bounds is None:
+            return None, None
+
+        best = None # (distance, insertion index, item_id)
+
+        def check_bucket(bucket):
+            nonlocal best
+            for ix, item_id, item_coords in bucket:
+                if predicate is not None and not predicate(item_id):
+                    continue
+                distance = utils2d.calculate_point_distance(coords, item_coords)
+                if max_radius is not None and distance > max_radius:
+                    continue
+                if best is None or (distance, ix) < best[:2]:
+                    best = (distance, ix, item_id)
+
+        qx, qy = self._get_cell(coords)
+        max_ring = max(
+            abs(qx - self._bounds[0]),
+            abs(qx - self._bounds[2]),
+            abs(qy - self._bounds[1]),
+            abs(qy - self._bounds[3]),
+        )
+        cells_visited = 0
+        for ring in range(max_ring + 1):
+            # Every cell in this ring (and beyond) is at least this far away.
+            ring_min_distance = max(0, ring - 1) * self.cell_size
+            if max_radius is not None and ring_min_distance > max_radius:
+                break
+            if best is not None and best[0] < ring_min_distance:
+                break
+            if cells_visited > len(self._cells):
+                # Sparse grid, cheaper to check every occupied cell.
+                for bucket in self._cells.values():
+                    check_bucket(bucket)
+                break
+            if ring == 0:
+                ring_cells = [(qx, qy)]
+            else:
+                ring_cells = [
+                    (qx + dx, qy + dy)
+                    for dx in range(-ring, ring + 1)
+                    for dy in (-ring, ring)
+                ] + [
+                    (qx + dx, qy + dy)
+                    for dx in (-ring, ring)
+                    for dy in range(-ring + 1, ring)
+                ]
+            cells_visited += len(ring_cells)
+            for cell in ring_cells:
+                if cell in self._cells:
+                    check_bucket(self._cells[cell])
+
+        if best is None:
+            return None, None
+        return best[2], best[0]
+
+
+class MapFeatureIndex:
+    """ Spatial hash over map features (ore mines, space stations).
+
+        Features never move, so the index is built once when the map is set,
+        with service and collision radii converted to map units up front.
+        Queries return features in map order.
+    """
+
+    def __init__(self, features: List[Dict], map_units_per_meter: int = 1):
+        self.features = features
+        self._collision_radii = [
+            feature.get('collision_radius_meters', 0) * map_units_per_meter
+            for feature in features
+        ]
+        self.max_service_radius = max((f['service_radius_map_units'] for f in features), default=0)
+        self.max_collision_radius = max(self._collision_radii, default=0)
+        self._hash = SpatialHash(max(self.max_service_radius, self.max_collision_radius, 1))
+        for ix, feature in enumerate(features):
+            self._hash.insert(ix, (feature['position_map_units_x'], feature['position_map_units_y']))
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def query_radius(self, coords: Tuple, radius: float) -> List[Dict]:
+        """ Get features within radius of coords.
+        """
+        return [self.features[ix] for ix in self._hash.query_radius(coords, radius)]
+
+    def get_service_candidates(self, coords: Tuple) -> List[Dict]:
+        """ Get features that coords may be within the service radius of.
+            Callers still check each feature's own service radius.
+        """
+        return self.query_radius(coords, self.max_service_radius)
+
+    def get_collision(self, coords: Tuple) -> Optional[Dict]:
+        """ Get the first feature that coords are inside the collision radius of.
+        """
+        for ix in self._hash.query_radius(coords, self.max_collision_radius):
+            feature = self.features[ix]
+            distance = utils2d.calculate_point_distance(
+                (feature['position_map_units_x'], feature['position_map_units_y']),
+                coords,
+            )
+            if distance < self._collision_radii[ix]:
+                return feature
+        return None
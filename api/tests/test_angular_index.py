@@ -0,0 +1,49 @@
+import random
+from unittest import TestCase
+
+from api.angular_index import AngularIntervalIndex
+
+
+def _contains(center, half_width, heading):
+    delta = abs((heading - center + 180) % 360 - 180)
+    return delta <= half_width
+
+
+class TestAngularIntervalIndex(TestCase):
+
+    def test_query_returns_intervals_containing_heading(self):
+        index = AngularIntervalIndex([
+            (90, 5, "east"),
+            (100, 20, "wide"),
+            (270, 5, "west"),
+        ])
+        assert sorted(index.query(92)) == ["east", "wide"]
+        assert index.query(115) == ["wide"]
+        assert index.query(180) == []
+
+    def test_intervals_wrap_past_360(self):
+        index = AngularIntervalIndex([(355, 10, "north")])
+        assert index.query(350) == ["north"]
+        assert index.query(3) == ["north"]
+        assert index.query(360) == ["north"]
+        assert index.query(10) == []
+        assert len(index) == 2
+
+    def test_full_circle_intervals(self):
+        index = AngularIntervalIndex([(12, 180, "overlapping")])
+        assert index.query(200) == ["overlapping"]
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(5)
+        intervals = [
+            (rng.uniform(0, 360), rng.uniform(0, 40), ix)
+            for ix in range(200)
+        ]
+        index = AngularIntervalIndex(intervals)
+        for _ in range(500):
+            heading = rng.uniform(0, 360)
+            expected = sorted(
+                item_id for center, half_width, item_id in intervals
+                if _contains(center, half_width, heading)
+            )
+            assert sorted(set(index.query(heading))) == expected
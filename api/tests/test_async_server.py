@@ -0,0 +1,138 @@
+import asyncio
+import json
+from unittest import TestCase
+
+from api.async_server import GameRoomServer
+from api.models.game import Game
+from api.simulate import build_game, build_map
+
+
+def run_lines(server: GameRoomServer, *lines):
+    # Lines are sent on one connection.
+    sessions = {}
+    async def _run():
+        return [
+            json.loads(await server.handle_line(json.dumps(line).encode(), sessions))
+            for line in lines
+        ]
+    return asyncio.run(_run())
+
+
+class TestGameRoomServer(TestCase):
+
+    def test_can_create_and_list_rooms(self):
+        server = GameRoomServer()
+        created_a, created_b, listed = run_lines(
+            server,
+            {"room_id": "a", "create_room": {}},
+            {"room_id": "b", "create_room": {}},
+            {"list_rooms": {}},
+        )
+        assert set(created_a.keys()) == set(Game.BASE_STATE_KEYS)
+        assert created_b['ok']
+        assert [r['room_id'] for r in listed['rooms']] == ["a", "b"]
+
+    def test_cannot_create_duplicate_room(self):
+        server = GameRoomServer()
+        _, response = run_lines(
+            server,
+            {"room_id": "a", "create_room": {}},
+            {"room_id": "a", "create_room": {}},
+        )
+        assert response['ok'] is False
+        assert len(server.rooms) == 1
+
+    def test_commands_are_routed_to_their_room(self):
+        server = GameRoomServer()
+        run_lines(
+            server,
+            {"room_id": "a", "create_room": {}},
+            {"room_id": "b", "create_room": {}},
+            {"room_id": "b", "add_player": {"player_name": "foo", "player_id": "p1"}},
+        )
+        assert len(server.rooms["a"]._players) == 0
+        assert len(server.rooms["b"]._players) == 1
+
+    def test_rooms_share_a_logger(self):
+        server = GameRoomServer()
+        run_lines(
+            server,
+            {"room_id": "a", "create_room": {}},
+            {"room_id": "b", "create_room": {}},
+        )
+        assert server.rooms["a"].logger is server.rooms["b"].logger
+
+    def test_unknown_room_returns_error_response(self):
+        server = GameRoomServer()
+        response, = run_lines(server, {"request_id": 3, "room_id": "nope", "ping": {}})
+        assert response['ok'] is False
+        assert response['request_id'] == 3
+
+    def test_destroy_room_removes_room(self):
+        server = GameRoomServer()
+        _, destroyed, pinged = run_lines(
+            server,
+            {"room_id": "a", "create_room": {}},
+            {"room_id": "a", "destroy_room": {}},
+            {"room_id": "a", "ping": {}},
+        )
+        assert destroyed['ok']
+        assert pinged['ok'] is False
+        assert server.rooms == {}
+
+    def test_connection_serves_ordered_responses(self):
+        server = GameRoomServer()
+
+        async def _run():
+            listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b'{"request_id": 1, "room_id": "a", "create_room": {}}\n'
+                b'\n'
+                b'{"request_id": 2, "room_id": "a", "ping": {}}\n'
+            )
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+            await writer.wait_closed()
+            listener.close()
+            await listener.wait_closed()
+            return responses
+
+        responses = asyncio.run(_run())
+        assert [r['request_id'] for r in responses] == [1, 2]
+        assert all(r['ok'] for r in responses)
+
+
+class TestGameRoomServerDeltaSession(TestCase):
+
+    def test_delta_session_is_per_room(self):
+        server = GameRoomServer()
+        server.rooms["a"] = build_game(build_map(2), 2)
+        server.rooms["b"] = build_game(build_map(2), 2)
+        opened, a_1, b_1, a_2, b_2 = run_lines(
+            server,
+            {"room_id": "a", "session": {"delta": True}},
+            {"room_id": "a", "run_frame": {"commands": []}},
+            {"room_id": "b", "run_frame": {"commands": []}},
+            {"room_id": "a", "run_frame": {"commands": [], "ack_frame": 2}},
+            {"room_id": "b", "run_frame": {"commands": [], "ack_frame": 2}},
+        )
+        assert opened['ok']
+        assert a_1['keyframe']
+        assert a_2['keyframe'] is False
+        assert 'keyframe' not in b_1
+        assert 'keyframe' not in b_2
+
+    def test_session_requires_a_room(self):
+        server = GameRoomServer()
+        response, = run_lines(server, {"session": {"delta": True}})
+        assert response['ok'] is False
+
+
+class TestGameFrameThrottle(TestCase):
+
+    def test_no_throttle_before_first_frame(self):
+        game = Game()
+        assert game.get_frame_throttle_seconds() == 0
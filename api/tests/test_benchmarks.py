@@ -0,0 +1,56 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from api.benchmarks.cases import BENCHMARKS, RUN_FRAME_SHIP_COUNTS
+from api.benchmarks.runner import (
+    find_regressions,
+    load_baseline,
+    save_baseline,
+    time_benchmark,
+)
+
+
+def _result(median_us):
+    return {"median_us": median_us, "min_us": median_us, "repeat": 1, "number": 1}
+
+
+class TestBenchmarks(TestCase):
+
+    def test_run_frame_is_benchmarked_at_every_ship_count(self):
+        for ships in RUN_FRAME_SHIP_COUNTS:
+            assert f"Game.run_frame[ships={ships},projectiles=0]" in BENCHMARKS
+
+    def test_time_benchmark_runs_setup_per_sample(self):
+        calls = {"setup": 0, "run": 0}
+        def setup():
+            calls["setup"] += 1
+            def run():
+                calls["run"] += 1
+            return run
+
+        result = time_benchmark(setup, number=4, repeat=3)
+        assert calls == {"setup": 3, "run": 12}
+        assert result['repeat'] == 3
+        assert result['number'] == 4
+        assert 0 <= result['min_us'] <= result['median_us']
+
+    def test_benchmark_case_runs(self):
+        setup, _ = BENCHMARKS["Game.run_frame[ships=2,projectiles=4]"]
+        result = time_benchmark(setup, number=2, repeat=1)
+        assert result['median_us'] > 0
+
+    def test_find_regressions_over_threshold(self):
+        baseline = {"a": _result(100), "b": _result(100), "c": _result(100)}
+        results = {"a": _result(124), "b": _result(126), "c": _result(50), "new": _result(1000)}
+        regressions = find_regressions(results, baseline, threshold=0.25)
+        assert [r['name'] for r in regressions] == ["b"]
+        assert regressions[0]['ratio'] == 1.26
+
+    def test_save_baseline_merges_results(self):
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "baseline.json")
+            assert load_baseline(path) == {}
+            save_baseline(path, {"a": _result(1), "b": _result(2)})
+            save_baseline(path, {"b": _result(3)})
+            assert load_baseline(path) == {"a": _result(1), "b": _result(3)}
@@ -1,55 +1,72 @@
-
 from unittest import TestCase
 
-from api.coord_cache import (
-    CoordDistanceCache,
-    CoordHeadingCache,
-)
+from api.coord_cache import EntityPairCache
 
 
-class TestCoordDistanceCache(TestCase):
-    def test_can_set_cache_distance_value(self):
-        cache = CoordDistanceCache()
-        point_a = (1, 2)
-        point_b = (1, 10)
-        distance = 8
-        cache.set_val(point_a, point_b)
-        assert cache._data == {
-            (point_a, point_b): distance,
-            (point_b, point_a): distance,
-        }
-
+class TestEntityPairCacheDistance(TestCase):
     def test_can_read_cache_distance_value(self):
-        cache = CoordDistanceCache()
+        cache = EntityPairCache()
         point_a = (1, 2)
         point_b = (1, 10)
         distance = 8
 
-        assert cache.get_val(point_a, point_b) == distance
-        assert cache.get_val(point_b, point_a) == distance
+        assert cache.get_distance("a", point_a, "b", point_b) == distance
+        assert cache.get_distance("b", point_b, "a", point_a) == distance
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_pairs_are_stored_once(self):
+        cache = EntityPairCache()
+        cache.get_distance("b", (1, 2), "a", (1, 10))
+        cache.get_heading("a", (1, 10), "b", (1, 2))
+        assert cache._slots == {("a", "b"): 0}
+        assert cache._coords[0] == ((1, 10), (1, 2))
 
+    def test_moved_entities_are_recomputed(self):
+        cache = EntityPairCache()
+        assert cache.get_distance("a", (0, 0), "b", (0, 10)) == 10
+        assert cache.get_distance("a", (0, 0), "b", (0, 20)) == 20
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert len(cache._slots) == 1
 
 
-class TestCoordHeadingCache(TestCase):
-    def test_can_set_cache_heading_value(self):
-        cache = CoordHeadingCache()
+class TestEntityPairCacheHeading(TestCase):
+    def test_can_read_cache_heading_value(self):
+        cache = EntityPairCache()
         point_a = (-5, 5)
         point_b = (5, -5)
         heading_a_to_b = 135
         heading_b_to_a = 315
-        cache.set_val(point_a, point_b)
-        assert cache._data == {
-            (point_a, point_b): heading_a_to_b, # A to B is cached
-            (point_b, point_a): heading_b_to_a, # B to A is calculated and cached.
-        }
 
-    def test_can_read_cache_heading_value(self):
-        cache = CoordHeadingCache()
+        assert cache.get_heading("a", point_a, "b", point_b) == heading_a_to_b
+        assert cache.get_heading("b", point_b, "a", point_a) == heading_b_to_a
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_reverse_heading_is_derived_from_stored_heading(self):
+        cache = EntityPairCache()
         point_a = (-5, 5)
         point_b = (5, -5)
-        heading_a_to_b = 135
-        heading_b_to_a = 315
-        cache.set_val(point_a, point_b)
+        assert cache.get_heading("b", point_b, "a", point_a) == 315
+        assert cache._headings[0] == 135
+        assert cache.get_heading("a", point_a, "b", point_b) == 135
+
+
+class TestEntityPairCacheCapacity(TestCase):
+    def test_pairs_past_capacity_are_computed_without_being_stored(self):
+        cache = EntityPairCache(capacity=2)
+        for other_id in ("b", "c", "d"):
+            assert cache.get_distance("a", (0, 0), other_id, (0, 5)) == 5
+        assert len(cache._slots) == 2
+        assert len(cache._distances) == 2
+        assert cache.get_distance("a", (0, 0), "d", (0, 5)) == 5
+        assert (cache.hits, cache.misses) == (0, 4)
 
-        assert cache.get_val(point_a, point_b) == heading_a_to_b
-        assert cache.get_val(point_b, point_a) == heading_b_to_a
+    def test_clear_reuses_the_store(self):
+        cache = EntityPairCache(capacity=2)
+        cache.get_distance("a", (0, 0), "b", (0, 5))
+        distances = cache._distances
+        cache.clear()
+        assert cache._slots == {}
+        assert (cache.hits, cache.misses) == (0, 0)
+        cache.get_distance("a", (0, 0), "c", (0, 7))
+        assert cache._distances is distances
+        assert cache._distances[0] == 7
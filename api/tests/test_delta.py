@@ -0,0 +1,148 @@
+import json
+import random
+from unittest import TestCase
+
+from api.delta import DeltaEncoder, apply_delta, diff_states
+from api.models.game import GamePhase
+from api.simulate import build_game, build_map, ScriptedBotPolicy
+
+
+def _state(game_frame, ships, **extra):
+    return {
+        'ok': True,
+        'phase': GamePhase.LIVE,
+        'game_frame': game_frame,
+        'ships': ships,
+        **extra,
+    }
+
+
+class TestDiffStates(TestCase):
+
+    def test_only_changed_values_are_sent(self):
+        base = _state(1, [{'id': 'a', 'x': 1, 'y': 1}], space_stations=[{'name': 'x'}], killfeed=[])
+        current = _state(2, [{'id': 'a', 'x': 2, 'y': 1}], space_stations=[{'name': 'x'}], killfeed=[{'v': 1}])
+        delta = diff_states(base, current)
+        assert delta == {
+            'ok': True,
+            'phase': GamePhase.LIVE,
+            'game_frame': 2,
+            'keyframe': False,
+            'base_frame': 1,
+            'changed': {'killfeed': [{'v': 1}]},
+            'removed': [],
+            'entities': {
+                'ships': {
+                    'added': [],
+                    'changed': {'a': {'x': 2}},
+                    'removed': [],
+                    'nested': {},
+                    'order': None,
+                },
+            },
+        }
+        assert apply_delta(base, delta) == current
+
+    def test_added_removed_and_reordered_entities(self):
+        base = _state(1, [{'id': 'a', 'x': 1}, {'id': 'b', 'x': 1}, {'id': 'c', 'x': 1}])
+        current = _state(2, [{'id': 'd', 'x': 1}, {'id': 'c', 'x': 1}, {'id': 'a', 'x': 1}])
+        delta = diff_states(base, current)
+        ships = delta['entities']['ships']
+        assert ships['added'] == [{'id': 'd', 'x': 1}]
+        assert ships['removed'] == ['b']
+        assert ships['order'] == ['d', 'c', 'a']
+        assert apply_delta(base, delta) == current
+
+    def test_nested_scanner_data_is_diffed_per_entity(self):
+        base = _state(1, [{'id': 'a', 'scanner_ship_data': [{'id': 'b', 'distance': 10, 'designator': 'red fox'}]}])
+        current = _state(2, [{'id': 'a', 'scanner_ship_data': [{'id': 'b', 'distance': 9, 'designator': 'red fox'}]}])
+        delta = diff_states(base, current)
+        ships = delta['entities']['ships']
+        assert ships['changed'] == {}
+        assert ships['nested']['a']['scanner_ship_data']['changed'] == {'b': {'distance': 9}}
+        assert apply_delta(base, delta) == current
+
+    def test_delta_must_match_base_frame(self):
+        base = _state(1, [])
+        delta = diff_states(base, _state(2, []))
+        with self.assertRaises(ValueError):
+            apply_delta(_state(3, []), delta)
+
+
+class TestDeltaEncoder(TestCase):
+
+    def test_keyframe_until_a_frame_is_acknowledged(self):
+        encoder = DeltaEncoder()
+        assert encoder.encode(_state(1, []))['keyframe']
+        assert encoder.encode(_state(2, []))['keyframe']
+        encoder.ack(2)
+        payload = encoder.encode(_state(3, []))
+        assert not payload['keyframe']
+        assert payload['base_frame'] == 2
+
+    def test_unknown_and_stale_acks_are_ignored(self):
+        encoder = DeltaEncoder()
+        encoder.encode(_state(1, []))
+        encoder.encode(_state(2, []))
+        encoder.ack(2)
+        encoder.ack(1)
+        encoder.ack(99)
+        assert encoder.encode(_state(3, []))['base_frame'] == 2
+
+    def test_ack_none_requests_a_keyframe(self):
+        encoder = DeltaEncoder()
+        encoder.encode(_state(1, []))
+        encoder.ack(1)
+        encoder.ack(None)
+        assert encoder.encode(_state(2, []))['keyframe']
+
+    def test_periodic_keyframes(self):
+        encoder = DeltaEncoder(keyframe_interval=10)
+        keyframes = []
+        for frame in range(1, 31):
+            if encoder.encode(_state(frame, []))['keyframe']:
+                keyframes.append(frame)
+            encoder.ack(frame)
+        assert keyframes == [1, 11, 21]
+
+    def test_states_outside_of_live_are_keyframes(self):
+        encoder = DeltaEncoder()
+        encoder.encode(_state(1, []))
+        encoder.ack(1)
+        payload = encoder.encode({**_state(1, []), 'phase': GamePhase.COMPLETE})
+        assert payload['keyframe']
+        assert payload['phase'] == GamePhase.COMPLETE
+
+    def test_memory_is_bounded_without_acks(self):
+        encoder = DeltaEncoder(keyframe_interval=5)
+        for frame in range(1, 50):
+            encoder.encode(_state(frame, []))
+        assert len(encoder._sent) == 5
+
+    def test_snapshots_are_not_changed_by_game_mutations(self):
+        encoder = DeltaEncoder()
+        upgrade_summary = {'core': {'level': 0}}
+        encoder.encode(_state(1, [{'id': 'a', 'upgrade_summary': upgrade_summary}]))
+        encoder.ack(1)
+        upgrade_summary['core']['level'] = 1
+        payload = encoder.encode(_state(2, [{'id': 'a', 'upgrade_summary': upgrade_summary}]))
+        assert payload['entities']['ships']['changed'] == {'a': {'upgrade_summary': {'core': {'level': 1}}}}
+
+    def test_consumer_rebuilds_every_frame_of_a_match(self):
+        random.seed(4)
+        game = build_game(build_map(6, spacing_meters=800), 6)
+        policy = ScriptedBotPolicy(list(game._players.keys()), seed=4)
+        encoder = DeltaEncoder(keyframe_interval=30)
+        consumer_state = None
+        delta_bytes = full_bytes = 0
+        for _ in range(120):
+            game.run_frame({'commands': policy.get_commands(game)})
+            state = game.get_state()
+            full_payload = json.dumps(state)
+            payload = json.dumps(encoder.encode(state))
+            consumer_state = apply_delta(consumer_state, json.loads(payload))
+            encoder.ack(consumer_state['game_frame'])
+            assert consumer_state == json.loads(full_payload)
+            full_bytes += len(full_payload)
+            delta_bytes += len(payload)
+        assert delta_bytes < full_bytes / 2
@@ -6,7 +6,8 @@ from uuid import uuid4
 from unittest import TestCase
 
 from api.models.game import Game, GamePhase
-from api.constants import EMP_SLUG
+from api.constants import EMP_SLUG, PROXIMITY_CHECK_MAX_DEFER_FRAMES
+from api.scheduler import PeriodicTask
 
 
 class TestEMP(TestCase):
@@ -26,7 +27,7 @@ class TestEMP(TestCase):
 
         self.game = Game()
         self.game._fps = 1
-        self.game._is_testing = True
+        self.game._scheduler.run_everything = True
 
         self.game._emp_max_seconds_to_detonate = 10
 
@@ -366,3 +367,145 @@ class TestEMP(TestCase):
 
         # ship 1 not EMPd
         assert self.game._ships[self.player_1_ship_id].battery_power == 250_000
+
+    def test_a_fast_EMP_detonates_on_a_ship_it_passed_between_checks(self):
+        # ship 1 at 100, 100 meters
+        self.game._ships[self.player_1_ship_id].coord_x = 100 * 10
+        self.game._ships[self.player_1_ship_id].coord_y = 100 * 10
+        # ship 2 north at 100, 900 meters (800 meters away)
+        self.game._ships[self.player_2_ship_id].coord_x = 100 * 10
+        self.game._ships[self.player_2_ship_id].coord_y = 900 * 10
+
+        self.game._fps = 1
+        self.game._ships[self.player_1_ship_id].emps_loaded = 1
+        self.game._ships[self.player_1_ship_id].heading = 0
+        self.game._ships[self.player_2_ship_id].battery_power = 250_000
+        self.game._ships[self.player_2_ship_id].engine_online = True
+        for ship_id in (self.player_1_ship_id, self.player_2_ship_id):
+            self.game._ships[ship_id].velocity_x_meters_per_second = 0
+            self.game._ships[ship_id].velocity_y_meters_per_second = 0
+        # Fire emp, fast enough to jump 500 meters between checks
+        self.game._ships[self.player_1_ship_id].emp_launch_velocity_ms = 500
+        self.game._ships[self.player_1_ship_id].cmd_launch_emp()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        emp_id = next(iter(self.game._emps.keys()))
+
+        self.game.advance_emps(fps=1)
+        self.game.advance_emps(fps=1)
+        emp = self.game._emps[emp_id]
+        assert not emp.exploded
+        assert round(emp.coord_y) == 11075 # 1107.5 meters, 207.5 past ship 2
+
+        self.game.advance_emps(fps=1)
+        emp = self.game._emps[emp_id]
+        assert emp.exploded
+        # Detonated on the swept path where it first came within proximity of ship 2
+        assert round(emp.coord_x) == 1000
+        assert round(emp.coord_y) == 8650
+        assert self.game._ships[self.player_2_ship_id].battery_power < 250_000
+        assert not self.game._ships[self.player_2_ship_id].engine_online
+
+    def test_EMP_proximity_check_cost_is_reported_to_the_profiler(self):
+        self.game._ships[self.player_1_ship_id].emps_loaded = 1
+        self.game._ships[self.player_1_ship_id].cmd_launch_emp()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        self.game._build_spatial_indexes()
+        self.game._scheduler.start_frame(self.game._game_frame)
+        self.game.advance_emps(fps=1)
+        self.game._scheduler.end_frame()
+        assert self.game.profiler.get_stats()["task.emp_proximity"]["count"] == 1
+        assert self.game.profiler.get_counters()["task.emp_proximity.runs"] == 1
+
+    def test_the_swept_fuze_sweeps_from_where_ships_were_at_the_last_check(self):
+        self.game._ships[self.player_1_ship_id].emps_loaded = 1
+        self.game._ships[self.player_1_ship_id].emp_launch_velocity_ms = 0
+        self.game._ships[self.player_1_ship_id].cmd_launch_emp()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        emp = next(iter(self.game._emps.values()))
+        # EMP at 1500, 1500 meters
+        emp.coord_x = 1500 * 10
+        emp.coord_y = 1500 * 10
+        # ship 2 at 1000, 1500 meters (500 meters west of the EMP)
+        self.game._ships[self.player_2_ship_id].coord_x = 1000 * 10
+        self.game._ships[self.player_2_ship_id].coord_y = 1500 * 10
+
+        frame = self.game._game_frame
+        self.game._build_spatial_indexes()
+        self.game._record_ship_positions()
+        self.game.advance_emps(fps=1)
+        assert not emp.exploded
+
+        self.game._ships[self.player_2_ship_id].battery_power = 250_000
+        self.game._ships[self.player_2_ship_id].engine_online = True
+        # Ship 2 flies east past the EMP and stops before the next check.
+        for game_frame in range(frame + 1, frame + 11):
+            self.game._game_frame = game_frame
+            self.game._ships[self.player_2_ship_id].coord_x += 100 * 10
+            self.game._ships[self.player_2_ship_id].velocity_x_meters_per_second = 100 if game_frame < frame + 10 else 0
+            self.game._build_spatial_indexes()
+            self.game._record_ship_positions()
+        self.game.advance_emps(fps=1)
+        # Its current velocity says it didn't move, its recorded position says it passed the EMP.
+        assert emp.exploded
+        # Detonated where it was when ship 2 passed it, ship 2 is 500 meters east now.
+        assert round(emp.coord_x) == 1500 * 10
+        assert round(emp.coord_y) == 1500 * 10
+        assert self.game._ships[self.player_2_ship_id].battery_power < 250_000
+        assert not self.game._ships[self.player_2_ship_id].engine_online
+
+    def test_a_shockwave_hitting_a_ship_ends_proximity_check_deferrals(self):
+        self.game._ships[self.player_1_ship_id].emps_loaded = 1
+        self.game._ships[self.player_1_ship_id].cmd_launch_emp()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        emp_id = next(iter(self.game._emps.keys()))
+        self.game._scheduler.defer(
+            PeriodicTask.EMP_PROXIMITY,
+            emp_id,
+            self.game._game_frame + PROXIMITY_CHECK_MAX_DEFER_FRAMES,
+        )
+        # Explosion 100 meters from ship 2
+        self.game.register_explosion_on_map((2800 * 10, 2900 * 10), 60, 4000, 4000)
+        self.game.advance_explosion_shockwaves()
+        assert self.game._ships[self.player_2_ship_id].velocity_x_meters_per_second > 0
+        assert (PeriodicTask.EMP_PROXIMITY, emp_id) not in self.game._scheduler._deferred
+
+    def test_EMP_proximity_checks_are_deferred_until_a_ship_could_reach_it(self):
+        self.game._scheduler.run_everything = False
+        self.game._fps = 30
+        # ship 1 at 100, 100 meters
+        self.game._ships[self.player_1_ship_id].coord_x = 100 * 10
+        self.game._ships[self.player_1_ship_id].coord_y = 100 * 10
+        # ship 2 north at 100, 300 meters (200 meters away)
+        self.game._ships[self.player_2_ship_id].coord_x = 100 * 10
+        self.game._ships[self.player_2_ship_id].coord_y = 300 * 10
+        self.game._ships[self.player_1_ship_id].emps_loaded = 1
+        self.game._ships[self.player_1_ship_id].heading = 0
+        for ship_id in (self.player_1_ship_id, self.player_2_ship_id):
+            self.game._ships[ship_id].velocity_x_meters_per_second = 0
+            self.game._ships[ship_id].velocity_y_meters_per_second = 0
+        self.game._ships[self.player_1_ship_id].emp_launch_velocity_ms = 100
+        self.game._ships[self.player_1_ship_id].cmd_launch_emp()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        emp_id = next(iter(self.game._emps.keys()))
+
+        frame = self.game._game_frame
+        self.game._build_spatial_indexes()
+        self.game._scheduler.start_frame(frame)
+        self.game._scheduler.defer(PeriodicTask.EMP_PROXIMITY, emp_id, frame) # Check on this frame.
+        self.game.advance_emps(fps=30)
+        # Ship 2 could close the gap with a boosted engine in well under a second.
+        deferred_until = self.game._scheduler._deferred[(PeriodicTask.EMP_PROXIMITY, emp_id)]
+        assert frame + 3 < deferred_until < frame + PROXIMITY_CHECK_MAX_DEFER_FRAMES
+        self.game._scheduler.start_frame(deferred_until - 1)
+        assert not self.game._scheduler.is_due(PeriodicTask.EMP_PROXIMITY, emp_id)
+        self.game._scheduler.start_frame(deferred_until)
+        assert self.game._scheduler.is_due(PeriodicTask.EMP_PROXIMITY, emp_id)
+
+        # Ship 2 on the far corner of the map, the deferral is capped.
+        self.game._ships[self.player_2_ship_id].coord_x = 2900 * 10
+        self.game._ships[self.player_2_ship_id].coord_y = 2900 * 10
+        self.game._build_spatial_indexes()
+        self.game._scheduler.start_frame(frame)
+        self.game._scheduler.defer(PeriodicTask.EMP_PROXIMITY, emp_id, frame)
+        self.game.advance_emps(fps=30)
+        assert self.game._scheduler._deferred[(PeriodicTask.EMP_PROXIMITY, emp_id)] == frame + PROXIMITY_CHECK_MAX_DEFER_FRAMES
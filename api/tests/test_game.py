@@ -530,6 +530,13 @@ class TestGame(TestCase):
         assert game._phase == GamePhase.LIVE
         assert game._game_frame == 1
         assert game._game_start_time is not None
+        world = game.get_world()
+        assert world['world_version'] == 1
+        assert world['map_config']['map_name'] == "TestMap"
+        state = game.get_state()
+        assert state['world_version'] == 1
+        assert 'map_config' not in state
+        assert 'ore_mines' not in state
 
     def test_game_detects_winning_team(self):
         game = Game()
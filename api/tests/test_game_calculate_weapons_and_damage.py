@@ -1,10 +1,12 @@
 
 
+import random
 from uuid import uuid4
 from unittest import TestCase
 
 from api.models.game import Game, GamePhase
 from api import constants
+from api.simulate import build_game, build_map
 
 class TestEBeamAndDamage(TestCase):
     def setUp(self):
@@ -141,6 +143,54 @@ class TestEBeamAndDamage(TestCase):
         self.game.purge_killfeed(fps=1)
         assert len(self.game._killfeed) == 0
 
+    def test_killfeed_row_expires_on_a_scheduled_frame(self):
+        # Don't throttle frames to real time.
+        self.game._fixed_fps = constants.MAX_SERVER_FPS
+        self.game._add_killfeed_entry("foobar")
+        expires_on_frame = self.game._game_frame + constants.KILLFEED_SECONDS * constants.MAX_SERVER_FPS + 1
+        while self.game._game_frame < expires_on_frame:
+            self.game.run_frame({'commands': []})
+            assert len(self.game._killfeed) == 1
+        self.game.run_frame({'commands': []})
+        assert self.game._killfeed == []
+        assert len(self.game._timers) == 0
+
+    def test_every_ship_scans_before_any_ship_fires(self):
+        # Ship 1 runs first and kills ship 2, which is beyond visual range
+        # so ship 2 only sees ship 1 through its (locked) scanner.
+        ship_1 = self.game._ships[self.player_1_ship_id]
+        ship_2 = self.game._ships[self.player_2_ship_id]
+        assert list(self.game._ships) == [self.player_1_ship_id, self.player_2_ship_id]
+        for ship in (ship_1, ship_2):
+            ship.scanner_online = True
+            ship.battery_power = 500_000
+        ship_1.coord_x = 1000
+        ship_1.coord_y = 1000
+        ship_1._set_heading(constants.DEGREES_NORTH)
+        ship_1.ebeam_charge = 8000
+        ship_1.ebeam_firing = True
+        # 2KM north of ship 1, pointed at ship 1 with autofire on.
+        ship_2.coord_x = 1000
+        ship_2.coord_y = 21000
+        ship_2._set_heading(constants.DEGREES_SOUTH)
+        ship_2.ebeam_charge = 20000
+        ship_2.ebeam_autofire_enabled = True
+        ship_2.ebeam_autofire_max_range = 5000
+        ship_2.scanner_locked = True
+        ship_2.scanner_lock_target = ship_1.id
+
+        self.game.run_frame({'commands': []})
+
+        assert ship_2.died_on_frame is not None
+        # Ship 2 scanned (and kept its lock) before ship 1 fired.
+        assert list(ship_2.scanner_ship_data) == [ship_1.id]
+        assert ship_2.scanner_locked
+        assert ship_2.scanner_lock_target == ship_1.id
+        assert ship_1.scanner_ship_data[ship_2.id]['alive']
+        # Ship 2 was dead before its own weapons ran, so it didn't autofire.
+        assert not ship_2.ebeam_firing
+        assert ship_1.died_on_frame is None
+
     def test_ebeam_fire_misses_a_target(self):
         # Arrange
         self.game._ships[self.player_1_ship_id].ebeam_charge = 8000
@@ -264,6 +314,14 @@ class TestEBeamAndDamage(TestCase):
         )
         assert isinstance(death_data, tuple)
 
+    def test_ship_collides_with_map_features_on_any_frame(self):
+        self.game._ships[self.player_1_ship_id].coord_x = 5000
+        self.game._ships[self.player_1_ship_id].coord_y = 5000
+        self.game._game_frame = 3
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        assert self.game._ships[self.player_1_ship_id].died_on_frame == 3
+        assert self.game._ships[self.player_1_ship_id].exploded
+
 
 class TestEBeamAutofire(TestCase):
     def setUp(self):
@@ -406,3 +464,29 @@ class TestEBeamAutofire(TestCase):
 
         assert self.game._ships[self.player_1_ship_id].ebeam_firing
         assert self.game._ships[self.player_2_ship_id].died_on_frame is not None
+
+
+class TestEBeamBroadphase(TestCase):
+
+    def test_hits_and_firing_solutions_match_a_full_scan(self):
+        rng = random.Random(3)
+        game = build_game(build_map(24, spacing_meters=40), 24)
+        ships = list(game._ships.values())
+        for ship in ships:
+            ship.coord_x += rng.randint(-300, 300)
+            ship.coord_y += rng.randint(-300, 300)
+            ship._set_heading(rng.choice([0, 90, 180, 270, rng.randint(0, 359)]))
+            ship.ebeam_autofire_max_range = 5000
+
+        def get_results():
+            return [
+                (game._get_ebeam_line_and_hit(ship)[1], game.search_for_firing_solution(ship.id))
+                for ship in ships
+            ]
+
+        with_broadphase = get_results()
+        for ship in ships:
+            ship.hitbox_radius = None
+        assert with_broadphase == get_results()
+        assert any(hits for hits, _ in with_broadphase)
+        assert any(solution for _, solution in with_broadphase)
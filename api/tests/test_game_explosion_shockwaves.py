@@ -107,7 +107,7 @@ class TestEBeamAndDamage(TestCase):
     def test_explosion_shock_wave_instantly_accelerates_nearby_ship(self):
         self.game._fps = 1
         assert self.game._map_units_per_meter == 10
-        self.game._is_testing = True
+        self.game._scheduler.run_everything = True
         self.game._shockwave_max_delta_v_meters_per_second = 20
         self.game._shockwave_max_delta_v_coef = -0.000005
         self.game._explosion_shockwave_max_radius_meters = 4000
@@ -150,3 +150,12 @@ class TestEBeamAndDamage(TestCase):
         assert round(self.game._ships[self.player_1_ship_id].velocity_x_meters_per_second) == 12
         assert round(self.game._ships[self.player_1_ship_id].velocity_y_meters_per_second) == 12
         assert self.player_1_ship_id in self.game._ships_hit_by_shockwave[swid]
+
+    def test_explosions_get_short_ids_that_are_unique_within_the_game(self):
+        self.game.register_explosion_on_map((0, 0), 60, 4000, 4000)
+        self.game.register_explosion_on_map((0, 0), 60, 4000, 4000)
+        ids = [sw['id'] for sw in self.game._explosion_shockwaves] + [ex['id'] for ex in self.game._explosions]
+        assert len(set(ids)) == 4
+        assert all(len(entity_id) <= 4 for entity_id in ids)
+        assert self.game._explosion_shockwaves[0]['id'].startswith('s')
+        assert self.game._explosions[0]['id'].startswith('x')
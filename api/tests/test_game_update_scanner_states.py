@@ -1,4 +1,6 @@
 
+from copy import deepcopy
+import random
 from textwrap import indent
 from uuid import uuid4
 from unittest import TestCase
@@ -914,3 +916,57 @@ class TestGameUpdateScannerStatesForMines(TestCase):
         self.game.reset_and_update_scanner_states(self.player_2_ship_id)
         assert len(self.game._ships[self.player_1_ship_id].scanner_magnet_mine_data) == 1
         assert len(self.game._ships[self.player_2_ship_id].scanner_magnet_mine_data) == 1
+
+
+class TestGameUpdateScannerStatesBatched(TestCase):
+
+    def build_game(self, seed: int) -> Game:
+        rng = random.Random(seed)
+        game = Game()
+        spawn_points = []
+        for _ in range(8):
+            game.register_player({
+                'player_id': str(uuid4()),
+                'player_name': "foobar",
+                'team_id': str(uuid4()),
+            })
+            spawn_points.append({
+                'position_meters_x': 100,
+                'position_meters_y': 100,
+            })
+        game.set_map({
+            'mapData':{
+                "meters_x": 10 * 1000,
+                "meters_y": 10 * 1000,
+                "name": "TestMap",
+            },
+            'spawnPoints': spawn_points,
+            'spaceStations': [],
+            'miningLocations': [],
+        }, map_units_per_meter=10)
+        game.advance_to_phase_1_starting()
+        for ship in game._ships.values():
+            ship.coord_x = rng.randint(0, 30_000)
+            ship.coord_y = rng.randint(0, 30_000)
+            ship.scanner_online = rng.random() > 0.25
+            ship.scanner_mode = rng.choice((ShipScannerMode.RADAR, ShipScannerMode.IR))
+            ship.scanner_thermal_signature = rng.randint(0, 100)
+            ship.scanner_ir_minimum_thermal_signature = rng.randint(0, 100)
+            ship.anti_radar_coating_level = rng.randint(0, 3)
+            ship.scanner_radar_sensitivity = rng.randint(0, 3)
+            ship._removed_from_map = rng.random() > 0.9
+        return game
+
+    def test_batched_scanner_matches_per_ship_scanner(self):
+        for seed in range(10):
+            scalar_game = self.build_game(seed)
+            batched_game = deepcopy(scalar_game)
+            for ship_id in scalar_game._ships:
+                scalar_game.reset_and_update_scanner_states(ship_id)
+            batched_game.update_scanner_states()
+
+            for scalar_ship, batched_ship in zip(scalar_game._ships.values(), batched_game._ships.values()):
+                assert list(scalar_ship.scanner_ship_data.items()) == list(batched_ship.scanner_ship_data.items())
+                for element in batched_ship.scanner_ship_data.values():
+                    assert type(element['distance']) is int
+                    assert type(element['in_visual_range']) is bool
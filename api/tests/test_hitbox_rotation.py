@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from api.constants import ORGIN_COORD
+from api.hitbox_rotation import get_hitbox_rotation_table, get_rotated_hitbox
+from api import utils2d
+
+
+FIXED_COORDS = ((0, 75), (-50, -56), (0, -75), (50, -56))
+
+
+def _rotate(heading):
+    delta_radians = utils2d.degrees_to_radians(utils2d.heading_to_delta_heading_from_zero(heading))
+    return tuple(utils2d.rotate(ORGIN_COORD, coord, delta_radians) for coord in FIXED_COORDS)
+
+
+class TestHitboxRotationTable(TestCase):
+
+    def test_matches_rotate_at_every_heading(self):
+        for heading in range(360):
+            assert get_rotated_hitbox(FIXED_COORDS, heading) == _rotate(heading)
+
+    def test_fractional_headings_are_rotated_directly(self):
+        for heading in (0.5, 45.25, 179.9, 270.75):
+            assert get_rotated_hitbox(FIXED_COORDS, heading) == _rotate(heading)
+
+    def test_table_is_shared_by_geometry(self):
+        table = get_hitbox_rotation_table(FIXED_COORDS)
+        assert get_hitbox_rotation_table(tuple(FIXED_COORDS)) is table
+        assert get_hitbox_rotation_table(((0, 15), (-20, -15), (20, -15))) is not table
+        assert table.get(90) is table.get(90)
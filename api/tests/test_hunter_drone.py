@@ -32,7 +32,7 @@ class TestHunterDrone(TestCase):
 
         self.game = Game()
         self.game._fps = 1
-        self.game._is_testing = True
+        self.game._scheduler.run_everything = True
         self.game._hunter_drone_arming_time_seconds = 4
 
         self.game.register_player({
@@ -392,6 +392,37 @@ class TestHunterDrone(TestCase):
             self.game.advance_hunter_drones(1)
         assert self.game._ships[self.player_2_ship_id].died_on_frame is not None
 
+    def test_a_fast_hunter_drone_detonates_on_a_target_it_passed_between_checks(self):
+        self.game._ships[self.player_1_ship_id].coord_x = 1000 * 10 # ship1 at 1000M, 10M
+        self.game._ships[self.player_1_ship_id].coord_y = 10 * 10
+        self.game._ships[self.player_1_ship_id]._hunter_drone_max_target_acquisition_distance_meters = 2000
+        self.game._ships[self.player_1_ship_id].docked_at_station = "foobar"
+        self.game._ships[self.player_1_ship_id].cmd_buy_hunter_drone()
+        self.game._ships[self.player_1_ship_id].velocity_x_meters_per_second = 0
+        self.game._ships[self.player_1_ship_id].velocity_y_meters_per_second = 0
+        self.game._ships[self.player_2_ship_id].coord_x = 1000 * 10 # ship2 at 1000M, 3000M
+        self.game._ships[self.player_2_ship_id].coord_y = 3000 * 10
+
+        # Fast enough to jump over 400 meters between checks
+        self.game._ships[self.player_1_ship_id]._set_heading(0)
+        self.game._ships[self.player_1_ship_id].hunter_drone_launch_velocity = 400
+        self.game._ships[self.player_1_ship_id].cmd_launch_hunter_drone()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        hd_id = next(iter(self.game._hunter_drones.keys()))
+        for _ in range(7):
+            self.game.advance_hunter_drones(1)
+        drone = self.game._hunter_drones[hd_id]
+        assert drone.target_ship_id == self.player_2_ship_id
+        assert not drone.exploded
+        assert drone.coord_y == 29195 # 80.5 meters short of ship 2
+
+        self.game.advance_hunter_drones(1)
+        assert drone.exploded
+        # Detonated on the swept path where it first came within proximity of ship 2
+        assert drone.coord_x == 10000
+        assert drone.coord_y == 30000 - self.game._hunter_drone_max_proximity_to_explode_meters * 10
+        assert self.game._ships[self.player_2_ship_id].died_on_frame is not None
+
     def test_a_hunter_drone_flies_curved_trajectory_towards_a_target_and_kills_it(self):
         self.game._ships[self.player_1_ship_id].coord_x = 1000 * 10 # ship1 at 1000M, 10M
         self.game._ships[self.player_1_ship_id].coord_y = 10 * 10
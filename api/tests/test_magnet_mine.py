@@ -6,7 +6,8 @@ from uuid import uuid4
 from unittest import TestCase
 
 from api.models.game import Game, GamePhase
-from api.constants import MAGNET_MINE_SLUG
+from api.constants import MAGNET_MINE_SLUG, PROXIMITY_CHECK_MAX_DEFER_FRAMES
+from api.scheduler import PeriodicTask
 
 
 class TestMagnetMine(TestCase):
@@ -26,7 +27,7 @@ class TestMagnetMine(TestCase):
 
         self.game = Game()
         self.game._fps = 1
-        self.game._is_testing = True
+        self.game._scheduler.run_everything = True
 
         self.game.register_player({
             'player_id':self.player_1_id,
@@ -365,6 +366,169 @@ class TestMagnetMine(TestCase):
         self.game.advance_magnet_mines(fps=3)
         assert mine.exploded
         self.game._ships[self.player_2_ship_id].died_on_frame is not None
+        assert len(self.game._projectile_table) == 1
+        # Exploded mine is dropped on the next frame and its table slot is freed.
+        self.game.advance_magnet_mines(fps=3)
+        assert mine_id not in self.game._magnet_mines
+        assert len(self.game._projectile_table) == 0
+        assert mine.exploded
+
+    def test_a_fast_mine_detonates_on_a_ship_it_passed_between_checks(self):
+        self.game._magnet_mine_max_proximity_to_explode_meters = 50
+        self.game._fps = 1
+        self.game._magnet_mine_arming_time_seconds = 1
+        self.game._magnet_mine_tracking_acceleration_ms = 0
+
+        # ship 1 at 100, 100 meters
+        self.game._ships[self.player_1_ship_id].coord_x = 100 * 10
+        self.game._ships[self.player_1_ship_id].coord_y = 100 * 10
+        self.game._ships[self.player_1_ship_id].heading = 0
+        self.game._ships[self.player_1_ship_id].magnet_mines_loaded = 1
+        # ship 2 north at 100, 1400 meters
+        self.game._ships[self.player_2_ship_id].coord_x = 100 * 10
+        self.game._ships[self.player_2_ship_id].coord_y = 1400 * 10
+
+        # Fire mine due north, fast enough to jump 500 meters between checks
+        self.game._ships[self.player_1_ship_id].magnet_mine_launch_velocity = 500
+        self.game._ships[self.player_1_ship_id].cmd_launch_magnet_mine()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        mine = next(iter(self.game._magnet_mines.values()))
+
+        self.game.advance_magnet_mines(fps=1)
+        self.game.advance_magnet_mines(fps=1)
+        self.game.advance_magnet_mines(fps=1)
+        assert mine.armed
+        assert not mine.exploded
+        assert mine.coord_y == 16075 # 1607.5 meters, 207.5 past ship 2
+
+        self.game.advance_magnet_mines(fps=1)
+        assert mine.exploded
+        # Detonated on the swept path where it first came within proximity of ship 2
+        assert mine.coord_x == 1000
+        assert mine.coord_y == 13500
+        assert self.game._explosions[-1]['origin_point'] == (1000, 13500)
+        assert self.game._ships[self.player_2_ship_id].died_on_frame is not None
+        assert self.game._ships[self.player_1_ship_id].died_on_frame is None
+
+    def test_a_fast_ship_that_passes_a_mine_between_checks_is_caught_where_it_passed(self):
+        self.game._magnet_mine_max_proximity_to_explode_meters = 50
+        self.game._magnet_mine_arming_time_seconds = 0.5
+        self.game._magnet_mine_tracking_acceleration_ms = 0
+        ship_2 = self.game._ships[self.player_2_ship_id]
+        self.game._ships[self.player_1_ship_id].magnet_mines_loaded = 1
+        self.game._ships[self.player_1_ship_id].magnet_mine_launch_velocity = 0
+        self.game._ships[self.player_1_ship_id].cmd_launch_magnet_mine()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        mine = next(iter(self.game._magnet_mines.values()))
+        # Mine at 1500, 1500 meters
+        mine.coord_x = 1500 * 10
+        mine.coord_y = 1500 * 10
+        # ship 2 at 1000, 1500 meters (500 meters west of the mine), flying east at 100M/S
+        ship_2.coord_x = 1000 * 10
+        ship_2.coord_y = 1500 * 10
+        ship_2.velocity_x_meters_per_second = 100
+        ship_2.velocity_y_meters_per_second = 0
+
+        frame = self.game._game_frame
+        self.game._record_ship_positions()
+        self.game.advance_magnet_mines(fps=1)
+        assert mine.armed
+        assert not mine.exploded
+
+        for game_frame in range(frame + 1, frame + 11):
+            self.game._game_frame = game_frame
+            ship_2.coord_x += 100 * 10
+            self.game._record_ship_positions()
+        self.game.advance_magnet_mines(fps=1)
+        assert mine.exploded
+        # Detonated where the mine was when ship 2 passed it, ship 2 is 500 meters east now.
+        assert round(mine.coord_x) == 1500 * 10
+        assert round(mine.coord_y) == 1500 * 10
+        assert self.game._explosions[-1]['origin_point'] == mine.coords
+        assert ship_2.died_on_frame is not None
+
+    def test_mine_keeps_targeting_the_closest_ship_while_proximity_checks_are_deferred(self):
+        self.game._scheduler.run_everything = False
+        self.game._fps = 30
+        self.game._magnet_mine_arming_time_seconds = 0.01
+        self.game._magnet_mine_tracking_acceleration_ms = 0
+        # ship 1 at 1500, 500 meters
+        self.game._ships[self.player_1_ship_id].coord_x = 1500 * 10
+        self.game._ships[self.player_1_ship_id].coord_y = 500 * 10
+        self.game._ships[self.player_1_ship_id].magnet_mines_loaded = 1
+        self.game._ships[self.player_1_ship_id].magnet_mine_launch_velocity = 0
+        self.game._ships[self.player_1_ship_id].cmd_launch_magnet_mine()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        mine_id = next(iter(self.game._magnet_mines.keys()))
+        mine = self.game._magnet_mines[mine_id]
+        # Mine at 1500, 1500 meters, 1000 meters from ship 1
+        mine.coord_x = 1500 * 10
+        mine.coord_y = 1500 * 10
+
+        frame = self.game._game_frame
+        self.game._build_spatial_indexes()
+        self.game._scheduler.start_frame(frame)
+        self.game._scheduler.defer(PeriodicTask.MAGNET_MINE_PROXIMITY, mine_id, frame) # Check on this frame.
+        self.game.advance_magnet_mines(fps=30)
+        assert mine.armed
+        assert mine.closest_ship_id == self.player_1_ship_id
+        deferred_until = self.game._scheduler._deferred[(PeriodicTask.MAGNET_MINE_PROXIMITY, mine_id)]
+        assert deferred_until > frame + 3
+
+        # ship 2 moves to 1500, 2000 meters, 500 meters from the mine
+        self.game._ships[self.player_2_ship_id].coord_x = 1500 * 10
+        self.game._ships[self.player_2_ship_id].coord_y = 2000 * 10
+        for game_frame in range(frame + 1, frame + 4):
+            self.game._build_spatial_indexes()
+            self.game._scheduler.start_frame(game_frame)
+            self.game.advance_magnet_mines(fps=30)
+        # Retargeted on its targeting frame, proximity checks are still deferred.
+        assert mine.closest_ship_id == self.player_2_ship_id
+        assert self.game._magnet_mine_targeting_lines[-1]['target_coord'] == (1500 * 10, 2000 * 10)
+        assert self.game._scheduler._deferred[(PeriodicTask.MAGNET_MINE_PROXIMITY, mine_id)] == deferred_until
+
+    def test_recoil_ends_a_deferred_proximity_check(self):
+        self.game._scheduler.run_everything = False
+        self.game._fixed_fps = 30
+        self.game._magnet_mine_arming_time_seconds = 0.01
+        self.game._magnet_mine_tracking_acceleration_ms = 0
+        self.game._magnet_mine_max_proximity_to_explode_meters = 50
+        self.game._tube_weapon_recoil_meters_per_second = 2000
+        ship_1 = self.game._ships[self.player_1_ship_id]
+        ship_2 = self.game._ships[self.player_2_ship_id]
+        ship_1.magnet_mines_loaded = 1
+        ship_1.magnet_mine_launch_velocity = 0
+        ship_1.cmd_launch_magnet_mine()
+        self.game.calculate_weapons_and_damage(self.player_1_ship_id)
+        mine_id = next(iter(self.game._magnet_mines.keys()))
+        mine = self.game._magnet_mines[mine_id]
+        # Mine at 1500, 1500 meters
+        mine.coord_x = 1500 * 10
+        mine.coord_y = 1500 * 10
+        # ship 2 600 meters north of the mine, pointed north.
+        ship_2.coord_x = 1500 * 10
+        ship_2.coord_y = 2100 * 10
+        ship_2._set_heading(0)
+        for ship in (ship_1, ship_2):
+            ship.velocity_x_meters_per_second = 0
+            ship.velocity_y_meters_per_second = 0
+
+        frame = self.game._game_frame
+        self.game._scheduler.defer(PeriodicTask.MAGNET_MINE_PROXIMITY, mine_id, frame) # Check on this frame.
+        self.game.run_frame({'commands': []})
+        assert mine.armed
+        assert self.game._scheduler._deferred[(PeriodicTask.MAGNET_MINE_PROXIMITY, mine_id)] == frame + PROXIMITY_CHECK_MAX_DEFER_FRAMES
+
+        # Ship 2 launches an EMP, recoil carries it south into the mine at 2000M/S
+        ship_2.recoilless_tube_launches = False
+        ship_2.emps_loaded = 1
+        ship_2.cmd_launch_emp()
+        while not mine.exploded:
+            self.game.run_frame({'commands': []})
+            assert self.game._game_frame < frame + PROXIMITY_CHECK_MAX_DEFER_FRAMES
+        # Detonated within a proximity check period of ship 2 reaching the mine.
+        assert abs(ship_2.coord_y - mine.coord_y) <= 50 * 10 + 2000 * 10 / 30 * 3
+        assert ship_2.died_on_frame is not None
 
     def test_mine_can_lock_onto_shooter_and_blow_them_up(self):
         self.game._magnet_mine_max_proximity_to_explode_meters = 50
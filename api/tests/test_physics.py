@@ -0,0 +1,84 @@
+from copy import deepcopy
+import random
+from unittest import TestCase
+from uuid import uuid4
+
+from api import physics
+from api.models.ship import Ship
+
+
+def spawn_ships(seed: int, count: int):
+    rng = random.Random(seed)
+    ships = []
+    for _ in range(count):
+        ship = Ship.spawn(str(uuid4()), {}, map_units_per_meter=10)
+        ship.coord_x = rng.randint(0, 100_000)
+        ship.coord_y = rng.randint(0, 100_000)
+        ship.heading = rng.randint(0, 359)
+        ship.velocity_x_meters_per_second = rng.choice((0, rng.uniform(-150, 150)))
+        ship.velocity_y_meters_per_second = rng.choice((0, rng.uniform(-150, 150)))
+        ship.engine_lit = rng.random() > 0.5
+        ship.engine_boosted = ship.engine_lit and rng.random() > 0.8
+        ship.gravity_brake_active = rng.random() > 0.9
+        ships.append(ship)
+    return ships
+
+
+def physics_state(ship: Ship):
+    return (
+        ship.coord_x,
+        ship.coord_y,
+        ship.velocity_x_meters_per_second,
+        ship.velocity_y_meters_per_second,
+        type(ship.coord_x),
+        type(ship.velocity_x_meters_per_second),
+    )
+
+
+class TestBatchedShipPhysics(TestCase):
+
+    def test_batched_physics_matches_scalar_physics(self):
+        for seed in range(20):
+            scalar_ships = spawn_ships(seed, 40)
+            batched_ships = deepcopy(scalar_ships)
+            for frame in range(1, 31):
+                for ship in scalar_ships:
+                    ship.calculate_physics(30, frame)
+                physics.calculate_ships_physics(batched_ships, 30, frame)
+                assert [physics_state(s) for s in scalar_ships] == [physics_state(s) for s in batched_ships]
+
+    def test_velocity_along_axes_matches_scalar_physics(self):
+        for vx, vy in ((0, 10), (0, -10), (10, 0), (-10, 0), (3, 3), (-3, -3), (3, -3), (-3, 3), (-0.0, -10)):
+            scalar_ship, = spawn_ships(0, 1)
+            scalar_ship.engine_lit = False
+            scalar_ship.gravity_brake_active = False
+            scalar_ship.velocity_x_meters_per_second = vx
+            scalar_ship.velocity_y_meters_per_second = vy
+            batched_ship = deepcopy(scalar_ship)
+            scalar_ship.calculate_physics(30)
+            physics.calculate_ships_physics([batched_ship], 30)
+            assert physics_state(scalar_ship) == physics_state(batched_ship)
+
+    def test_stationary_ship_values_are_untouched(self):
+        ship, = spawn_ships(0, 1)
+        ship.engine_lit = False
+        ship.gravity_brake_active = False
+        ship.velocity_x_meters_per_second = 0
+        ship.velocity_y_meters_per_second = 0
+        ship.coord_x, ship.coord_y = 100, 200
+        physics.calculate_ships_physics([ship], 30)
+        assert physics_state(ship) == (100, 200, 0, 0, int, int)
+
+    def test_rounding_boundary_headings_are_recomputed(self):
+        # Widen the guard so every heading goes through the python fallback.
+        scalar_ships = spawn_ships(1, 20)
+        batched_ships = deepcopy(scalar_ships)
+        original_guard = physics.ROUNDING_GUARD_DEGREES
+        physics.ROUNDING_GUARD_DEGREES = 1
+        try:
+            for ship in scalar_ships:
+                ship.calculate_physics(30, 1)
+            physics.calculate_ships_physics(batched_ships, 30, 1)
+        finally:
+            physics.ROUNDING_GUARD_DEGREES = original_guard
+        assert [physics_state(s) for s in scalar_ships] == [physics_state(s) for s in batched_ships]
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from api.profiler import FrameProfiler
+
+
+class TestFrameProfiler(TestCase):
+
+    def test_percentiles_use_nearest_rank(self):
+        profiler = FrameProfiler()
+        for ms in range(1, 101):
+            profiler.record("phase", ms * 1_000_000)
+        stats = profiler.get_stats()["phase"]
+        assert stats == {
+            "count": 100,
+            "p50_ms": 50,
+            "p95_ms": 95,
+            "p99_ms": 99,
+            "max_ms": 100,
+        }
+
+    def test_samples_are_a_rolling_window(self):
+        profiler = FrameProfiler(window=10)
+        for ms in range(1, 101):
+            profiler.record("phase", ms * 1_000_000)
+        stats = profiler.get_stats()["phase"]
+        assert stats['count'] == 10
+        assert stats['p50_ms'] == 95
+
+    def test_laps_are_recorded_per_phase_and_frame(self):
+        profiler = FrameProfiler()
+        for _ in range(3):
+            profiler.start_frame()
+            profiler.lap("a")
+            profiler.lap("b")
+            profiler.end_frame()
+        stats = profiler.get_stats()
+        assert list(stats.keys()) == ["a", "b", FrameProfiler.FRAME]
+        assert all(s['count'] == 3 for s in stats.values())
+        assert stats[FrameProfiler.FRAME]['max_ms'] >= stats["a"]['p50_ms']
+
+    def test_lap_outside_of_frame_is_ignored(self):
+        profiler = FrameProfiler()
+        profiler.lap("a")
+        assert profiler.get_stats() == {}
+
+    def test_counters_are_totals_until_reset(self):
+        profiler = FrameProfiler()
+        profiler.count("hits")
+        profiler.count("hits", 4)
+        profiler.count("misses", 0)
+        assert profiler.get_counters() == {"hits": 5, "misses": 0}
+        profiler.reset()
+        assert profiler.get_counters() == {}
+
+    def test_reset_can_resize_the_window(self):
+        profiler = FrameProfiler(window=10)
+        profiler.record("a", 1)
+        profiler.reset(window=2)
+        for ns in (1, 2, 3):
+            profiler.record("a", ns)
+        assert profiler.get_stats()["a"]["count"] == 2
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from api.models.special_weapons import MagnetMine
+from api.projectile_table import ProjectileTable, get_slots
+
+
+class TestProjectileTable(TestCase):
+
+    def test_released_slots_are_reused(self):
+        table = ProjectileTable(capacity=4)
+        first = table.allocate()
+        second = table.allocate()
+        assert (first, second) == (0, 1)
+        table.release(first)
+        assert table.allocate() == first
+        assert len(table) == 2
+
+    def test_table_grows_and_keeps_values(self):
+        table = ProjectileTable(capacity=2)
+        slots = [table.allocate() for _ in range(2)]
+        table.coord_x[slots] = [5, 6]
+        new_slot = table.allocate()
+        assert table.capacity == 4
+        assert new_slot == 2
+        assert table.coord_x[:2].tolist() == [5, 6]
+
+
+class TestTableBackedProjectile(TestCase):
+
+    def test_attached_projectile_reads_and_writes_table(self):
+        table = ProjectileTable()
+        mine = MagnetMine(1, "ship")
+        mine.coord_x = 100
+        mine.velocity_x_meters_per_second = 2.5
+        slot = mine.attach(table)
+        assert table.coord_x[slot] == 100
+        assert table.velocity_x_meters_per_second[slot] == 2.5
+
+        table.coord_x[slot] += 10
+        assert mine.coord_x == 110
+        assert type(mine.coord_x) is float
+        mine.coord_y = 50
+        assert table.coord_y[slot] == 50
+
+    def test_detached_projectile_keeps_values_and_frees_slot(self):
+        table = ProjectileTable()
+        mine = MagnetMine(1, "ship")
+        mine.attach(table)
+        mine.coord_x = 42
+        mine.elapsed_milliseconds = 1000
+        mine.detach()
+        assert len(table) == 0
+        assert mine.coord_x == 42
+        assert mine.elapsed_milliseconds == 1000
+        mine.coord_x = 7
+        assert table.coord_x[0] == 0
+
+    def test_get_slots_attaches_unattached_projectiles(self):
+        table = ProjectileTable()
+        mines = [MagnetMine(1, "ship") for _ in range(3)]
+        mines[1].attach(table)
+        slots = get_slots(mines, table)
+        assert sorted(slots.tolist()) == [0, 1, 2]
+        assert all(mine._table is table for mine in mines)
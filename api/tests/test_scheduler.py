@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from unittest import TestCase
+
+from api.profiler import FrameProfiler
+from api.scheduler import PeriodicScheduler
+
+
+TASKS = OrderedDict((
+    ('proximity', 3),
+    ('checks', 45),
+))
+
+
+class TestPeriodicScheduler(TestCase):
+
+    def setUp(self):
+        self.profiler = FrameProfiler()
+        self.scheduler = PeriodicScheduler(self.profiler, TASKS)
+
+    def _get_due_keys(self, game_frame, keys):
+        self.scheduler.start_frame(game_frame)
+        due = [key for key in keys if self.scheduler.is_due('proximity', key)]
+        self.scheduler.end_frame()
+        return due
+
+    def test_entity_work_is_spread_across_the_period(self):
+        keys = [f"m{i}" for i in range(9)]
+        per_frame = [self._get_due_keys(frame, keys) for frame in range(1, 7)]
+        assert [len(due) for due in per_frame] == [3] * 6
+        # Every entity is due exactly once per period.
+        assert sorted(per_frame[0] + per_frame[1] + per_frame[2]) == sorted(keys)
+        assert per_frame[0] == per_frame[3]
+
+    def test_work_without_a_key_runs_on_multiples_of_the_period(self):
+        due_frames = []
+        for frame in range(1, 100):
+            self.scheduler.start_frame(frame)
+            if self.scheduler.is_due('checks'):
+                due_frames.append(frame)
+        assert due_frames == [45, 90]
+
+    def test_run_everything_makes_every_task_due(self):
+        self.scheduler.run_everything = True
+        keys = [f"m{i}" for i in range(5)]
+        for frame in range(1, 4):
+            assert self._get_due_keys(frame, keys) == keys
+
+    def test_deferred_keys_are_due_on_the_deferred_frame(self):
+        keys = [f"m{i}" for i in range(3)]
+        self._get_due_keys(1, keys)
+        self.scheduler.defer('proximity', 'm0', 10)
+        due_frames = [
+            frame for frame in range(2, 14)
+            if 'm0' in self._get_due_keys(frame, keys)
+        ]
+        # Due on the deferred frame, then on its own frames again.
+        assert due_frames == [10, 12]
+        self.scheduler.defer('proximity', 'm1', 20)
+        self.scheduler.defer('proximity', 'm1', None)
+        assert 'm1' in self._get_due_keys(14, keys) + self._get_due_keys(15, keys) + self._get_due_keys(16, keys)
+
+    def test_deferring_a_task_does_not_defer_other_tasks_for_the_key(self):
+        self.scheduler.start_frame(45)
+        self.scheduler.defer('proximity', 'a', 90)
+        assert not self.scheduler.is_due('proximity', 'a')
+        assert self.scheduler.is_due('checks', 'a')
+
+    def test_forgotten_keys_get_a_new_offset(self):
+        self.scheduler.start_frame(1)
+        self.scheduler.is_due('proximity', 'a')
+        self.scheduler.defer('proximity', 'a', 10)
+        self.scheduler.forget('a')
+        assert 'a' not in self.scheduler._offsets
+        assert self.scheduler._deferred == {}
+        self.scheduler.forget('not-a-key')
+
+    def test_runs_and_cost_are_reported_to_the_profiler(self):
+        calls = []
+        for frame in range(1, 46):
+            self.scheduler.start_frame(frame)
+            result = self.scheduler.run('checks', None, calls.append, frame)
+            assert result is None
+            self.scheduler.end_frame()
+        assert calls == [45]
+        assert self.profiler.get_counters() == {"task.checks.runs": 1}
+        assert self.profiler.get_stats()["task.checks"]["count"] == 1
+
+    def test_timed_work_is_reported_to_the_profiler(self):
+        self.scheduler.start_frame(3)
+        for _ in range(2):
+            with self.scheduler.timed('proximity'):
+                pass
+        self.scheduler.end_frame()
+        # One sample per frame.
+        assert self.profiler.get_stats()["task.proximity"]["count"] == 1
+        assert "task.checks" not in self.profiler.get_stats()
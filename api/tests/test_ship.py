@@ -1,9 +1,10 @@
+import json
 
 from unittest import TestCase, expectedFailure
 from uuid import uuid4
 
 from api.models.ship import AutoPilotPrograms, ShipStateKey
-from api.models.ship_upgrade import UpgradeType
+from api.models.ship_upgrade import UpgradeType, get_upgrade_profile_1
 from api import constants
 from .utils import (
     DebugShip as Ship,
@@ -26,6 +27,48 @@ class TestShipBasicMethods(TestCase):
     def test_to_dict_method_returns_a_dict(self):
         assert isinstance(self.ship.to_dict(), dict)
 
+    def test_ship_fields_are_declared(self):
+        assert not hasattr(self.ship, '__dict__')
+        with self.assertRaises(AttributeError):
+            self.ship.not_a_ship_field = 1
+
+    def test_upgrade_effect_fields_are_declared(self):
+        for upgrade in get_upgrade_profile_1()[UpgradeType.SHIP]:
+            for effects in upgrade.effect_progression.values():
+                for effect in effects:
+                    assert hasattr(self.ship, effect['field'])
+
+    def test_to_json_matches_to_dict(self):
+        self.ship.scanner_ship_data['foo'] = {'id': 'foo', 'distance': 10}
+        assert json.loads(self.ship.to_json()) == json.loads(json.dumps(self.ship.to_dict()))
+
+    def test_to_json_reencodes_slow_changing_fields_when_they_change(self):
+        self.ship.to_json()
+        cached_fragment = self.ship._slow_changing_json
+        self.ship.coord_x += 10
+        # Changes every frame while locking/locked on.
+        self.ship.scanner_lock_traversal_slack = 0.25
+        data = json.loads(self.ship.to_json())
+        assert data['coord_x'] == self.ship.coord_x
+        assert data['scanner_lock_traversal_slack'] == 0.25
+        assert self.ship._slow_changing_json is cached_fragment
+        self.ship.scanner_radar_range += 100
+        self.ship.team_id = None
+        data = json.loads(self.ship.to_json())
+        assert data['scanner_radar_range'] == self.ship.scanner_radar_range
+        assert data['team_id'] is None
+
+    def test_to_json_reencodes_upgrade_summary_while_researching(self):
+        self.ship.docked_at_station = "foobar"
+        self.ship.virtual_ore_kg = 1000
+        self.ship.battery_power = 1_000_000
+        before = json.loads(self.ship.to_json())['upgrade_summary']
+        self.ship.cmd_start_core_upgrade("titanium_alloy_hull")
+        self.ship.advance_upgrades(fps=10)
+        after = json.loads(self.ship.to_json())['upgrade_summary']
+        assert before[UpgradeType.CORE]['titanium_alloy_hull']['seconds_researched'] is None
+        assert after[UpgradeType.CORE]['titanium_alloy_hull']['seconds_researched'] == 0.1
+
 
 
 '''
@@ -2276,6 +2319,22 @@ class TestShipCMDSetHeading(TestCase):
         assert self.ship.heading == 335
         assert self.ship.desired_heading == 335
 
+    def test_map_hitbox_is_reused_until_position_or_heading_changes(self):
+        self.ship.coord_x = 1000
+        self.ship.coord_y = 2000
+        hitbox_coords = self.ship.hitbox_coords
+        assert hitbox_coords == ((1000, 2075), (950, 1944), (1000, 1925), (1050, 1944))
+        assert self.ship.hitbox_coords is hitbox_coords
+        assert self.ship.hitbox_lines[0] == (self.ship.map_nose_coord, self.ship.map_bottom_left_coord)
+        assert self.ship.map_bottom_right_coord == (1050, 1944)
+
+        self.ship.coord_x = 1001
+        assert self.ship.map_nose_coord == (1001, 2075)
+        self.ship.coord_y = 2001
+        assert self.ship.map_bottom_center_coord == (1001, 1926)
+        self.ship._set_heading(constants.DEGREES_EAST)
+        assert self.ship.hitbox_coords == ((1076, 2001), (945, 2051), (926, 2001), (945, 1951))
+
 '''
 ███████ ███    ██  ██████  ██ ███    ██ ███████
 ██      ████   ██ ██       ██ ████   ██ ██
@@ -16,3 +16,19 @@ class TestGetDesignations(TestCase):
         assert len(designations) == 3
         assert len(set(designations.values())) == 3
         assert all(len(v.split(" ")) == 2 for v in designations.values())
+
+    def test_large_games_get_unique_designations(self):
+        ids = [str(uuid4()) for _ in range(128)]
+        designations = get_designations(ids)
+        assert len(designations) == 128
+        assert len(set(designations.values())) == 128
+        assert all(len(v) <= 10 for v in designations.values())
+
+    def test_every_designator_can_be_assigned(self):
+        ids = list(range(1085))
+        designations = get_designations(ids)
+        assert len(set(designations.values())) == 1085
+
+    def test_too_many_ships_raises(self):
+        with self.assertRaisesRegex(Exception, "too many ships"):
+            get_designations(list(range(1086)))
@@ -0,0 +1,108 @@
+import json
+import random
+from unittest import TestCase
+
+from api.models.game import GamePhase
+from api.models.ship import ShipCommands
+from api.simulate import (
+    build_map,
+    build_game,
+    get_player_id,
+    run_simulation,
+    CommandLogPolicy,
+    ScriptedBotPolicy,
+)
+
+
+class TestSimulate(TestCase):
+
+    def test_build_map_has_a_spawn_point_per_player(self):
+        map_details = build_map(10)
+        assert len(map_details['spawnPoints']) == 10
+        points = {(p['position_meters_x'], p['position_meters_y']) for p in map_details['spawnPoints']}
+        assert len(points) == 10
+        for x, y in points:
+            assert 0 < x < map_details['mapData']['meters_x']
+            assert 0 < y < map_details['mapData']['meters_y']
+
+    def test_build_game_is_live_and_allows_more_than_max_players(self):
+        game = build_game(build_map(12), 12)
+        assert game._phase == GamePhase.LIVE
+        assert game._game_frame == 1
+        assert len(game._ships) == 12
+
+    def test_build_game_requires_enough_spawn_points(self):
+        with self.assertRaises(ValueError):
+            build_game(build_map(2), 3)
+
+    def test_frames_are_not_throttled(self):
+        game = build_game(build_map(2), 2, fps=20)
+        results = run_simulation(game, CommandLogPolicy([], []), 90)
+        assert results['frames'] == 90
+        assert game._game_frame == 91
+        assert game._fps == 20
+        assert game._frame_sleep is None
+        assert game.get_frame_throttle_seconds() == 0
+        assert results['frame']['count'] == 90
+        assert results['phases']['physics']['count'] == 90
+        assert {'pair_cache_hits', 'pair_cache_misses'} <= set(results['counters'])
+        assert results['frame_ms'] is None
+
+    def test_periodic_task_runs_and_cost_are_reported(self):
+        game = build_game(build_map(2), 2, fps=20)
+        results = run_simulation(game, CommandLogPolicy([], []), 90)
+        assert game._scheduler.profiler is game.profiler
+        assert results['counters']['task.game_checks.runs'] == 2
+        assert results['counters']['task.gravity_brake_catch.runs'] > 0
+        assert results['phases']['task.game_checks']['count'] == 2
+
+    def test_command_log_replays_with_recorded_player_ids_mapped(self):
+        lines = [
+            json.dumps({'commands': [
+                {'player_id': 'recorded-b', 'ship_command': ShipCommands.SET_HEADING, 'args': [90]},
+            ]}),
+            "",
+            json.dumps({'ping': {}}),
+            json.dumps({'run_frame': {'commands': [
+                {'player_id': 'recorded-a', 'ship_command': ShipCommands.SET_HEADING, 'args': [180]},
+            ]}}),
+        ]
+        game = build_game(build_map(2), 2)
+        policy = CommandLogPolicy(lines, list(game._players.keys()))
+        assert len(policy) == 2
+
+        results = run_simulation(game, policy, 3, include_frame_ms=True)
+        assert results['frames'] == 3
+        assert len(results['frame_ms']) == 3
+        ship_0 = game._ships[game._player_id_to_ship_id_map[get_player_id(0)]]
+        ship_1 = game._ships[game._player_id_to_ship_id_map[get_player_id(1)]]
+        assert ship_0.desired_heading == 90
+        assert ship_1.desired_heading == 180
+
+    def test_command_log_with_too_many_players_raises(self):
+        lines = [json.dumps({'commands': [
+            {'player_id': player_id, 'ship_command': ShipCommands.LIGHT_ENGINE}
+            for player_id in ('a', 'b', 'c')
+        ]})]
+        game = build_game(build_map(2), 2)
+        with self.assertRaises(ValueError):
+            run_simulation(game, CommandLogPolicy(lines, list(game._players.keys())), 1)
+
+    def test_bot_policy_is_reproducible(self):
+        def run():
+            random.seed(3)
+            game = build_game(build_map(6, spacing_meters=800), 6)
+            run_simulation(game, ScriptedBotPolicy(list(game._players.keys()), seed=3), 600)
+            return [
+                (ship.coord_x, ship.coord_y, ship.heading, ship.died_on_frame)
+                for ship in game._ships.values()
+            ]
+
+        first = run()
+        assert first == run()
+        # Bots actually fly around.
+        spawn_points = build_map(6, spacing_meters=800)['spawnPoints']
+        assert any(
+            (x, y) != (p['position_meters_x'] * 10, p['position_meters_y'] * 10)
+            for (x, y, _, _), p in zip(first, spawn_points)
+        )
@@ -0,0 +1,147 @@
+import random
+from uuid import uuid4
+from unittest import TestCase
+
+from api.models.game import Game
+from api.spatial_index import MapFeatureIndex, SpatialHash
+from api import utils2d
+
+
+class TestSpatialHash(TestCase):
+
+    def test_query_radius_returns_items_in_insertion_order(self):
+        index = SpatialHash(10)
+        index.insert("c", (55, 55))
+        index.insert("a", (1, 1))
+        index.insert("far", (500, 500))
+        index.insert("b", (-20, 3))
+        assert index.query_radius((0, 0), 80) == ["c", "a", "b"]
+
+    def test_query_radius_is_inclusive(self):
+        index = SpatialHash(10)
+        index.insert("a", (30, 40))
+        assert index.query_radius((0, 0), 50) == ["a"]
+        assert index.query_radius((0, 0), 49) == []
+
+    def test_query_radius_on_empty_index(self):
+        assert SpatialHash(10).query_radius((0, 0), 100) == []
+
+    def test_nearest_matches_linear_scan(self):
+        rng = random.Random(1)
+        points = {str(i): (rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)) for i in range(200)}
+        index = SpatialHash(75)
+        for item_id, coords in points.items():
+            index.insert(item_id, coords)
+        for _ in range(50):
+            query = (rng.uniform(-1500, 1500), rng.uniform(-1500, 1500))
+            expected = min(points, key=lambda k: utils2d.calculate_point_distance(query, points[k]))
+            item_id, distance = index.nearest(query)
+            assert item_id == expected
+            assert distance == utils2d.calculate_point_distance(query, points[expected])
+
+    def test_nearest_ties_go_to_first_inserted(self):
+        index = SpatialHash(10)
+        index.insert("b", (0, 100))
+        index.insert("a", (0, -100))
+        assert index.nearest((0, 0)) == ("b", 100)
+
+    def test_nearest_respects_predicate_and_max_radius(self):
+        index = SpatialHash(10)
+        index.insert("a", (0, 5))
+        index.insert("b", (0, 50))
+        assert index.nearest((0, 0), lambda i: i != "a") == ("b", 50)
+        assert index.nearest((0, 0), lambda i: i != "a", max_radius=40) == (None, None)
+
+
+def _feature(name, x, y, service_radius, collision_radius=None):
+    feature = {
+        'name': name,
+        'position_map_units_x': x,
+        'position_map_units_y': y,
+        'service_radius_map_units': service_radius,
+    }
+    if collision_radius is not None:
+        feature['collision_radius_meters'] = collision_radius
+    return feature
+
+
+class TestMapFeatureIndex(TestCase):
+
+    def test_service_candidates_are_in_map_order(self):
+        features = [
+            _feature("far", 10_000, 10_000, 100),
+            _feature("b", 150, 0, 200),
+            _feature("a", 0, 50, 100),
+        ]
+        index = MapFeatureIndex(features)
+        assert [f['name'] for f in index.get_service_candidates((0, 0))] == ["b", "a"]
+
+    def test_collision_radius_is_converted_to_map_units(self):
+        index = MapFeatureIndex([_feature("rock", 0, 0, 1000, collision_radius=15)], map_units_per_meter=10)
+        assert index.get_collision((149, 0))['name'] == "rock"
+        assert index.get_collision((150, 0)) is None
+
+    def test_features_without_a_collision_radius_never_collide(self):
+        index = MapFeatureIndex([_feature("station", 0, 0, 1000)], map_units_per_meter=10)
+        assert index.get_collision((0, 0)) is None
+
+    def test_empty_index(self):
+        index = MapFeatureIndex([])
+        assert index.get_service_candidates((0, 0)) == []
+        assert index.get_collision((0, 0)) is None
+
+
+class TestGameSpatialIndexes(TestCase):
+
+    def setUp(self):
+        self.upm = 10
+        self.game = Game()
+        spawn_points = []
+        rng = random.Random(7)
+        for _ in range(8):
+            self.game.register_player({
+                'player_id': str(uuid4()),
+                'player_name': "foobar",
+                'team_id': str(uuid4()),
+            })
+            spawn_points.append({
+                'position_meters_x': rng.randint(100, 9000),
+                'position_meters_y': rng.randint(100, 9000),
+            })
+        self.game.set_map({
+            'mapData':{
+                "meters_x": 10 * 1000,
+                "meters_y": 10 * 1000,
+                "name": "TestMap",
+            },
+            'spawnPoints': spawn_points,
+            'spaceStations': [],
+            'miningLocations': [],
+        }, map_units_per_meter=self.upm)
+        self.game.advance_to_phase_1_starting()
+        for ship in self.game._ships.values():
+            ship.coord_x = rng.randint(0, 4 * 1000 * self.upm)
+            ship.coord_y = rng.randint(0, 4 * 1000 * self.upm)
+            ship.scanner_online = True
+
+    def test_scanner_data_is_the_same_with_and_without_indexes(self):
+        expected = {}
+        for ship_id, ship in self.game._ships.items():
+            self.game.reset_and_update_scanner_states(ship_id)
+            expected[ship_id] = list(ship.scanner_ship_data.items())
+
+        self.game._build_spatial_indexes()
+        for ship_id, ship in self.game._ships.items():
+            self.game.reset_and_update_scanner_states(ship_id)
+            assert list(ship.scanner_ship_data.items()) == expected[ship_id]
+        assert any(expected.values())
+
+    def test_nearest_ship_is_the_same_with_and_without_indexes(self):
+        rng = random.Random(3)
+        queries = [
+            (rng.randint(0, 100_000), rng.randint(0, 100_000))
+            for _ in range(25)
+        ]
+        expected = [self.game._get_nearest_ship(q) for q in queries]
+        self.game._build_spatial_indexes()
+        assert [self.game._get_nearest_ship(q) for q in queries] == expected
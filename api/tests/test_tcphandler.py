@@ -1,8 +1,227 @@
-
+import io
 import json
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 
+from api.commands import CommandError
 from api.main import TCPHandler
 from api.models.game import Game
+from api.simulate import build_game, build_map
+
+
+def build_handler(*lines) -> TCPHandler:
+    handler = TCPHandler.__new__(TCPHandler)
+    handler.game = Game()
+    handler.rfile = io.BytesIO(b"".join(
+        json.dumps(line).encode() + b"\n" if isinstance(line, dict) else line
+        for line in lines
+    ))
+    handler.wfile = io.BytesIO()
+    return handler
+
+
+def read_response_lines(handler: TCPHandler):
+    return [
+        json.loads(line)
+        for line in handler.wfile.getvalue().split(b"\n")
+        if line
+    ]
+
+
+class TestTCPHandlerOneShot(TestCase):
+
+    def test_ping_response_has_base_state_keys(self):
+        handler = build_handler({"ping": {}})
+        handler.handle()
+        data = json.loads(handler.wfile.getvalue())
+        assert set(data.keys()) == set(Game.BASE_STATE_KEYS)
+        assert data['ok']
+
+    def test_live_ping_response_has_base_state_keys(self):
+        handler = build_handler({"ping": {}})
+        handler.game = build_game(build_map(2), 2)
+        handler.handle()
+        data = json.loads(handler.wfile.getvalue())
+        assert set(data.keys()) == set(Game.BASE_STATE_KEYS)
+        assert data['phase'] == "2-live"
+        assert data['map_config']['map_name'] == "Simulated 2 Player Grid"
+
+    def test_request_id_is_echoed_back(self):
+        handler = build_handler({"request_id": 7, "ping": {}})
+        handler.handle()
+        data = json.loads(handler.wfile.getvalue())
+        assert data['request_id'] == 7
+        assert data['phase'] == handler.game.get_state()['phase']
+
+    def test_one_shot_response_is_not_newline_terminated(self):
+        handler = build_handler({"ping": {}})
+        handler.handle()
+        assert not handler.wfile.getvalue().endswith(b"\n")
+
+
+class TestTCPHandlerSession(TestCase):
+
+    def test_session_responds_to_each_command_in_order(self):
+        handler = build_handler(
+            {"session": {}, "request_id": "s"},
+            {"request_id": 1, "ping": {}},
+            {"request_id": 2, "add_player": {
+                "player_id": "p1", "player_name": "foo", "team_id": "t1",
+            }},
+            {"request_id": 3, "ping": {}},
+        )
+        handler.handle()
+        responses = read_response_lines(handler)
+        assert [r['request_id'] for r in responses] == ["s", 1, 2, 3]
+        assert responses[1]['players'] == {}
+        assert responses[3]['players'] == {
+            "p1": {"player_id": "p1", "player_name": "foo", "team_id": "t1"},
+        }
+
+    def test_session_skips_blank_lines(self):
+        handler = build_handler(
+            {"session": {}},
+            b"\n",
+            {"request_id": 1, "ping": {}},
+        )
+        handler.handle()
+        responses = read_response_lines(handler)
+        assert len(responses) == 2
+        assert responses[1]['request_id'] == 1
+
+    def test_session_survives_a_failed_command(self):
+        handler = build_handler(
+            {"session": {}},
+            {"request_id": 1, "not_a_command": {}},
+            {"request_id": 2, "ping": {}},
+        )
+        handler.handle()
+        responses = read_response_lines(handler)
+        assert responses[1] == {
+            "request_id": 1,
+            "ok": False,
+            "error": "NotImplementedError",
+        }
+        assert responses[2]['request_id'] == 2
+        assert responses[2]['ok']
+
+    def test_response_shape_is_unchanged_in_session(self):
+        one_shot = build_handler({"ping": {}})
+        one_shot.handle()
+        session = build_handler({"session": {}}, {"ping": {}})
+        session.handle()
+        responses = read_response_lines(session)
+        assert responses[1] == json.loads(one_shot.wfile.getvalue())
+
+
+class TestTCPHandlerStats(TestCase):
+
+    def test_stats_include_serialization_timings(self):
+        handler = build_handler(
+            {"session": {}},
+            {"add_player": {"player_id": "p1", "player_name": "foo", "team_id": "t1"}},
+            {"stats": {}},
+        )
+        handler.handle()
+        stats = read_response_lines(handler)[2]
+        assert stats['ok']
+        assert stats['phases']['serialization']['count'] == 1
+        assert set(stats['phases']['serialization'].keys()) == {
+            "count", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+        }
+
+    def test_stats_can_be_reset(self):
+        handler = build_handler(
+            {"session": {}},
+            {"add_player": {"player_id": "p1", "player_name": "foo", "team_id": "t1"}},
+            {"stats": {"reset": True}},
+            {"stats": {}},
+        )
+        handler.handle()
+        responses = read_response_lines(handler)
+        assert 'serialization' in responses[2]['phases']
+        assert responses[3]['phases'] == {}
+
+
+class TestTCPHandlerDeltaSession(TestCase):
+
+    def test_frames_are_delta_encoded_after_an_ack(self):
+        handler = build_handler(
+            {"session": {"delta": True}},
+            {"run_frame": {"commands": []}},
+            {"run_frame": {"commands": [], "ack_frame": 2}},
+            {"run_frame": {"commands": []}},
+        )
+        handler.game = build_game(build_map(2), 2)
+        handler.handle()
+        responses = read_response_lines(handler)
+        assert responses[1]['keyframe']
+        assert responses[1]['game_frame'] == 2
+        assert 'ships' in responses[1]
+        assert not responses[2]['keyframe']
+        assert responses[2]['base_frame'] == 2
+        assert 'ships' not in responses[2]
+        # No new ack, still encoded against frame 2
+        assert responses[3]['base_frame'] == 2
+
+    def test_sessions_without_delta_get_full_states(self):
+        handler = build_handler(
+            {"session": {}},
+            {"run_frame": {"commands": [], "ack_frame": None}},
+        )
+        handler.game = build_game(build_map(2), 2)
+        handler.handle()
+        response = read_response_lines(handler)[1]
+        assert 'keyframe' not in response
+        assert 'ships' in response
+
+
+class TestTCPHandlerPerTeamSession(TestCase):
+
+    def test_live_frames_are_split_per_team(self):
+        handler = build_handler(
+            {"session": {"per_team": True}},
+            {"request_id": 1, "run_frame": {"commands": []}},
+        )
+        handler.game = build_game(build_map(3), 3)
+        handler.game._ships[next(iter(handler.game._ships))].team_id = None
+        handler.handle()
+        lines = handler.wfile.getvalue().split(b"\n")
+        header = json.loads(lines[1])
+        assert header == {"request_id": 1, "ok": True, "phase": "2-live", "game_frame": 2, "world_version": 1, "team_frames": 2}
+        team_frames = {}
+        for line in lines[2:4]:
+            team_id, frame = line.split(b" ", 1)
+            team_frames[team_id.decode()] = json.loads(frame)
+        full_state = handler.game.get_state()
+        ships_by_team = {ship['team_id']: ship for ship in full_state['ships'] if ship['team_id']}
+        assert set(team_frames.keys()) == set(ships_by_team.keys())
+        for team_id, frame in team_frames.items():
+            assert frame['ship']['id'] == ships_by_team[team_id]['id']
+            assert frame['game_frame'] == 2
+            assert frame['world_version'] == 1
+            assert frame['killfeed'] == full_state['killfeed']
+            assert 'players' not in frame
+
+    def test_per_team_and_delta_cannot_be_combined(self):
+        handler = build_handler({"session": {"per_team": True, "delta": True}})
+        with self.assertRaises(CommandError):
+            handler.handle()
+
+
+class TestTCPHandlerGetWorld(TestCase):
+
+    def test_get_world_returns_static_map_data(self):
+        handler = build_handler({"get_world": {}})
+        handler.game = build_game(build_map(2), 2)
+        handler.handle()
+        world = json.loads(handler.wfile.getvalue())
+        assert world['ok']
+        assert world['world_version'] == 1
+        assert world['map_config'] == handler.game._get_base_state()['map_config']
+        assert world['special_weapon_costs'] == handler.game._special_weapon_costs
 
+    def test_get_world_before_the_game_is_live(self):
+        handler = build_handler({"session": {}}, {"get_world": {}})
+        handler.handle()
+        assert read_response_lines(handler)[1]['ok'] is False
@@ -0,0 +1,65 @@
+import random
+from unittest import TestCase
+
+from api.timer_wheel import TimerWheel
+
+
+class TestTimerWheel(TestCase):
+
+    def test_events_are_returned_on_their_frame(self):
+        wheel = TimerWheel()
+        wheel.schedule(3, "a")
+        wheel.schedule(1, "b")
+        wheel.schedule(3, "c")
+        assert wheel.advance(1) == ["b"]
+        assert wheel.advance(2) == []
+        assert wheel.advance(3) == ["a", "c"]
+        assert len(wheel) == 0
+
+    def test_past_frames_are_returned_by_next_advance(self):
+        wheel = TimerWheel(frame=10)
+        wheel.schedule(4, "a")
+        wheel.schedule(10, "b")
+        assert wheel.advance(10) == ["a", "b"]
+
+    def test_advance_past_many_frames_returns_events_in_due_order(self):
+        wheel = TimerWheel()
+        wheel.schedule(200, "b")
+        wheel.schedule(5, "a")
+        wheel.schedule(5000, "c")
+        assert wheel.advance(4999) == ["a", "b"]
+        assert wheel.advance(5000) == ["c"]
+
+    def test_cancelled_events_are_dropped(self):
+        wheel = TimerWheel()
+        handle = wheel.schedule(2, "a")
+        wheel.schedule(2, "b")
+        wheel.cancel(handle)
+        assert wheel.advance(2) == ["b"]
+        assert len(wheel) == 0
+
+    def test_events_at_every_level_and_overflow(self):
+        rng = random.Random(1)
+        wheel = TimerWheel()
+        horizon = TimerWheel.SLOTS ** TimerWheel.LEVELS + 1000
+        frames = [rng.randint(1, horizon) for _ in range(300)]
+        for frame in frames:
+            wheel.schedule(frame, frame)
+        fired = []
+        previous_frame = frame = 0
+        while frame < horizon:
+            frame = min(horizon, frame + rng.randint(1, 5000))
+            events = wheel.advance(frame)
+            # Fired by the first advance that reached their frame.
+            assert all(previous_frame < event <= frame for event in events)
+            fired.extend(events)
+            previous_frame = frame
+        assert fired == sorted(frames)
+        assert len(wheel) == 0
+
+    def test_moving_backwards_keeps_events(self):
+        wheel = TimerWheel(frame=100)
+        wheel.schedule(150, "a")
+        assert wheel.advance(20) == []
+        assert wheel.advance(149) == []
+        assert wheel.advance(150) == ["a"]
@@ -24,7 +24,7 @@ class TestTubeWeapons(TestCase):
 
         self.game = Game()
         self.game._fps = 1
-        self.game._is_testing = True
+        self.game._scheduler.run_everything = True
 
         self.game.register_player({
             'player_id':self.player_1_id,
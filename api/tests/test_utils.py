@@ -551,6 +551,29 @@ class TestUtils(TestCase):
         assert round(utils2d.calculate_point_distance((-4, -4), (8, 8))) == 17
         assert round(utils2d.calculate_point_distance((8, 8), (-4, -4))) == 17
 
+    def test_calculate_swept_contact(self):
+        # Starts within radius
+        assert utils2d.calculate_swept_contact((3, 4), (100, 100), 5) == 0
+        # Passes straight through the origin, contact 10 units before it.
+        assert utils2d.calculate_swept_contact((-50, 0), (50, 0), 10) == 0.4
+        # Passes beside the origin, within radius.
+        assert round(utils2d.calculate_swept_contact((-50, 6), (50, 6), 10), 5) == 0.42
+        # Passes beside the origin, outside radius.
+        assert utils2d.calculate_swept_contact((-50, 11), (50, 11), 10) is None
+        # Stops short, moving away, or not moving.
+        assert utils2d.calculate_swept_contact((-50, 0), (-20, 0), 10) is None
+        assert utils2d.calculate_swept_contact((20, 0), (50, 0), 10) is None
+        assert utils2d.calculate_swept_contact((20, 0), (20, 0), 10) is None
+
+    def test_calculate_earliest_contact_seconds(self):
+        assert utils2d.calculate_earliest_contact_seconds(-5, 10, 0) == 0
+        assert utils2d.calculate_earliest_contact_seconds(100, 10, 0) == 10
+        assert utils2d.calculate_earliest_contact_seconds(100, 0, 0) is None
+        # 0.5 * 2 * t**2 == 100
+        assert utils2d.calculate_earliest_contact_seconds(100, 0, 2) == 10
+        # 10t + 0.5 * 2 * t**2 == 75
+        assert utils2d.calculate_earliest_contact_seconds(75, 10, 2) == 5
+
     def test_degrees_to_general_direction(self):
         assert utils2d.degrees_to_general_direction(10) == constants.GENERAL_DIRECTION.north_east_ish
         assert utils2d.degrees_to_general_direction(80) == constants.GENERAL_DIRECTION.north_east_ish
@@ -81,6 +81,7 @@ def assert_ship_moves_from_quadrant_to_quadrant(
 
 
 class DebugShip(Ship):
+    __slots__ = ()
 
     def dprint(self, label: str, *args):
         print(label, *[r(v) for v in args])
@@ -0,0 +1,123 @@
+""" Hierarchical timer wheel keyed on game frame.
+
+    Events are scheduled for a future frame and returned by advance() on that
+    frame, so state that changes at a known frame doesn't have to be polled.
+    Level 0 has a bucket per frame for the next SLOTS frames, each higher level
+    has buckets spanning SLOTS times more frames. Higher level buckets are
+    moved down (cascaded) when the wheel reaches the start of their span.
+    Events past the last level wait in an overflow list.
+"""
+
+from typing import Any, List, Optional
+
+
+class TimerHandle:
+    __slots__ = ('frame', 'event', 'cancelled')
+
+    def __init__(self, frame: int, event: Any):
+        self.frame = frame
+        self.event = event
+        self.cancelled = False
+
+
+class TimerWheel:
+
+    SLOTS = 64
+    LEVELS = 3
+
+    def __init__(self, frame: int = 0):
+        self._frame = frame
+        self._wheels: List[List[List[TimerHandle]]] = [
+            [[] for _ in range(self.SLOTS)]
+            for _ in range(self.LEVELS)
+        ]
+        self._overflow: List[TimerHandle] = []
+        # Scheduled for the current frame or earlier, returned by the next advance()
+        self._due: List[TimerHandle] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        """ Scheduled events, including cancelled events that haven't been dropped yet.
+        """
+        return self._count
+
+    @property
+    def frame(self) -> int:
+        return self._frame
+
+    def _insert(self, handle: TimerHandle):
+        delta = handle.frame - self._frame
+        if delta <= 0:
+            self._due.append(handle)
+            return
+        span = 1
+        for wheel in self._wheels:
+            if delta < span * self.SLOTS:
+                wheel[(handle.frame // span) % self.SLOTS].append(handle)
+                return
+            span *= self.SLOTS
+        self._overflow.append(handle)
+
+    def schedule(self, frame: int, event: Any) -> TimerHandle:
+        """ Schedule event to be returned by advance() on frame.
+            Frames that already passed are returned by the next advance()
+        """
+        handle = TimerHandle(frame, event)
+        self._insert(handle)
+        self._count += 1
+        return handle
+
+    def cancel(self, handle: Optional[TimerHandle]):
+        if handle is not None:
+            handle.cancelled = True
+
+    def _cascade(self, level: int):
+        span = self.SLOTS ** level
+        bucket = self._wheels[level][(self._frame // span) % self.SLOTS]
+        self._wheels[level][(self._frame // span) % self.SLOTS] = []
+        for handle in bucket:
+            self._insert(handle)
+
+    def _tick(self):
+        self._frame += 1
+        if self._frame % (self.SLOTS ** self.LEVELS) == 0:
+            overflow = self._overflow
+            self._overflow = []
+            for handle in overflow:
+                self._insert(handle)
+        for level in range(self.LEVELS - 1, 0, -1):
+            if self._frame % (self.SLOTS ** level) == 0:
+                self._cascade(level)
+        bucket_ix = self._frame % self.SLOTS
+        if self._wheels[0][bucket_ix]:
+            self._due.extend(self._wheels[0][bucket_ix])
+            self._wheels[0][bucket_ix] = []
+
+    def advance(self, frame: int) -> List[Any]:
+        """ Move the wheel to frame and get events due on or before it, in due order.
+        """
+        if frame < self._frame:
+            # Frame moved backwards, re-bucket everything relative to the new frame.
+            handles = self._due + self._overflow + [
+                handle
+                for wheel in self._wheels
+                for bucket in wheel
+                for handle in bucket
+            ]
+            self.__init__(frame)
+            for handle in handles:
+                self._insert(handle)
+            self._count = len(handles)
+        elif self._count == 0:
+            self._frame = frame
+        else:
+            while self._frame < frame:
+                self._tick()
+
+        if not self._due:
+            return []
+        due = self._due
+        self._due = []
+        self._count -= len(due)
+        due.sort(key=lambda handle: handle.frame)
+        return [handle.event for handle in due if not handle.cancelled]
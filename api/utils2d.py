@@ -1,6 +1,6 @@
 
 import math
-from typing import Tuple, Union, Optional
+from typing import Callable, Tuple, Union, Optional
 
 from api.constants import (
     ORGIN_COORD,
@@ -235,6 +235,26 @@ def hitboxes_intercept_ray_factory(
     return inner_is_not_cardinal, ray_point_b
 
 
+def ray_circle_broadphase_factory(point: Tuple[int], heading: Union[int, float]) -> Callable[[Tuple, float], bool]:
+    """ Cheap pre-check for ray casts.
+        Returns a function that takes a circle (center, radius) and returns False
+        when the circle is entirely beside or behind the ray cast from point along heading.
+        Anything that can intercept the ray lies inside a circle that passes.
+    """
+    px, py = point
+    ux, uy = calculate_x_y_components(1, heading)
+
+    def inner(center: Tuple, radius: float) -> bool:
+        cx = center[0] - px
+        cy = center[1] - py
+        if cx * ux + cy * uy < -radius:
+            # Behind the ray's start.
+            return False
+        return abs(cx * uy - cy * ux) <= radius
+
+    return inner
+
+
 def translate_point(point: Tuple, degrees: int, distance_map_units: int) -> Tuple:
     px, py = point
     radians = degrees_to_radians(degrees % 360)
@@ -312,6 +332,45 @@ def calculate_point_distance(point_a: Tuple, point_b: Tuple) -> float:
     return math.sqrt(((bx - ax) ** 2) + ((by - ay) ** 2))
 
 
+def calculate_swept_contact(rel_start: Tuple, rel_end: Tuple, radius: float) -> Optional[float]:
+    """ A relative position (IE projectile - ship) moves in a straight line from
+        rel_start to rel_end as t goes from 0 to 1.
+        Get the first t where it's within radius of the origin, None if it never is.
+    """
+    sx, sy = rel_start
+    dx = rel_end[0] - sx
+    dy = rel_end[1] - sy
+    c = sx * sx + sy * sy - radius * radius
+    if c <= 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    b = 2 * (sx * dx + sy * dy)
+    if a == 0 or b >= 0:
+        # Not moving, or moving away.
+        return None
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    return t if t <= 1 else None
+
+
+def calculate_earliest_contact_seconds(gap: float, closing_speed: float, closing_acceleration: float) -> Optional[float]:
+    """ Earliest time (seconds) two objects gap apart could touch if they close at
+        most at closing_speed, and the closing speed grows at most by closing_acceleration.
+        None if they never can.
+    """
+    if gap <= 0:
+        return 0.0
+    if closing_acceleration <= 0:
+        if closing_speed <= 0:
+            return None
+        return gap / closing_speed
+    return (
+        math.sqrt(closing_speed ** 2 + 2 * closing_acceleration * gap) - closing_speed
+    ) / closing_acceleration
+
+
 def calculate_heading_to_point(point_a: Tuple, point_b: Tuple) -> float:
     x1, y1 = point_a
     x2, y2 = point_b
@@ -6,7 +6,7 @@ import { Subject } from 'rxjs'
 
 import { StartCountdownPayload } from './models/startcountdown-payload.model'
 import { AllChatMessage } from './models/allchat-message.model';
-import { FrameData, LiveGameDetails } from './models/apidata.model';
+import { FrameData, LiveGameDetails, WorldData } from './models/apidata.model';
 
 
 @Injectable({
@@ -20,6 +20,9 @@ export class ApiService {
   public frameDataEvent: Subject<void> = new Subject()
   public frameData: FrameData | null = null
   public liveGameDetails: LiveGameDetails | null = null
+  // Static map data, frames only carry its world_version.
+  private world: WorldData | null = null
+  private fetchingWorld = false
 
   public lastShockwaveFrame : number | null = null
 
@@ -51,8 +54,14 @@ export class ApiService {
       console.log("Socket Connected!")
     })
 
-    this.socket.on(this.EVENT_FRAMEDATA, (data: FrameData) => {
-      this.frameData = data
+    this.socket.on(this.EVENT_FRAMEDATA, (payload: string | FrameData) => {
+      // Frames are forwarded from the GameAPI still JSON encoded.
+      const data: FrameData = typeof payload === "string" ? JSON.parse(payload) : payload
+      if(this.world === null || this.world.world_version !== data.world_version) {
+        this.fetchWorld()
+        return
+      }
+      this.frameData = {...data, ...this.world}
       this.frameDataEvent.next()
       if(data.game_frame % 400 === 0) {
         console.log({framedata: data})
@@ -107,4 +116,19 @@ export class ApiService {
     console.log("fetchLiveDetails() DONE")
   }
 
+  private async fetchWorld() {
+    if(this.fetchingWorld) {
+      return
+    }
+    this.fetchingWorld = true
+    try {
+      // @ts-ignore
+      this.world = await this.get("/api/game/world")
+    } catch(err) {
+      console.warn("fetchWorld() failed, retrying on the next frame")
+    } finally {
+      this.fetchingWorld = false
+    }
+  }
+
 }
@@ -328,6 +328,15 @@ export class FrameData {
     killfeed: KillFeedElement[]
     ship: Ship
     special_weapon_costs: SpecialWeaponsCost
+    world_version: number
+}
+
+export class WorldData {
+    world_version: number
+    map_config: MapConfig
+    space_stations: SpaceStation[]
+    ore_mines: OreMine[]
+    special_weapon_costs: SpecialWeaponsCost
 }
 
 export class LiveGameDetails {
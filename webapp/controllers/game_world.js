@@ -0,0 +1,19 @@
+const { getWorldKey } = require("../lib/world");
+
+exports.gameWorldController = async (req, res) => {
+    const sess_player_id = req.session.player_id;
+    const sess_room_id = req.session.room_id;
+    if (!sess_player_id) {
+        return res.sendStatus(401);
+    }
+    if (!sess_room_id) {
+        return res.status(400).send("session does not contain room_id");
+    }
+
+    // Already JSON encoded by the GameAPI.
+    const world = req.app.get(getWorldKey(sess_room_id));
+    if (!world) {
+        return res.sendStatus(404);
+    }
+    return res.status(200).send(world);
+}
@@ -2,6 +2,7 @@
 const net = require('net');
 
 const { getQueueName } = require("../lib/command_queue")
+const { getWorldKey } = require("../lib/world");
 const { get_db_connection } = require("../lib/db/get_db_connection");
 const { get_room_and_player_details } = require("../lib/db/get_rooms");
 const {
@@ -80,22 +81,42 @@ const getRoomPyProcessPID = async (db, roomUUID) => {
     return resp[0].pid
 }
 
+const emitTeamFrames = (room_id, teamFrames, io) => {
+    // For fairness, randomize the order in which a team's frame is emitted as an event.
+    // Frames are already encoded by the GameAPI, they're forwarded as is.
+    const range = shuffledRange(0, teamFrames.length - 1);
+    for(const i of range)
+    {
+        const [teamId, frame] = teamFrames[i];
+        const roomName = get_team_room_name(room_id, teamId);
+        logger.silly("emmiting ship state to room " + roomName);
+        io.to(roomName).emit(EVENT_FRAMEDATA, frame);
+    }
+}
+
 const runGameLoop = (room_id, port, app, io) => {
-    // TODO: query command queue
-    // TODO: research KeepAlive for TCP sockets.
+    // One long lived "session" connection carries every run_frame command
+    // for the room. Commands and responses are newline delimited JSON,
+    // responses echo the request_id of the command they answer.
+    // LIVE frame states are split per team: a header line followed by
+    // one "<team_id> <frame JSON>" line for each team.
+    // Static map data isn't in the frames, it's fetched with get_world whenever
+    // the frames' world_version changes and served to clients over HTTP.
     const client = new net.Socket();
-    client.on("error", (err) => {
-        logger.error("could not connect to game server on port " + port);
-        logger.error(JSON.stringify(err));
-        logger.error("game loop has died on the vine.");
-    })
-    client.connect(port, 'localhost', () => {
-        logger.silly("connected to GameAPI on port " + port);
-
+    client.setNoDelay(true);
+    let buffered = "";
+    let requestId = 0;
+    let pendingTeamFrames = 0;
+    let teamFrames = [];
+    let worldVersion = null;
+    let worldRequestId = null;
+
+    const writeNextFrame = () => {
         const queueName = getQueueName(room_id)
         const commands = app.get(queueName) || [];
         app.set(queueName, []);
-        const payload = JSON.stringify({run_frame:{commands}});
+        requestId++;
+        const payload = JSON.stringify({request_id: requestId, run_frame:{commands}});
 
         if(commands.length) {
             logger.info("writing data to GameAPI: " + payload);
@@ -103,62 +124,73 @@ const runGameLoop = (room_id, port, app, io) => {
             logger.silly("writing data to GameAPI: " + payload);
         }
         client.write((payload + "\n"));
-    });
-    client.on("data", async (data) => {
-        logger.silly("received response from GameAPI, disconnecting...");
-        client.destroy();
+    }
+
+    const requestWorld = () => {
+        requestId++;
+        worldRequestId = requestId;
+        client.write(JSON.stringify({request_id: requestId, get_world: {}}) + "\n");
+    }
+
+    const handleWorldResponse = (line, respData) => {
+        worldRequestId = null;
+        if (respData.ok === false) {
+            logger.error("GameAPI get_world failed: " + respData.error);
+            // Try again on the next frame.
+            worldVersion = null;
+            return;
+        }
+        app.set(getWorldKey(room_id), line);
+    }
+
+    const handleTeamFrame = (line) => {
+        const spaceIx = line.indexOf(" ");
+        teamFrames.push([line.slice(0, spaceIx), line.slice(spaceIx + 1)]);
+        pendingTeamFrames--;
+        if(pendingTeamFrames === 0) {
+            emitTeamFrames(room_id, teamFrames, io);
+            teamFrames = [];
+            setTimeout(writeNextFrame);
+        }
+    }
+
+    const handleResponse = async (line) => {
         let respData;
         try {
-            respData = JSON.parse(data);
+            respData = JSON.parse(line);
         } catch(err) {
-            logger.error("expected JSON data, got: " + data);
+            logger.error("expected JSON data, got: " + line);
             logger.error(err);
-            logger.error(data);
             throw err;
         }
+        if (worldRequestId !== null && respData.request_id === worldRequestId) {
+            // Checked before failed commands, the frame loop has already moved on.
+            return handleWorldResponse(line, respData);
+        }
+        if (respData.ok === false) {
+            logger.error("GameAPI command failed: " + respData.error);
+            return writeNextFrame();
+        }
+        if (respData.request_id === 0) {
+            // Session opened.
+            return writeNextFrame();
+        }
         if (respData.phase == PHASE_2_LIVE) {
-            // For fairness, randomize the order in which a ship's state is emitted as an event.
-            const range = shuffledRange(0, respData.ships.length - 1);
-            for(let i in range)
-            {
-                const ship = respData.ships[i];
-                if(!ship.team_id) {
-                    // Ship is orphaned (dead),
-                    // No one to send ship data to. Other ships can see this ship through scanner data.
-                    continue
-                }
-                const roomName = get_team_room_name(room_id, ship.team_id);
-                logger.silly("emmiting ship state to room " + roomName);
-                io.to(roomName).emit(
-                    EVENT_FRAMEDATA,
-                    {
-                        ship,
-                        phase: respData.phase,
-                        elapsed_time: respData.elapsed_time,
-                        game_frame: respData.game_frame,
-                        server_fps: respData.server_fps,
-                        server_fps_throttle_seconds: respData.server_fps_throttle_seconds,
-                        map_config: respData.map_config,
-                        ebeam_rays: respData.ebeam_rays,
-                        explosion_shockwaves: respData.explosion_shockwaves,
-                        explosions: respData.explosions,
-                        emp_blasts: respData.emp_blasts,
-                        winning_team: respData.winning_team,
-                        killfeed: respData.killfeed,
-                        space_stations: respData.space_stations,
-                        ore_mines: respData.ore_mines,
-                        special_weapon_costs: respData.special_weapon_costs,
-                        magnet_mine_targeting_lines: respData.magnet_mine_targeting_lines,
-                    },
-                );
+            if (respData.world_version !== worldVersion) {
+                // Answered after this frame's team frames.
+                worldVersion = respData.world_version;
+                requestWorld();
+            }
+            pendingTeamFrames = respData.team_frames;
+            teamFrames = [];
+            if(pendingTeamFrames === 0) {
+                setTimeout(writeNextFrame);
             }
-
-            // Recursively call the game loop function.
-            setTimeout(() => {
-                runGameLoop(room_id, port, app, io);
-            });
 
         } else if (respData.phase == PHASE_3_COMPLETE) {
+            logger.info("game complete, closing GameAPI session");
+            client.end();
+            app.set(getWorldKey(room_id), undefined);
             let pid;
             const db = await get_db_connection();
             try {
@@ -172,6 +204,32 @@ const runGameLoop = (room_id, port, app, io) => {
             }
             killProcess(pid)
         }
+    }
+
+    client.on("error", (err) => {
+        logger.error("could not connect to game server on port " + port);
+        logger.error(JSON.stringify(err));
+        logger.error("game loop has died on the vine.");
+    })
+    client.connect(port, 'localhost', () => {
+        logger.silly("connected to GameAPI on port " + port);
+        client.write(JSON.stringify({request_id: requestId, session:{per_team: true}}) + "\n");
+    });
+    client.on("data", async (data) => {
+        buffered += data.toString();
+        let newlineIx;
+        while((newlineIx = buffered.indexOf("\n")) !== -1) {
+            const line = buffered.slice(0, newlineIx);
+            buffered = buffered.slice(newlineIx + 1);
+            if(!line.length) {
+                continue;
+            }
+            if(pendingTeamFrames > 0) {
+                handleTeamFrame(line);
+            } else {
+                await handleResponse(line);
+            }
+        }
     });
 }
 
@@ -384,4 +442,6 @@ exports.relaunchGameLoops = async (io, app) => {
             runGameLoop(room.uuid, room.port, app, io);
         });
     }
-}
\ No newline at end of file
+}
+
+exports.runGameLoop = runGameLoop;
@@ -31,6 +31,7 @@ const {
     relaunchGameLoops,
 } = require("./controllers/start_game");
 const { liveGameDetailsController } = require("./controllers/live_game_details");
+const { gameWorldController } = require("./controllers/game_world");
 const { userDetailsController } = require("./controllers/user_details");
 const { pingServerController } = require("./controllers/ping_server");
 const { handleSocketConnection } = require("./socket_handler");
@@ -234,6 +235,7 @@ expressApp.get('/api/rooms/details', setJSONContentType, roomDetailsController);
 expressApp.post('/api/rooms/start', setJSONContentType, startGameController);
 expressApp.get('/api/maps/list', setJSONContentType, getMapsController);
 expressApp.get('/api/game/live-details', setJSONContentType, liveGameDetailsController);
+expressApp.get('/api/game/world', setJSONContentType, gameWorldController);
 
 // Launch the HTTP Server
 httpServer.listen(locals.port, () => {
@@ -0,0 +1,2 @@
+// Key of the room's static world document (GameAPI get_world response), stored on the express app.
+exports.getWorldKey = roomUUID => "world_" + roomUUID
@@ -0,0 +1,83 @@
+const assert = require("assert");
+const net = require("net");
+const { test } = require("node:test");
+
+const { runGameLoop } = require("../controllers/start_game");
+const { getWorldKey } = require("../lib/world");
+const { PHASE_2_LIVE } = require("../constants");
+
+
+// Stand in for the express app and socket.io server.
+const fakeApp = () => {
+    const settings = {};
+    return {
+        get: key => settings[key],
+        set: (key, value) => { settings[key] = value; },
+    };
+}
+const fakeIO = {to: () => ({emit: () => {}})};
+
+test("a failed get_world is retried without starting a second frame loop", {timeout: 5000}, async (t) => {
+    const received = [];
+    let inFlightFrames = 0;
+    let maxInFlightFrames = 0;
+    let worldRequests = 0;
+    const sockets = [];
+    let done;
+    const finished = new Promise(resolve => { done = resolve; });
+
+    const server = net.createServer(socket => {
+        sockets.push(socket);
+        let buffered = "";
+        socket.on("data", data => {
+            buffered += data.toString();
+            let newlineIx;
+            while((newlineIx = buffered.indexOf("\n")) !== -1) {
+                const command = JSON.parse(buffered.slice(0, newlineIx));
+                buffered = buffered.slice(newlineIx + 1);
+                received.push(command);
+                if (command.session) {
+                    socket.write(JSON.stringify({ok: true, request_id: command.request_id}) + "\n");
+                } else if (command.run_frame) {
+                    inFlightFrames++;
+                    maxInFlightFrames = Math.max(maxInFlightFrames, inFlightFrames);
+                    setTimeout(() => {
+                        inFlightFrames--;
+                        socket.write(JSON.stringify({
+                            ok: true,
+                            request_id: command.request_id,
+                            phase: PHASE_2_LIVE,
+                            world_version: 1,
+                            team_frames: 0,
+                        }) + "\n");
+                    }, 5);
+                } else if (command.get_world) {
+                    worldRequests++;
+                    if (worldRequests === 1) {
+                        socket.write(JSON.stringify({ok: false, request_id: command.request_id, error: "boom"}) + "\n");
+                    } else {
+                        socket.write(JSON.stringify({ok: true, request_id: command.request_id, world_version: 1}) + "\n");
+                        done();
+                    }
+                }
+            }
+        });
+    });
+    await new Promise(resolve => server.listen(0, "localhost", resolve));
+    t.after(() => {
+        sockets.forEach(socket => socket.destroy());
+        server.close();
+    });
+
+    const app = fakeApp();
+    runGameLoop("room-1", server.address().port, app, fakeIO);
+    await finished;
+    // Let a few more frames run.
+    await new Promise(resolve => setTimeout(resolve, 50));
+
+    assert.strictEqual(worldRequests, 2);
+    assert.strictEqual(maxInFlightFrames, 1);
+    assert.strictEqual(JSON.parse(app.get(getWorldKey("room-1"))).world_version, 1);
+    const requestIds = received.map(command => command.request_id);
+    assert.deepStrictEqual(requestIds, [...new Set(requestIds)]);
+});